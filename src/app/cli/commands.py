@@ -197,4 +197,103 @@ def create_default_roles() -> None:
             await db_session.commit()
 
     console.rule("Creating default roles.")
-    anyio.run(_create_default_roles)
\ No newline at end of file
+    anyio.run(_create_default_roles)
+
+
+@click.group(name="tles", invoke_without_command=False, help="Manage the TLE of the satellites.")
+@click.pass_context
+def tle_management_group(_: dict[str, Any]) -> None:
+    """Manage TLE."""
+
+
+@tle_management_group.command(name="ingest-catalog", help="Ingest a 2LE or 3LE catalog file.")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, readable=True))
+@click.option(
+    "--chunk-size",
+    help="Number of element sets inserted at once",
+    type=click.IntRange(min=1),
+    default=10_000,
+    show_default=True,
+)
+def ingest_catalog(path: str, chunk_size: int) -> None:
+    """Ingest a TLE catalog.
+
+    Args:
+        path (str): The catalog file.
+        chunk_size (int): The number of element sets inserted at once.
+    """
+    from collections.abc import AsyncIterator
+
+    import anyio
+    from rich import get_console
+
+    from app.config.app import alchemy
+    from app.domain.tle.services import TLEService
+
+    console = get_console()
+
+    async def _read_catalog() -> AsyncIterator[bytes]:
+        async with await anyio.open_file(path, "rb") as catalog:
+            while piece := await catalog.read(1 << 20):
+                yield piece
+
+    async def _ingest_catalog() -> None:
+        async with TLEService.new(config=alchemy) as tle_service:
+            report = await tle_service.ingest_catalog(_read_catalog(), chunk_size=chunk_size)
+        console.print(
+            f"Read {report.records} element sets in {report.duration:.1f} s: inserted {report.inserted}, "
+            f"skipped {report.duplicates} already stored, {report.unknown} of unknown satellites and "
+            f"{report.invalid} invalid",
+        )
+
+    console.rule(f"Ingesting TLE catalog {path}.")
+    anyio.run(_ingest_catalog)
+
+
+@click.group(name="orbits", invoke_without_command=False, help="Manage the stored orbits.")
+@click.pass_context
+def orbit_management_group(_: dict[str, Any]) -> None:
+    """Manage orbits."""
+
+
+@orbit_management_group.command(
+    name="build-state-tables",
+    help="Sample the stored orbit files into memory-mapped state tables.",
+)
+@click.option(
+    "--step",
+    help="Step between the nodes in seconds, FDY_STATE_TABLE_STEP by default",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+)
+@click.option("--force", help="Rebuild the existing state tables", is_flag=True, default=False)
+def build_state_tables(step: float | None, force: bool) -> None:
+    """Build the state tables of the stored orbits.
+
+    Args:
+        step (float | None): The step between the nodes in seconds.
+        force (bool): Whether to rebuild the existing state tables.
+    """
+    import anyio
+    from rich import get_console
+
+    from app.config import get_settings
+    from app.config.app import alchemy
+    from app.domain.orbit.services import OrbitService
+    from app.flight_dynamics.propagation import build_state_table
+    from app.lib.state_table import state_table_path
+
+    console = get_console()
+    step = step or get_settings().fdy.STATE_TABLE_STEP
+
+    async def _build_state_tables() -> None:
+        async with OrbitService.new(config=alchemy) as orbit_service:
+            orbits = await orbit_service.list()
+        for orbit in orbits:
+            if not force and state_table_path(f"data/uploads/{orbit.file_name}").exists():
+                continue
+            nodes = await anyio.to_thread.run_sync(build_state_table, orbit.file_name, orbit.start, orbit.end, step)
+            console.print(f"Built the state table of orbit {orbit.id} with {nodes} nodes.")
+
+    console.rule("Building the state tables of the orbits.")
+    anyio.run(_build_state_tables)
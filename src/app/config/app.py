@@ -68,10 +68,39 @@ saq = SAQConfig(
                 ),
             ],
         ),
-        # QueueConfig(
-        #     name="Orbit propagation queue",
-        #     tasks=["app.domain.propagation.controllers.propagate_and_save"],
-        # ),
+        QueueConfig(
+            name="Orbit propagation queue",
+            tasks=[
+                "app.domain.propagation.tasks.propagate_and_save",
+                "app.domain.propagation.tasks.propagate_ensemble",
+                "app.domain.propagation.tasks.extend_orbit",
+            ],
+            concurrency=settings.saq.PROPAGATION_CONCURRENCY,
+            startup=["app.lib.process_pool.startup_process_pool"],
+            shutdown=["app.lib.process_pool.shutdown_process_pool"],
+        ),
+        # batch jobs wait on their children of the propagation queue, so they never hold one of its slots
+        QueueConfig(
+            name="Orbit propagation batch queue",
+            tasks=["app.domain.propagation.tasks.propagate_batch"],
+            concurrency=settings.saq.PROPAGATION_BATCH_CONCURRENCY,
+            startup=["app.lib.process_pool.startup_process_pool"],
+            shutdown=["app.lib.process_pool.shutdown_process_pool"],
+        ),
+        QueueConfig(
+            name="TLE fitting queue",
+            tasks=["app.domain.tle.tasks.fit_tle_and_save", "app.domain.tle.tasks.fit_tle_batch"],
+            concurrency=settings.saq.TLE_FIT_CONCURRENCY,
+            startup=["app.lib.process_pool.startup_process_pool"],
+            shutdown=["app.lib.process_pool.shutdown_process_pool"],
+        ),
+        QueueConfig(
+            name="Conjunction screening queue",
+            tasks=["app.domain.conjunction.tasks.screen_conjunctions"],
+            concurrency=settings.saq.CONJUNCTION_SCREENING_CONCURRENCY,
+            startup=["app.lib.process_pool.startup_process_pool"],
+            shutdown=["app.lib.process_pool.shutdown_process_pool"],
+        ),
     ],
 )
 
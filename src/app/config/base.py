@@ -230,12 +230,125 @@ class SaqSettings:
 
     Default is set to 10.
     """
+    PROPAGATION_CONCURRENCY: int = field(default_factory=get_env("SAQ_PROPAGATION_CONCURRENCY", 8))
+    """The number of concurrent jobs allowed on the orbit propagation queue per worker process.
+
+    These jobs only wait on the propagation process pool and on I/O. Default is set to 8.
+    """
+    PROPAGATION_PROCESSES: int = field(default_factory=get_env("SAQ_PROPAGATION_PROCESSES", 4))
+    """The number of processes running the numerical propagations of a worker process.
+
+    Default is set to 4.
+    """
+    PROPAGATION_TIMEOUT: int = field(default_factory=get_env("SAQ_PROPAGATION_TIMEOUT", 3600))
+    """The timeout, in seconds, of a propagation job.
+
+    Default is set to 3600.
+    """
+    PROPAGATION_RETRIES: int = field(default_factory=get_env("SAQ_PROPAGATION_RETRIES", 1))
+    """The number of attempts of a propagation job.
+
+    Default is set to 1.
+    """
+    PROPAGATION_BATCH_PARALLELISM: int = field(default_factory=get_env("SAQ_PROPAGATION_BATCH_PARALLELISM", 4))
+    """The number of propagation jobs of a batch that are allowed to run at the same time.
+
+    Default is set to 4.
+    """
+    PROPAGATION_BATCH_CONCURRENCY: int = field(default_factory=get_env("SAQ_PROPAGATION_BATCH_CONCURRENCY", 2))
+    """The number of concurrent jobs allowed on the orbit propagation batch queue per worker process.
+
+    Batch jobs run on their own queue and enqueue their propagations on the orbit propagation
+    queue. Default is set to 2.
+    """
+    TLE_FIT_CONCURRENCY: int = field(default_factory=get_env("SAQ_TLE_FIT_CONCURRENCY", 2))
+    """The number of concurrent jobs allowed on the TLE fitting queue per worker process.
+
+    The fits run in the propagation process pool. Default is set to 2.
+    """
+    TLE_FIT_TIMEOUT: int = field(default_factory=get_env("SAQ_TLE_FIT_TIMEOUT", 1800))
+    """The timeout, in seconds, of a TLE fitting job.
+
+    Default is set to 1800.
+    """
+    CONJUNCTION_SCREENING_CONCURRENCY: int = field(default_factory=get_env("SAQ_CONJUNCTION_SCREENING_CONCURRENCY", 1))
+    """The number of concurrent jobs allowed on the conjunction screening queue per worker process.
+
+    A screening spreads its windows over the whole process pool. Default is set to 1.
+    """
+    CONJUNCTION_SCREENING_TIMEOUT: int = field(default_factory=get_env("SAQ_CONJUNCTION_SCREENING_TIMEOUT", 3600))
+    """The timeout, in seconds, of a conjunction screening job.
+
+    Default is set to 3600.
+    """
     WEB_ENABLED: bool = field(default_factory=get_env("SAQ_WEB_ENABLED", True))
     """If true, the worker admin UI is hosted on worker startup."""
     USE_SERVER_LIFESPAN: bool = field(default_factory=get_env("SAQ_USE_SERVER_LIFESPAN", True))
     """Auto start and stop `saq` processes when starting the Litestar application."""
 
 
+@dataclass
+class FlightDynamicsSettings:
+    """Flight dynamics configurations."""
+
+    UNIVERSE_POOL_SIZE: int = field(default_factory=get_env("FDY_UNIVERSE_POOL_SIZE", 4))
+    """The maximum number of warm GODOT universes kept per process.
+
+    Default is set to 4.
+    """
+    UNIVERSE_POOL_MEMORY_MB: int = field(default_factory=get_env("FDY_UNIVERSE_POOL_MEMORY_MB", 2048))
+    """The approximate memory budget, in MB, of the universes kept per process.
+
+    Default is set to 2048.
+    """
+    UNIVERSE_POOL_MAX_USES: int = field(default_factory=get_env("FDY_UNIVERSE_POOL_MAX_USES", 100))
+    """The number of jobs served by a pooled universe before it is rebuilt.
+
+    Trajectories register their points in the universe they are computed in, so a universe is
+    recycled after this many uses to keep its footprint bounded. Default is set to 100.
+    """
+    CHEBYSHEV_TOLERANCE: float = field(default_factory=get_env("FDY_CHEBYSHEV_TOLERANCE", 1.0))
+    """The position tolerance, in m, of the Chebyshev ephemeris stored next to every propagated orbit.
+
+    Default is set to 1.0.
+    """
+    ENSEMBLE_MAX_SAMPLES: int = field(default_factory=get_env("FDY_ENSEMBLE_MAX_SAMPLES", 1000))
+    """The maximum number of samples of an ensemble propagation.
+
+    Default is set to 1000.
+    """
+    ANALYTICAL_MAX_POINTS: int = field(default_factory=get_env("FDY_ANALYTICAL_MAX_POINTS", 100_000))
+    """The maximum number of output epochs of an analytical propagation.
+
+    Default is set to 100000.
+    """
+    EPHEMERIS_CACHE_SIZE: int = field(default_factory=get_env("FDY_EPHEMERIS_CACHE_SIZE", 32))
+    """The maximum number of orbits kept open per process to answer ephemeris queries.
+
+    Default is set to 32.
+    """
+    EPHEMERIS_MAX_POINTS: int = field(default_factory=get_env("FDY_EPHEMERIS_MAX_POINTS", 100_000))
+    """The maximum number of epochs of an ephemeris query.
+
+    Default is set to 100000.
+    """
+    STATE_TABLE_STEP: int = field(default_factory=get_env("FDY_STATE_TABLE_STEP", 60))
+    """The step in seconds between the nodes of the state tables of the orbits.
+
+    Default is set to 60.
+    """
+    TLE_FIT_THREADS: int = field(default_factory=get_env("FDY_TLE_FIT_THREADS", 1))
+    """The number of threads evaluating the TLEs of a fit, each over a part of the fitted epochs.
+
+    The results do not depend on it. Default is set to 1.
+    """
+    TLE_FIT_WARM_START_DAYS: float = field(default_factory=get_env("FDY_TLE_FIT_WARM_START_DAYS", 7.0))
+    """The maximum age, in days from the start of the fitted orbit, of a TLE a fit starts from.
+
+    Fits without such a TLE start from the osculating elements of the orbit. Default is set to 7.
+    """
+
+
 @dataclass
 class LogSettings:
     """Logger configuration"""
@@ -407,6 +520,7 @@ class Settings:
     redis: RedisSettings = field(default_factory=RedisSettings)
     saq: SaqSettings = field(default_factory=SaqSettings)
     storage: StorageSettings = field(default_factory=StorageSettings)
+    fdy: FlightDynamicsSettings = field(default_factory=FlightDynamicsSettings)
 
     @classmethod
     def from_env(cls, dotenv_filename: str = ".env") -> Settings:
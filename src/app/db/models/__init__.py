@@ -1,8 +1,9 @@
+from .conjunction import Conjunction
 from .data_status import DataStatus
 from .dynamics import Dynamics
 from .ground_station import GroundStation
 from .oauth_account import UserOauthAccount
-from .orbit import IpfOrbit
+from .orbit import IpfOrbit, OrbitEnsemble
 from .role import Role
 from .satellite import Satellite
 from .tag import Tag
@@ -17,11 +18,13 @@ from .user_role import UserRole
 
 __all__ = (
     "TLE",
+    "Conjunction",
     "DataStatus",
     "Dynamics",
     "GroundStation",
     "IpfOrbit",
     # "OemOrbit",
+    "OrbitEnsemble",
     "Role",
     "Satellite",
     "Tag",
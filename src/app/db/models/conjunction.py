@@ -0,0 +1,26 @@
+from datetime import datetime
+from uuid import UUID
+
+from advanced_alchemy.base import UUIDAuditBase
+from advanced_alchemy.types import DateTimeUTC
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class Conjunction(UUIDAuditBase):
+    """Close approach of two satellites found by a conjunction screening of their latest TLE."""
+
+    __tablename__ = "conjunction"
+    primary_satellite_id: Mapped[UUID] = mapped_column(ForeignKey("satellite.id", ondelete="cascade"), index=True)
+    secondary_satellite_id: Mapped[UUID] = mapped_column(ForeignKey("satellite.id", ondelete="cascade"), index=True)
+    tca: Mapped[datetime] = mapped_column(
+        DateTimeUTC(timezone=True),
+        index=True,
+    )
+    """Time of closest approach."""
+    miss_distance: Mapped[float]
+    """Distance of the satellites at the TCA in km."""
+    relative_speed: Mapped[float]
+    """Relative speed of the satellites at the TCA in km/s."""
+    threshold: Mapped[float]
+    """Screening distance in km."""
@@ -3,7 +3,8 @@ from uuid import UUID
 
 from advanced_alchemy.base import UUIDAuditBase
 from advanced_alchemy.types import DateTimeUTC
-from sqlalchemy import ForeignKey
+from sqlalchemy import Computed, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSTZRANGE, Range
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .satellite import Satellite
@@ -11,14 +12,37 @@ from .satellite import Satellite
 
 class IpfOrbit(UUIDAuditBase):
     __tablename__ = "ipf_orbit"
+    __table_args__ = (
+        Index("ix_ipf_orbit_satellite_id_validity", "satellite_id", "validity", postgresql_using="gist"),
+    )
     file_name: Mapped[str]
+    chebyshev_file_name: Mapped[str | None] = mapped_column(nullable=True, default=None)
+    """Compact Chebyshev representation of the orbit, see :mod:`app.flight_dynamics.chebyshev`."""
+    lod_file_name: Mapped[str | None] = mapped_column(nullable=True, default=None)
+    """Level-of-detail pyramid of the states of the orbit, see :mod:`app.flight_dynamics.pyramid`."""
     start: Mapped[datetime] = mapped_column(
         DateTimeUTC(timezone=True),
     )
     end: Mapped[datetime] = mapped_column(
         DateTimeUTC(timezone=True),
     )
+    validity: Mapped[Range[datetime]] = mapped_column(
+        TSTZRANGE,
+        Computed("tstzrange(start, \"end\", '[]')", persisted=True),
+    )
+    """Closed ``[start, end]`` range generated from the span, indexed to find the orbits covering epochs."""
     satellite_id: Mapped[UUID] = mapped_column(ForeignKey("satellite.id", ondelete="cascade"))
+    content_hash: Mapped[str | None] = mapped_column(index=True, nullable=True, default=None)
+    """Hash of the propagation inputs, to serve identical propagation requests from the stored orbit."""
+    parent_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("ipf_orbit.id", ondelete="set null"),
+        index=True,
+        nullable=True,
+        default=None,
+    )
+    """The orbit this one extends, starting at its end epoch."""
+    fidelity: Mapped[str | None] = mapped_column(nullable=True, default=None)
+    """The fidelity profile of the propagation, see :data:`app.lib.fdy.FIDELITY_PROFILES`."""
     satellite: Mapped[Satellite] = relationship(
         back_populates="orbits",
         lazy="selectin",
@@ -38,3 +62,24 @@ class IpfOrbit(UUIDAuditBase):
 #         innerjoin=True,
 #         uselist=False,
 #     )
+
+
+class OrbitEnsemble(UUIDAuditBase):
+    """Summary statistics of a Monte Carlo propagation, stored as a ``.npz`` file."""
+
+    __tablename__ = "orbit_ensemble"
+    file_name: Mapped[str]
+    start: Mapped[datetime] = mapped_column(
+        DateTimeUTC(timezone=True),
+    )
+    end: Mapped[datetime] = mapped_column(
+        DateTimeUTC(timezone=True),
+    )
+    samples: Mapped[int]
+    fidelity: Mapped[str | None] = mapped_column(nullable=True, default=None)
+    satellite_id: Mapped[UUID] = mapped_column(ForeignKey("satellite.id", ondelete="cascade"))
+    satellite: Mapped[Satellite] = relationship(
+        lazy="selectin",
+        innerjoin=True,
+        uselist=False,
+    )
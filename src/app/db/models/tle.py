@@ -4,7 +4,7 @@ from uuid import UUID
 
 from advanced_alchemy.base import UUIDAuditBase
 from advanced_alchemy.types import DateTimeUTC
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .satellite import Satellite
@@ -17,6 +17,7 @@ class TLEOrigin(str, Enum):
 
 class TLE(UUIDAuditBase):
     __tablename__ = "tle"
+    __table_args__ = (Index("ix_tle_satellite_id_epoch", "satellite_id", "epoch"),)
     line1: Mapped[str]
     line2: Mapped[str]
     epoch: Mapped[datetime] = mapped_column(
@@ -0,0 +1,3 @@
+from . import schemas, tasks, urls
+
+__all__ = ["schemas", "tasks", "urls"]
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Annotated
+from uuid import UUID
+
+from litestar import Controller, get, post
+from litestar.dto import MsgspecDTO
+from litestar.exceptions import NotFoundException
+from litestar.response import ServerSentEvent
+
+from app.config.base import get_settings
+from app.db.models import Conjunction
+from app.domain.accounts.guards import requires_active_user
+from app.domain.conjunction import urls
+from app.domain.conjunction.dtos import ConjunctionDTO
+from app.domain.conjunction.schemas import ConjunctionScreeningInput
+from app.domain.conjunction.services import ConjunctionService
+from app.domain.conjunction.tasks import conjunction_screening_job_key
+from app.domain.propagation.schemas import JobRequest
+from app.lib.deps import create_service_provider
+from app.lib.exceptions import ApplicationClientError
+from app.lib.job_progress import job_events
+
+if TYPE_CHECKING:
+    from advanced_alchemy.filters import FilterTypes
+    from advanced_alchemy.service import OffsetPagination
+    from litestar.params import Dependency, Parameter
+    from litestar_saq import TaskQueues
+
+
+def conjunction_screening_events_location(job_key: str) -> str:
+    return urls.CONJUNCTION_SCREENING_EVENTS.replace("{job_key:str}", job_key).lstrip("/")
+
+
+class ConjunctionController(Controller):
+    """Handles the screening and the lookup of conjunctions."""
+
+    guards = [requires_active_user]
+    dependencies = {
+        "conjunction_service": create_service_provider(ConjunctionService),
+    }
+    signature_namespace = {"ConjunctionService": ConjunctionService, "Conjunction": Conjunction}
+    return_dto = ConjunctionDTO
+    tags = ["Conjunction"]
+
+    @get(
+        operation_id="ListConjunction",
+        name="conjunction:list",
+        summary="List conjunctions",
+        description="Retrieve the conjunctions found by the screenings.",
+        path=urls.CONJUNCTION_LIST,
+    )
+    async def list_conjunction(
+        self,
+        conjunction_service: ConjunctionService,
+        filters: Annotated[list[FilterTypes], Dependency(skip_validation=True)],
+    ) -> OffsetPagination[Conjunction]:
+        """List conjunctions."""
+        results, total = await conjunction_service.list_and_count(*filters)
+        return conjunction_service.to_schema(data=results, total=total, filters=filters)
+
+    @get(
+        operation_id="GetConjunction",
+        name="conjunction:get",
+        path=urls.CONJUNCTION_DETAILS,
+        summary="Retrieve the details of a conjunction.",
+    )
+    async def get_conjunction(
+        self,
+        conjunction_service: ConjunctionService,
+        conjunction_id: Annotated[
+            UUID,
+            Parameter(
+                title="Conjunction ID",
+                description="The conjunction to retrieve.",
+            ),
+        ],
+    ) -> Conjunction:
+        """Get a conjunction."""
+        db_obj = await conjunction_service.get(conjunction_id)
+        return conjunction_service.to_schema(db_obj)
+
+    @post(
+        operation_id="CreateConjunctionScreeningRequest",
+        name="conjunction:screening",
+        summary="Request a conjunction screening",
+        description="Submit the screening of the latest TLE of every satellite for close approaches. The pairs are\
+              narrowed down by an apogee/perigee filter and a spatial grid at every epoch, then refined to their\
+              time of closest approach. The conjunctions within the threshold replace the ones previously found in\
+              the screened interval. Identical screenings in progress share the same job.",
+        path=urls.CONJUNCTION_SCREENING,
+        dto=MsgspecDTO[ConjunctionScreeningInput],
+        return_dto=None,
+    )
+    async def create_conjunction_screening_request(
+        self,
+        data: ConjunctionScreeningInput,
+        task_queues: TaskQueues,
+    ) -> JobRequest:
+        # naive starts are taken as UTC
+        start = data.start or datetime.now(tz=UTC).replace(microsecond=0)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=UTC)
+        end = start + timedelta(hours=data.duration)
+        if (end - start).total_seconds() < data.step:
+            msg = "The screening must span at least one step."
+            raise ApplicationClientError(msg)
+
+        job_key = conjunction_screening_job_key(start, end, data.step, data.threshold)
+        queue = task_queues.get("Conjunction screening queue")
+        job = await queue.enqueue(
+            "screen_conjunctions",
+            key=job_key,
+            start=start.isoformat(),
+            end=end.isoformat(),
+            step=data.step,
+            threshold=data.threshold,
+            timeout=get_settings().saq.CONJUNCTION_SCREENING_TIMEOUT,
+        )
+        if job is None:
+            # an identical screening is in progress, share its job
+            job = await queue.job(job_key)
+
+        if job is None:
+            msg = "Failed to enqueue the conjunction screening job."
+            raise ApplicationClientError(msg)
+
+        return JobRequest(
+            queue_id=UUID(job.key),
+            location=f"saq/api/queues/{job.id}",
+            events=conjunction_screening_events_location(job.key),
+        )
+
+    @get(
+        operation_id="StreamConjunctionScreeningJobEvents",
+        name="conjunction:screening-events",
+        summary="Stream the status of a conjunction screening job",
+        description="Server-sent events stream pushing the status and progress of a conjunction screening job every\
+              time it changes. The stream ends once the job is complete, failed or aborted, its last event holding\
+              the result or the error.",
+        path=urls.CONJUNCTION_SCREENING_EVENTS,
+        return_dto=None,
+    )
+    async def stream_conjunction_screening_job_events(self, task_queues: TaskQueues, job_key: str) -> ServerSentEvent:
+        queue = task_queues.get("Conjunction screening queue")
+        if await queue.job(job_key) is None:
+            raise NotFoundException(detail=f"No conjunction screening job {job_key}.")
+        return ServerSentEvent(job_events(queue, job_key))
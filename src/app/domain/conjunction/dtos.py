@@ -0,0 +1,10 @@
+from advanced_alchemy.extensions.litestar.dto import SQLAlchemyDTO
+
+from app.db.models import Conjunction
+from app.lib import dto
+
+__all__ = ["ConjunctionDTO"]
+
+
+class ConjunctionDTO(SQLAlchemyDTO[Conjunction]):
+    config = dto.config(exclude={"created_at", "updated_at"})
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Annotated
+
+from msgspec import Meta
+
+from app.lib.schema import CamelizedBaseStruct
+
+
+class ConjunctionScreeningInput(CamelizedBaseStruct):
+    start: Annotated[
+        datetime | None,
+        Meta(description="Start of the screening, naive datetimes being taken as UTC. Now by default."),
+    ] = None
+    duration: Annotated[float, Meta(description="Duration of the screening in hours.", gt=0, le=168)] = 24.0
+    step: Annotated[
+        float,
+        Meta(
+            description="Step of the screening epoch grid in seconds. Pairs are compared within the distance they may\
+                cover in half a step, so a smaller step compares fewer pairs at every epoch.",
+            gt=0,
+            le=300,
+        ),
+    ] = 10.0
+    threshold: Annotated[float, Meta(description="Screening distance in km.", gt=0, le=100)] = 5.0
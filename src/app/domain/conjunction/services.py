@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from advanced_alchemy.repository import SQLAlchemyAsyncRepository
+from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService
+
+from app.db import models as m
+
+__all__ = ("ConjunctionService",)
+
+
+class ConjunctionService(SQLAlchemyAsyncRepositoryService[m.Conjunction]):
+    """Handles basic lookup operations for a Conjunction."""
+
+    class Repository(SQLAlchemyAsyncRepository[m.Conjunction]):
+        """Conjunction Repository."""
+
+        model_type = m.Conjunction
+
+    repository_type = Repository
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from datetime import UTC, datetime
+from typing import Any
+from uuid import NAMESPACE_URL, uuid5
+
+import numpy as np
+from sqlalchemy import delete
+from structlog import get_logger
+
+from app.config.app import alchemy
+from app.flight_dynamics.catalog import as_datetime64
+from app.flight_dynamics.conjunctions import (
+    ConjunctionCandidates,
+    find_candidates,
+    refine_candidates,
+    screen_windows,
+    shell_filter,
+)
+from app.lib.job_progress import JobProgress
+from app.lib.process_pool import run_in_process
+
+logger = get_logger()
+
+
+def conjunction_screening_job_key(start: datetime, end: datetime, step: float, threshold: float) -> str:
+    """Return the SAQ job key of a conjunction screening, identical screenings in progress share the same job."""
+    return str(uuid5(NAMESPACE_URL, f"conjunction-screening:{start.isoformat()}:{end.isoformat()}:{step}:{threshold}"))
+
+
+async def screen_conjunctions(ctx: Any, *, start: str, end: str, step: float, threshold: float) -> dict:
+    """Screen the latest TLE of every satellite for conjunctions and save them.
+
+    The objects whose radial shells overlap are propagated on an epoch grid, in windows spread over
+    the process pool, and the pairs found close by the spatial grid of every epoch are refined to
+    their time of closest approach, see :mod:`app.flight_dynamics.conjunctions`. The conjunctions
+    replace the ones previously saved within the screened interval.
+
+    Args:
+        ctx: The SAQ context.
+        start: Start of the screening as an ISO datetime.
+        end: End of the screening as an ISO datetime.
+        step: Step of the epoch grid in seconds.
+        threshold: Screening distance in km.
+
+    Returns:
+        The number of ``objects`` in the catalog, of ``deep_space`` ones that are not screened, of
+        ``screened`` ones past the apogee/perigee filter, of grid ``epochs``, of ``candidates``
+        and of saved ``conjunctions``, with the total duration of the screening.
+    """
+    # imported here, the task module is loaded by the queue configuration before the domain controllers
+    from app.db.models import Conjunction
+    from app.domain.conjunction.services import ConjunctionService
+    from app.domain.tle.services import TLEService
+
+    start_time = time.perf_counter()
+    begin_epoch, end_epoch = datetime.fromisoformat(start), datetime.fromisoformat(end)
+    async with alchemy.get_session() as db_session, TLEService.new(session=db_session) as tle_service:
+        catalog = await tle_service.latest_catalog()
+
+    origin, last = as_datetime64([begin_epoch, end_epoch])
+    step_us = np.timedelta64(round(step * 1e6), "us")
+    epochs = origin + np.arange((last - origin) // step_us + 1) * step_us
+    screened = shell_filter(catalog, threshold)
+    subset = catalog.take(screened)
+    windows = screen_windows(subset, epochs) if len(subset) > 1 else []
+
+    progress = JobProgress(ctx)
+    done = 0
+
+    async def screen(window: slice) -> ConjunctionCandidates:
+        nonlocal done
+        candidates = await run_in_process(find_candidates, subset, epochs[window], threshold, step, window.start)
+        done += 1
+        await progress.count(done, len(windows), "screening")
+        return candidates
+
+    results = await asyncio.gather(*(screen(window) for window in windows))
+    candidates = ConjunctionCandidates.concatenate(results) if results else None
+    rows = []
+    if candidates is not None and len(candidates) > 0:
+        conjunctions = await run_in_process(refine_candidates, subset, epochs, candidates, threshold, step)
+        rows = [
+            {
+                "primary_satellite_id": subset.ids[first],
+                "secondary_satellite_id": subset.ids[second],
+                "tca": tca,
+                "miss_distance": miss_distance,
+                "relative_speed": relative_speed,
+                "threshold": threshold,
+            }
+            for first, second, tca, miss_distance, relative_speed in zip(
+                conjunctions.first.tolist(),
+                conjunctions.second.tolist(),
+                [tca.replace(tzinfo=UTC) for tca in conjunctions.tca.astype(datetime)],
+                conjunctions.miss_distance.tolist(),
+                conjunctions.relative_speed.tolist(),
+                strict=True,
+            )
+        ]
+
+    async with alchemy.get_session() as db_session, ConjunctionService.new(session=db_session) as conjunction_service:
+        await db_session.execute(delete(Conjunction).where(Conjunction.tca.between(begin_epoch, end_epoch)))
+        if rows:
+            await conjunction_service.create_many(data=rows, auto_commit=False)
+        await db_session.commit()
+    logger.info("Found %d conjunctions between %d objects.", len(rows), len(subset))
+
+    return {
+        "objects": len(catalog),
+        "deep_space": int(catalog.deep_space.sum()),
+        "screened": len(subset),
+        "epochs": len(epochs),
+        "candidates": len(candidates) if candidates is not None else 0,
+        "conjunctions": len(rows),
+        "execution_duration": time.perf_counter() - start_time,
+    }
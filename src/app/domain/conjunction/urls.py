@@ -0,0 +1,4 @@
+CONJUNCTION_LIST = "/api/conjunctions"
+CONJUNCTION_DETAILS = "/api/conjunctions/{conjunction_id:uuid}"
+CONJUNCTION_SCREENING = "/api/conjunctions/screening"
+CONJUNCTION_SCREENING_EVENTS = "/api/conjunctions/screening/{job_key:str}/events"
@@ -12,6 +12,7 @@ from app.db.models.data_status import DataStatus, StatusType
 from app.domain.data_status.services import DataStatusService
 from app.domain.data_status.settings import ENVIRONMENT_DATA_SETTINGS, EnvironementDataUpdateSettings
 from app.lib.deps import create_service_provider
+from app.lib.universe_pool import get_universe_pool
 
 logger = get_logger()
 
@@ -29,6 +30,8 @@ async def _update_data_file(
 
     if response.status_code == HTTP_200_OK:
         data_setting.update_func(response, data_setting.file_name)
+        # universes loaded from the previous file are stale, drop them from this process right away
+        get_universe_pool().clear()
         status = StatusType.updated
     else:
         status = StatusType.out_of_date
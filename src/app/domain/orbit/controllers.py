@@ -1,17 +1,34 @@
 from __future__ import annotations
 
+import io
+from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING, Annotated
 
-from litestar import Controller, delete, get, patch, post
+import anyio
+import numpy as np
+from litestar import Controller, Response, delete, get, patch, post
 from litestar.di import Provide
+from litestar.dto import MsgspecDTO
 
-from app.db.models import IpfOrbit
+from app.config.base import get_settings
+from app.db.models import IpfOrbit, OrbitEnsemble
 from app.domain.accounts.guards import requires_active_user, requires_superuser
 from app.domain.orbit import urls
-from app.domain.orbit.dependencies import provide_orbit_service
-from app.domain.orbit.dtos import OrbitCreateDTO, OrbitDTO, OrbitUpdateDTO
-from app.domain.orbit.services import OrbitService
-from app.lib.deps import provide_file_storage_service
+from app.domain.orbit.dependencies import (
+    provide_orbit_ensemble_service,
+    provide_orbit_service,
+    provide_orbit_validity_filter,
+)
+from app.domain.orbit.dtos import OrbitCreateDTO, OrbitDTO, OrbitEnsembleDTO, OrbitUpdateDTO
+from app.domain.orbit.repositories import ValidityFilter
+from app.domain.orbit.schemas import OrbitEnsembleStatistics, OrbitLevelOfDetail, OrbitStates, OrbitStatesQuery
+from app.domain.orbit.services import OrbitEnsembleService, OrbitService
+from app.flight_dynamics.ephemeris import UPLOADS, as_utc, get_ephemeris_cache
+from app.flight_dynamics.pyramid import EphemerisPyramid
+from app.lib import storage
+from app.lib.deps import DTorNone, UuidOrNone, provide_file_storage_service
+from app.lib.exceptions import ApplicationClientError
+from app.lib.state_table import state_table_path
 from app.lib.storage_service import FileStorageService
 
 if TYPE_CHECKING:
@@ -30,8 +47,15 @@ class OrbitController(Controller):
     dependencies = {
         "orbit_service": Provide(provide_orbit_service),
         "file_storage_service": Provide(provide_file_storage_service),
+        "validity_filter": Provide(provide_orbit_validity_filter, sync_to_thread=False),
+    }
+    signature_namespace = {
+        "OrbitService": OrbitService,
+        "Orbit": IpfOrbit,
+        "ValidityFilter": ValidityFilter,
+        "DTorNone": DTorNone,
+        "UuidOrNone": UuidOrNone,
     }
-    signature_namespace = {"OrbitService": OrbitService, "Orbit": IpfOrbit}
     orbit = ["Orbit"]
     return_dto = OrbitDTO
     tags = ["Orbit"]
@@ -40,15 +64,19 @@ class OrbitController(Controller):
         operation_id="ListOrbit",
         name="orbit:list",
         summary="List Orbit",
-        description="Retrieve the orbit.",
+        description="Retrieve the orbit. The orbits can be filtered by satellite, and by validity: the orbits\
+              covering the whole interval from validFrom to validTo, or the epoch validFrom alone, or overlapping it.",
         path=urls.ORBIT_LIST,
     )
     async def list_orbit(
         self,
         orbit_service: OrbitService,
         filters: Annotated[list[FilterTypes], Dependency(skip_validation=True)],
+        validity_filter: Annotated[ValidityFilter | None, Dependency(skip_validation=True)],
     ) -> OffsetPagination[IpfOrbit]:
         """List orbit."""
+        if validity_filter is not None:
+            filters = [*filters, validity_filter]
         results, total = await orbit_service.list_and_count(*filters)
         return orbit_service.to_schema(data=results, total=total, filters=filters)
 
@@ -73,6 +101,157 @@ class OrbitController(Controller):
         db_obj = await orbit_service.get(orbit_id)
         return orbit_service.to_schema(db_obj)
 
+    @get(
+        operation_id="ExportOrbitChebyshev",
+        name="orbit:chebyshev",
+        path=urls.ORBIT_CHEBYSHEV,
+        summary="Export the Chebyshev ephemeris of an orbit.",
+        description="Download the piecewise Chebyshev representation of an orbit as a .npz file, holding the\
+              start epoch, the segment length in seconds and the coefficients of the ICRF position in km.\
+              See app.flight_dynamics.chebyshev to evaluate it.",
+        return_dto=None,
+    )
+    async def export_orbit_chebyshev(
+        self,
+        orbit_service: OrbitService,
+        orbit_id: Annotated[
+            UUID,
+            Parameter(
+                title="Orbit ID",
+                description="The orbit to export.",
+            ),
+        ],
+    ) -> Response[bytes]:
+        """Export the Chebyshev ephemeris of an orbit."""
+        db_obj = await orbit_service.get(orbit_id)
+        if db_obj.chebyshev_file_name is None:
+            msg = "This orbit has no Chebyshev ephemeris."
+            raise ApplicationClientError(msg)
+        content = storage.get_fs().cat_file(f"data/uploads/{db_obj.chebyshev_file_name}")
+        return Response(
+            content=content,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{db_obj.chebyshev_file_name}"'},
+        )
+
+    @post(
+        operation_id="QueryOrbitStates",
+        name="orbit:states",
+        path=urls.ORBIT_STATES,
+        summary="Interpolate the states of an orbit.",
+        description="Evaluate the states of an orbit at given epochs, or on a grid from start to end, in the ICRF,\
+              ITRF or TEME axes. ICRF states come from the Chebyshev ephemeris of the orbit when it has one, else\
+              from its memory-mapped state table when it was built, other states are interpolated from its IPF file.\
+              Recently queried orbits are kept open by the server.",
+        dto=MsgspecDTO[OrbitStatesQuery],
+        return_dto=None,
+    )
+    async def query_orbit_states(
+        self,
+        orbit_service: OrbitService,
+        data: OrbitStatesQuery,
+        orbit_id: Annotated[
+            UUID,
+            Parameter(
+                title="Orbit ID",
+                description="The orbit to interpolate.",
+            ),
+        ],
+    ) -> OrbitStates:
+        """Interpolate the states of an orbit."""
+        db_obj = await orbit_service.get(orbit_id)
+        max_points = get_settings().fdy.EPHEMERIS_MAX_POINTS
+        if data.epochs is not None:
+            epochs = [as_utc(epoch) for epoch in data.epochs]
+        elif data.start is not None and data.end is not None and data.step is not None:
+            start, end = as_utc(data.start), as_utc(data.end)
+            if end < start:
+                msg = "The end of the grid must not be before its start."
+                raise ApplicationClientError(msg)
+            count = int((end - start).total_seconds() // data.step) + 1
+            if count > max_points:
+                msg = f"The query holds more than {max_points} epochs."
+                raise ApplicationClientError(msg)
+            epochs = [start + timedelta(seconds=index * data.step) for index in range(count)]
+        else:
+            msg = "Either epochs or a start, an end and a step must be given."
+            raise ApplicationClientError(msg)
+        if len(epochs) > max_points:
+            msg = f"The query holds more than {max_points} epochs."
+            raise ApplicationClientError(msg)
+        if epochs and (min(epochs) < as_utc(db_obj.start) or max(epochs) > as_utc(db_obj.end)):
+            msg = "The epochs must be within the span of the orbit."
+            raise ApplicationClientError(msg)
+
+        cache = get_ephemeris_cache()
+        file_name, chebyshev_file_name = db_obj.file_name, db_obj.chebyshev_file_name
+
+        def evaluate() -> tuple[np.ndarray, str]:
+            orbit = cache.open(file_name, chebyshev_file_name)
+            return cache.states(orbit, epochs, data.frame)
+
+        states, source = await anyio.to_thread.run_sync(evaluate)
+        return OrbitStates(
+            orbit_id=orbit_id,
+            frame=data.frame,
+            source=source,
+            epochs=epochs,
+            states=states.tolist(),
+        )
+
+    @get(
+        operation_id="GetOrbitLevelOfDetail",
+        name="orbit:lod",
+        path=urls.ORBIT_LOD,
+        summary="Retrieve the states of an orbit to plot it.",
+        description="Return the ICRF states of the finest level of detail of an orbit with at most the given number\
+              of points within a time window: states every 1 s, 60 s or 600 s, or else the perigee, apogee and most\
+              northern and southern points of every revolution. Levels with too many nodes over the whole orbit are\
+              not stored.",
+        return_dto=None,
+    )
+    async def get_orbit_level_of_detail(
+        self,
+        orbit_service: OrbitService,
+        orbit_id: Annotated[
+            UUID,
+            Parameter(
+                title="Orbit ID",
+                description="The orbit to plot.",
+            ),
+        ],
+        start: Annotated[
+            datetime | None,
+            Parameter(query="start", required=False, description="Start of the window, the orbit start by default."),
+        ] = None,
+        end: Annotated[
+            datetime | None,
+            Parameter(query="end", required=False, description="End of the window, the orbit end by default."),
+        ] = None,
+        max_points: Annotated[
+            int,
+            Parameter(query="maxPoints", ge=2, le=100_000, description="Maximum number of states returned."),
+        ] = 2000,
+    ) -> OrbitLevelOfDetail:
+        """Get the states of an orbit to plot it."""
+        db_obj = await orbit_service.get(orbit_id)
+        if db_obj.lod_file_name is None:
+            msg = "This orbit has no levels of detail."
+            raise ApplicationClientError(msg)
+        window_start = as_utc(start or db_obj.start)
+        window_end = as_utc(end or db_obj.end)
+        if window_end < window_start:
+            msg = "The end of the window must not be before its start."
+            raise ApplicationClientError(msg)
+        pyramid = EphemerisPyramid.open(UPLOADS / db_obj.lod_file_name)
+        level = pyramid.select(window_start.timestamp(), window_end.timestamp(), max_points)
+        return OrbitLevelOfDetail(
+            orbit_id=orbit_id,
+            step=level.step,
+            epochs=[datetime.fromtimestamp(timestamp, UTC) for timestamp in level.timestamps.tolist()],
+            states=level.states.tolist(),
+        )
+
     @post(
         operation_id="CreateOrbit",
         name="orbit:create",
@@ -136,6 +315,112 @@ class OrbitController(Controller):
     ) -> None:
         """Delete a orbit."""
         db_obj = await orbit_service.get(orbit_id)
+        get_ephemeris_cache().discard(db_obj.file_name)
         file_storage_service.remove(f"data/uploads/{db_obj.file_name}")
+        table_path = str(state_table_path(f"data/uploads/{db_obj.file_name}"))
+        if storage.get_fs().exists(table_path):
+            file_storage_service.remove(table_path)
+        if db_obj.chebyshev_file_name is not None:
+            file_storage_service.remove(f"data/uploads/{db_obj.chebyshev_file_name}")
+        if db_obj.lod_file_name is not None:
+            file_storage_service.remove(f"data/uploads/{db_obj.lod_file_name}")
 
         _ = await orbit_service.delete(orbit_id)
+
+
+class OrbitEnsembleController(Controller):
+    """Handles the interactions within the Orbit ensemble objects."""
+
+    guards = [requires_active_user]
+    dependencies = {
+        "orbit_ensemble_service": Provide(provide_orbit_ensemble_service),
+        "file_storage_service": Provide(provide_file_storage_service),
+    }
+    signature_namespace = {"OrbitEnsembleService": OrbitEnsembleService, "OrbitEnsemble": OrbitEnsemble}
+    tags = ["Orbit"]
+
+    @get(
+        operation_id="GetOrbitEnsemble",
+        name="orbit:ensemble:get",
+        path=urls.ORBIT_ENSEMBLE_DETAILS,
+        summary="Retrieve the details of an orbit ensemble.",
+        return_dto=OrbitEnsembleDTO,
+    )
+    async def get_orbit_ensemble(
+        self,
+        orbit_ensemble_service: OrbitEnsembleService,
+        ensemble_id: Annotated[
+            UUID,
+            Parameter(
+                title="Orbit ensemble ID",
+                description="The orbit ensemble to retrieve.",
+            ),
+        ],
+    ) -> OrbitEnsemble:
+        """Get an orbit ensemble."""
+        db_obj = await orbit_ensemble_service.get(ensemble_id)
+        return orbit_ensemble_service.to_schema(db_obj)
+
+    @get(
+        operation_id="GetOrbitEnsembleStatistics",
+        name="orbit:ensemble:statistics",
+        path=urls.ORBIT_ENSEMBLE_STATISTICS,
+        summary="Retrieve the statistics of an orbit ensemble.",
+        description="Mean, covariance and percentile envelopes of the ensemble samples over time.",
+    )
+    async def get_orbit_ensemble_statistics(
+        self,
+        orbit_ensemble_service: OrbitEnsembleService,
+        ensemble_id: Annotated[
+            UUID,
+            Parameter(
+                title="Orbit ensemble ID",
+                description="The orbit ensemble to retrieve the statistics of.",
+            ),
+        ],
+    ) -> OrbitEnsembleStatistics:
+        """Get the statistics of an orbit ensemble."""
+        db_obj = await orbit_ensemble_service.get(ensemble_id)
+        file_name = db_obj.file_name
+
+        def read() -> OrbitEnsembleStatistics:
+            content = storage.get_fs().cat_file(f"data/uploads/{file_name}")
+            with np.load(io.BytesIO(content)) as statistics:
+                return OrbitEnsembleStatistics(
+                    epochs=[datetime.fromisoformat(epoch) for epoch in statistics["epochs"]],
+                    percentiles=statistics["percentile_levels"].tolist(),
+                    mean=statistics["mean"].tolist(),
+                    covariance=statistics["covariance"].tolist(),
+                    percentile_states=statistics["percentiles"].tolist(),
+                    position_envelope=statistics["position_envelope"].tolist(),
+                )
+
+        # reading and converting the statistics of large ensembles blocks for a while
+        return await anyio.to_thread.run_sync(read)
+
+    @delete(
+        operation_id="DeleteOrbitEnsemble",
+        name="orbit:ensemble:delete",
+        path=urls.ORBIT_ENSEMBLE_DETAILS,
+        summary="Remove Orbit ensemble",
+        description="Removes an orbit ensemble and its statistics file",
+        guards=[requires_superuser],
+        return_dto=None,
+    )
+    async def delete_orbit_ensemble(
+        self,
+        orbit_ensemble_service: OrbitEnsembleService,
+        file_storage_service: FileStorageService,
+        ensemble_id: Annotated[
+            UUID,
+            Parameter(
+                title="Orbit ensemble ID",
+                description="The orbit ensemble to delete.",
+            ),
+        ],
+    ) -> None:
+        """Delete an orbit ensemble."""
+        db_obj = await orbit_ensemble_service.get(ensemble_id)
+        file_storage_service.remove(f"data/uploads/{db_obj.file_name}")
+
+        _ = await orbit_ensemble_service.delete(ensemble_id)
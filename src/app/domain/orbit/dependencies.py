@@ -1,15 +1,21 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
-from app.domain.orbit.services import OrbitService
+from litestar.params import Parameter
+
+from app.domain.orbit.repositories import ValidityFilter
+from app.domain.orbit.services import OrbitEnsembleService, OrbitService
+from app.lib.exceptions import ApplicationClientError
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
 
     from sqlalchemy.ext.asyncio import AsyncSession
 
-__all__ = ["provide_orbit_service"]
+    from app.lib.deps import DTorNone, UuidOrNone
+
+__all__ = ["provide_orbit_ensemble_service", "provide_orbit_service", "provide_orbit_validity_filter"]
 
 
 async def provide_orbit_service(
@@ -27,3 +33,48 @@ async def provide_orbit_service(
         session=db_session,
     ) as service:
         yield service
+
+
+async def provide_orbit_ensemble_service(
+    db_session: AsyncSession | None = None,
+) -> AsyncGenerator[OrbitEnsembleService, None]:
+    """Provide Orbit ensembles service.
+
+    Args:
+        db_session (AsyncSession | None, optional): current database session. Defaults to None.
+
+    Returns:
+        OrbitEnsembleService: An Orbit ensemble service object
+    """
+    async with OrbitEnsembleService.new(
+        session=db_session,
+    ) as service:
+        yield service
+
+
+def provide_orbit_validity_filter(
+    satellite_id: UuidOrNone = Parameter(query="satelliteId", default=None, required=False),
+    valid_from: DTorNone = Parameter(query="validFrom", default=None, required=False),
+    valid_to: DTorNone = Parameter(query="validTo", default=None, required=False),
+    validity: Literal["covers", "overlaps"] = Parameter(query="validity", default="covers", required=False),
+) -> ValidityFilter | None:
+    """Add a filter of the orbits by satellite and validity.
+
+    Args:
+        satellite_id (UuidOrNone): Filter for the orbits of a satellite.
+        valid_from (DTorNone): Start of the interval the orbits cover or overlap.
+        valid_to (DTorNone): End of the interval, the epoch ``valid_from`` if not given.
+        validity (Literal["covers", "overlaps"]): Whether the orbits cover or overlap the interval.
+
+    Returns:
+        ValidityFilter | None: Filter for the orbits of the satellite covering or overlapping the interval, if given.
+    """
+    if valid_from is None and valid_to is not None:
+        msg = "validTo requires validFrom."
+        raise ApplicationClientError(msg)
+    if valid_from is None and satellite_id is None:
+        return None
+    if valid_from is not None and valid_to is not None and valid_to < valid_from:
+        msg = "validTo must not be before validFrom."
+        raise ApplicationClientError(msg)
+    return ValidityFilter(valid_from, valid_to, satellite_id, validity)
@@ -1,18 +1,45 @@
 from advanced_alchemy.extensions.litestar.dto import SQLAlchemyDTO
 
-from app.db.models import IpfOrbit
+from app.db.models import IpfOrbit, OrbitEnsemble
 from app.lib import dto
 
-__all__ = ["OrbitCreateDTO", "OrbitDTO", "OrbitUpdateDTO"]
+__all__ = ["OrbitCreateDTO", "OrbitDTO", "OrbitEnsembleDTO", "OrbitUpdateDTO"]
 
 
 class OrbitDTO(SQLAlchemyDTO[IpfOrbit]):
-    config = dto.config(exclude={"created_at", "updated_at"})
+    config = dto.config(exclude={"created_at", "updated_at", "validity"})
 
 
 class OrbitCreateDTO(SQLAlchemyDTO[IpfOrbit]):
-    config = dto.config(exclude={"id", "created_at", "updated_at", "satellite"})
+    config = dto.config(
+        exclude={
+            "id",
+            "created_at",
+            "updated_at",
+            "satellite",
+            "content_hash",
+            "chebyshev_file_name",
+            "lod_file_name",
+            "validity",
+        },
+    )
 
 
 class OrbitUpdateDTO(SQLAlchemyDTO[IpfOrbit]):
-    config = dto.config(exclude={"id", "created_at", "updated_at", "satellite"}, partial=True)
+    config = dto.config(
+        exclude={
+            "id",
+            "created_at",
+            "updated_at",
+            "satellite",
+            "content_hash",
+            "chebyshev_file_name",
+            "lod_file_name",
+            "validity",
+        },
+        partial=True,
+    )
+
+
+class OrbitEnsembleDTO(SQLAlchemyDTO[OrbitEnsemble]):
+    config = dto.config(exclude={"created_at", "updated_at", "satellite"})
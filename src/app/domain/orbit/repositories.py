@@ -1,11 +1,89 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+from advanced_alchemy.filters import StatementFilter
 from advanced_alchemy.repository import SQLAlchemyAsyncRepository
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import Range
+
+from app.db.models import IpfOrbit, OrbitEnsemble
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from uuid import UUID
+
+    from advanced_alchemy.filters import StatementTypeT
+    from advanced_alchemy.repository import ModelT
+
+__all__ = ("OrbitEnsembleRepository", "OrbitRepository", "ValidityFilter")
+
+
+@dataclass
+class ValidityFilter(StatementFilter):
+    """Filter the orbits by their validity, with the GiST index on the satellite and the validity range.
+
+    The orbits either cover the whole closed interval ``[start, end]``, or overlap it. Without an
+    end, the interval is the single epoch ``start``. Without a start, only the satellite is filtered.
+    """
 
-from app.db.models import IpfOrbit
+    start: datetime | None = None
+    """Start of the interval."""
+    end: datetime | None = None
+    """End of the interval, the start by default."""
+    satellite_id: UUID | None = None
+    """Satellite of the orbits, any satellite by default."""
+    match: Literal["covers", "overlaps"] = "covers"
+    """Whether the orbits cover or overlap the interval."""
 
-__all__ = ("OrbitRepository",)
+    def append_to_statement(self, statement: StatementTypeT, model: type[ModelT]) -> StatementTypeT:
+        if self.start is not None:
+            validity = self._get_instrumented_attr(model, "validity")
+            interval = Range(self.start, self.end or self.start, bounds="[]")
+            condition = validity.contains(interval) if self.match == "covers" else validity.overlaps(interval)
+            statement = statement.where(condition)
+        if self.satellite_id is not None:
+            statement = statement.where(self._get_instrumented_attr(model, "satellite_id") == self.satellite_id)
+        return statement
 
 
 class OrbitRepository(SQLAlchemyAsyncRepository[IpfOrbit]):
     model_type = IpfOrbit
+
+    async def list_covering(self, satellite_id: UUID, start: datetime, end: datetime | None = None) -> list[IpfOrbit]:
+        """List the orbits of a satellite covering an epoch, or the whole interval ``[start, end]``."""
+        return list(await self.list(ValidityFilter(start, end, satellite_id)))
+
+    async def get_best_covering(
+        self,
+        satellite_id: UUID,
+        start: datetime,
+        end: datetime | None = None,
+    ) -> IpfOrbit | None:
+        """Return the best orbit of a satellite covering an epoch, or the whole interval ``[start, end]``.
+
+        The best orbit is the latest one created, which supersedes the older orbits of the same span.
+        """
+        statement = ValidityFilter(start, end, satellite_id).append_to_statement(
+            select(IpfOrbit).order_by(IpfOrbit.created_at.desc()).limit(1),
+            IpfOrbit,
+        )
+        return (await self.session.execute(statement)).scalars().first()
+
+    async def get_by_content_hash(self, content_hash: str) -> IpfOrbit | None:
+        """Return the latest orbit saved for a propagation content hash.
+
+        The hash is not unique, identical propagations running at the same time may both save their orbit.
+        """
+        statement = (
+            select(IpfOrbit)
+            .where(IpfOrbit.content_hash == content_hash)
+            .order_by(IpfOrbit.created_at.desc())
+            .limit(1)
+        )
+        return (await self.session.execute(statement)).scalars().first()
+
+
+class OrbitEnsembleRepository(SQLAlchemyAsyncRepository[OrbitEnsemble]):
+    model_type = OrbitEnsemble
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 from uuid import UUID
 
 from msgspec import Meta
@@ -20,3 +20,62 @@ class TLEOrbitCreate(CamelizedBaseStruct):
     start: Annotated[datetime, Meta(description="Start of validity of TLE")]
     end: Annotated[datetime, Meta(description="End of validity of TLE")]
     satellite: Annotated[UUID, Meta(description="Satellite id", examples=["fae33a8d-f73a-4772-b1f1-b422fce525cb"])]
+
+
+class OrbitEnsembleStatistics(CamelizedBaseStruct):
+    epochs: Annotated[list[datetime], Meta(description="Epochs of the statistics.")]
+    percentiles: Annotated[list[float], Meta(description="Percentiles of the envelopes.")]
+    mean: Annotated[
+        list[list[float]],
+        Meta(description="Mean ICRF state per epoch, in km and km/s."),
+    ]
+    covariance: Annotated[
+        list[list[list[float]]],
+        Meta(description="6x6 covariance of the ICRF state per epoch, in km and km/s."),
+    ]
+    percentile_states: Annotated[
+        list[list[list[float]]],
+        Meta(description="Per percentile, the percentile of every ICRF state component per epoch."),
+    ]
+    position_envelope: Annotated[
+        list[list[float]],
+        Meta(description="Per percentile, the percentile of the distance to the mean position per epoch, in km."),
+    ]
+
+
+class OrbitStatesQuery(CamelizedBaseStruct):
+    frame: Annotated[
+        Literal["ICRF", "ITRF", "TEME"],
+        Meta(description="Axes of the Earth centred states."),
+    ] = "ICRF"
+    epochs: Annotated[
+        list[datetime] | None,
+        Meta(description="Epochs of the states, within the span of the orbit. Naive epochs are taken as UTC."),
+    ] = None
+    start: Annotated[datetime | None, Meta(description="Start of the epoch grid, when no epochs are given.")] = None
+    end: Annotated[datetime | None, Meta(description="End of the epoch grid, included if on the grid.")] = None
+    step: Annotated[
+        Annotated[float, Meta(gt=0)] | None,
+        Meta(description="Step of the epoch grid in seconds."),
+    ] = None
+
+
+class OrbitStates(CamelizedBaseStruct):
+    orbit_id: Annotated[UUID, Meta(description="The queried orbit.")]
+    frame: Annotated[str, Meta(description="Axes of the states.")]
+    source: Annotated[
+        Literal["chebyshev", "table", "ipf"],
+        Meta(description="Whether the states come from the Chebyshev ephemeris, the state table or the IPF file."),
+    ]
+    epochs: Annotated[list[datetime], Meta(description="Epochs of the states.")]
+    states: Annotated[list[list[float]], Meta(description="Earth centred state per epoch, in km and km/s.")]
+
+
+class OrbitLevelOfDetail(CamelizedBaseStruct):
+    orbit_id: Annotated[UUID, Meta(description="The plotted orbit.")]
+    step: Annotated[
+        float,
+        Meta(description="Step of the selected level in seconds, 0 for the extrema of every revolution."),
+    ]
+    epochs: Annotated[list[datetime], Meta(description="Epochs of the states.")]
+    states: Annotated[list[list[float]], Meta(description="ICRF state per epoch, in km and km/s.")]
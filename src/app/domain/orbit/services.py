@@ -1,11 +1,15 @@
 from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService
 
-from app.db.models import IpfOrbit
+from app.db.models import IpfOrbit, OrbitEnsemble
 
-from .repositories import OrbitRepository
+from .repositories import OrbitEnsembleRepository, OrbitRepository
 
-__all__ = ("OrbitService",)
+__all__ = ("OrbitEnsembleService", "OrbitService")
 
 
 class OrbitService(SQLAlchemyAsyncRepositoryService[IpfOrbit]):
     repository_type = OrbitRepository
+
+
+class OrbitEnsembleService(SQLAlchemyAsyncRepositoryService[OrbitEnsemble]):
+    repository_type = OrbitEnsembleRepository
@@ -3,3 +3,8 @@ ORBIT_CREATE = "/api/orbits"
 ORBIT_UPDATE = "/api/orbits/{orbit_id:uuid}"
 ORBIT_DELETE = "/api/orbits/{orbit_id:uuid}"
 ORBIT_DETAILS = "/api/orbits/{orbit_id:uuid}"
+ORBIT_CHEBYSHEV = "/api/orbits/{orbit_id:uuid}/chebyshev"
+ORBIT_STATES = "/api/orbits/{orbit_id:uuid}/states"
+ORBIT_LOD = "/api/orbits/{orbit_id:uuid}/lod"
+ORBIT_ENSEMBLE_DETAILS = "/api/orbits/ensembles/{ensemble_id:uuid}"
+ORBIT_ENSEMBLE_STATISTICS = "/api/orbits/ensembles/{ensemble_id:uuid}/statistics"
@@ -1,3 +1,3 @@
-from . import controllers, urls
+from . import schemas, tasks, urls
 
-__all__ = ["controllers", "urls"]
+__all__ = ["schemas", "tasks", "urls"]
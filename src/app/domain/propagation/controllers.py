@@ -1,105 +1,71 @@
-from datetime import datetime
-from tempfile import NamedTemporaryFile
-from typing import Any
+from datetime import timedelta
 from uuid import UUID, uuid4
 
-from godot import cosmos
-from godot.core import ipfwrap
+import anyio
+import msgspec
+import numpy as np
+from advanced_alchemy.filters import LimitOffset, OrderBy
 from godot.core.tempo import Epoch
-from litestar import post
+from litestar import get, post
 from litestar.controller import Controller
-from litestar.datastructures import UploadFile
 from litestar.di import Provide
 from litestar.dto import MsgspecDTO
+from litestar.exceptions import NotFoundException
+from litestar.response import ServerSentEvent
 from litestar_saq.config import TaskQueues
+from sqlalchemy import or_
 from structlog import get_logger
 
-from app.config.app import alchemy
+from app.config.base import get_settings
+from app.db.models import TLE, IpfOrbit, Satellite
 from app.domain.accounts.guards import requires_active_user
+from app.domain.orbit.dependencies import provide_orbit_service
 from app.domain.orbit.services import OrbitService
 from app.domain.propagation import urls
 from app.domain.propagation.schemas import (
+    AnalyticalPropagationInput,
+    AnalyticalPropagationResult,
+    BatchJobRequest,
     JobRequest,
+    PropagationBatchInput,
+    PropagationEnsembleInput,
+    PropagationEnsembleResult,
+    PropagationExtensionInput,
     PropagationInput,
     PropagationResult,
     return_propagation_template,
 )
+from app.domain.propagation.tasks import (
+    convert_godot_epoch_to_datetime,
+    extension_job_key,
+    propagation_job_key,
+    propagation_key,
+)
 from app.domain.satellite.dependencies import provide_satellite_service
 from app.domain.satellite.services import SatelliteService
+from app.domain.tle.services import TLEService
+from app.flight_dynamics.j2 import propagate_j2
+from app.flight_dynamics.sgp4 import Sgp4, TleElements
+from app.flight_dynamics.utils.convert import state_to_keplerian
+from app.lib.deps import create_service_provider
 from app.lib.exceptions import ApplicationClientError
 from app.lib.fdy import get_dynamics_config
-from app.lib.storage_service import FileStorageService
+from app.lib.job_progress import job_events
 from app.lib.universe_assembler import uni_config as uni_basic
 
 logger = get_logger()
 
 
-def convert_godot_epoch_to_datetime(godot_epoch: Epoch) -> datetime:
-    return datetime.fromisoformat(godot_epoch.calStr("UTC")[:-4] + "Z")
-
-
-# simple file data store for now
-async def propagate_and_save(
-    ctx: Any,
-    *,
-    tra_config: dict,
-    uni_config: dict,
-) -> None:
-    try:
-        uni = cosmos.Universe(uni_config)
-        tra = cosmos.Trajectory(uni, tra_config)
-        tra.compute(False)
-
-    except Exception:
-        logger.exception("An error occurred during propagation.")
-        raise
-    # with tempfile.NamedTemporaryFile() as f:
-    # id of the Earth as center of the ephemerides, according to the IMSORB body identification scheme
-    earth_id = 3
-
-    file_header = [0, earth_id, 1, 0, 0, 0, 0, 0]
-    with NamedTemporaryFile() as f:
-        ipf_writer = ipfwrap.IpfWriter(
-            f.name,
-            dimension=6,  # 6 state elements (position and velocity)
-            derivatives=0,  # the ephemerides don't provide derivatives
-            fileType=1,  # indicates that this is an orbit interpolation file
-            blockHeaderSize=2,  # required block size for orbit interpolation files
-            fileHeader=file_header,
-        )
-        cosmos.writeIpf(ipf_writer, uni, tra, tra_config["setup"][0]["name"] + "_center", "ICRF", {"Earth": earth_id})
-        del ipf_writer
-        file_name = str(uuid4()) + ".ipf"
-
-        async with FileStorageService.new(
-            uploads_dir="data/uploads",
-            allow_extensions=["ipf"],
-        ) as file_storage_service:
-            up_file = UploadFile("bytes", file_name, f.read())
-            await file_storage_service.upload([up_file])
-
-        async with (
-            alchemy.get_session() as db_session,
-            OrbitService.new(
-                session=db_session,
-            ) as orbit_service,
-        ):
-            _ = await orbit_service.create(
-                data={
-                    "file_name": file_name,
-                    "start": convert_godot_epoch_to_datetime(Epoch(tra_config["timeline"][0]["epoch"])),
-                    "end": convert_godot_epoch_to_datetime(Epoch(tra_config["timeline"][1]["point"]["epoch"])),
-                    "satellite_id": str(UUID(hex=tra_config["setup"][0]["name"])),
-                },
-                auto_commit=True,
-                auto_refresh=True,
-            )
+def job_events_location(job_key: str) -> str:
+    return urls.PROPAGATION_JOB_EVENTS.replace("{job_key:str}", job_key).lstrip("/")
 
 
 class PropagationController(Controller):
     guards = [requires_active_user]
     dependencies = {
         "satellite_service": Provide(provide_satellite_service),
+        "orbit_service": Provide(provide_orbit_service),
+        "tle_service": create_service_provider(TLEService),
     }
     tags = ["Propagation"]
 
@@ -108,7 +74,9 @@ class PropagationController(Controller):
         name="propagate:request",
         summary="Request numerical orbit propagation",
         description="Submit an orbit propagation request using the numerical GODOT orbit propagator.\
-              The result will be saved as a .ipf file.",
+              The result will be saved as a .ipf file. When an identical propagation was already computed\
+              with the current environment files, the stored orbit is returned instead, and identical requests\
+              in progress share the same job.",
         guards=[requires_active_user],
         path=urls.PROPAGATION_REQUEST,
         # dto=MsgspecDTO[],
@@ -117,25 +85,340 @@ class PropagationController(Controller):
     async def create_propagation_request(
         self,
         satellite_service: SatelliteService,
+        orbit_service: OrbitService,
         # file_storage_service: FileStorageService,
         data: PropagationInput,
         task_queues: TaskQueues,
     ) -> JobRequest:
         satellite = await satellite_service.get(data.satellite_id)
 
-        uni_config = uni_basic | get_dynamics_config(satellite.dynamics, satellite)
+        uni_config = uni_basic | get_dynamics_config(satellite.dynamics, satellite, data.fidelity)
 
-        tra_config = return_propagation_template(data)
+        # the spacecraft name is unique per job, as trajectories register their points in the pooled universe
+        tra_config = return_propagation_template(data, sc_name=uuid4().hex)
+
+        content_hash = propagation_key(str(satellite.id), tra_config, uni_config)
+        job_key = propagation_job_key(content_hash)
+        orbit = await orbit_service.repository.get_by_content_hash(content_hash)
+        if orbit is not None:
+            return JobRequest(queue_id=UUID(job_key), location=f"api/orbits/{orbit.id}", orbit_id=orbit.id)
 
         queue = task_queues.get("Orbit propagation queue")
         job = await queue.enqueue(
             "propagate_and_save",
+            key=job_key,
+            satellite_id=str(satellite.id),
             tra_config=tra_config,
             uni_config=uni_config,
+            content_hash=content_hash,
+            fidelity=data.fidelity,
+            timeout=get_settings().saq.PROPAGATION_TIMEOUT,
+            retries=get_settings().saq.PROPAGATION_RETRIES,
         )
+        if job is None:
+            # an identical propagation is in progress, share its job
+            job = await queue.job(job_key)
 
         if job is None:
             msg = "Failed to enqueue the propagation job."
             raise ApplicationClientError(msg)
 
-        return JobRequest(queue_id=UUID(job.key), location=f"saq/api/queues/{job.id}")
+        return JobRequest(
+            queue_id=UUID(job.key),
+            location=f"saq/api/queues/{job.id}",
+            events=job_events_location(job.key),
+        )
+
+    @post(
+        operation_id="CreatePropagationBatchRequest",
+        name="propagate:batch",
+        summary="Request numerical orbit propagation of several satellites",
+        description="Submit one orbit propagation request for a list of satellites and/or all active satellites\
+              of a group over a common time span. The propagations are spread over the propagation workers\
+              and the batch job result aggregates the resulting orbits.",
+        guards=[requires_active_user],
+        path=urls.PROPAGATION_BATCH_REQUEST,
+    )
+    async def create_propagation_batch_request(
+        self,
+        satellite_service: SatelliteService,
+        orbit_service: OrbitService,
+        data: PropagationBatchInput,
+        task_queues: TaskQueues,
+    ) -> BatchJobRequest:
+        states = {state.satellite_id: state for state in data.satellites}
+        if not states and data.group is None:
+            msg = "Provide satellites and/or a satellite group to propagate."
+            raise ApplicationClientError(msg)
+
+        conditions = [Satellite.id.in_(list(states))]
+        if data.group is not None:
+            conditions.append((Satellite.group == data.group) & Satellite.is_active)
+        satellites = await satellite_service.list(or_(*conditions))
+
+        missing = set(states) - {satellite.id for satellite in satellites}
+        if missing:
+            msg = f"Unknown satellites: {', '.join(str(satellite_id) for satellite_id in missing)}."
+            raise ApplicationClientError(msg)
+
+        # satellites without an explicit initial state start from their latest orbit covering the start epoch
+        start = convert_godot_epoch_to_datetime(Epoch(data.epoch_start))
+        latest_orbits: dict[UUID, IpfOrbit] = {}
+        without_state = [satellite.id for satellite in satellites if satellite.id not in states]
+        if without_state:
+            orbits = await orbit_service.list(
+                IpfOrbit.satellite_id.in_(without_state),
+                IpfOrbit.start <= start,
+                IpfOrbit.end > start,
+            )
+            for orbit in sorted(orbits, key=lambda o: o.created_at):
+                latest_orbits[orbit.satellite_id] = orbit
+
+        items: list[dict] = []
+        skipped: list[UUID] = []
+        for satellite in satellites:
+            item = {
+                "satellite_id": str(satellite.id),
+                "uni_config": uni_basic | get_dynamics_config(satellite.dynamics, satellite, data.fidelity),
+                "fidelity": data.fidelity,
+            }
+            if satellite.id in states:
+                state = states[satellite.id]
+                item["tra_config"] = return_propagation_template(
+                    PropagationInput(
+                        satellite_id=satellite.id,
+                        initial_orbit=state.initial_orbit,
+                        initial_mass=state.initial_mass,
+                        epoch_start=data.epoch_start,
+                        epoch_end=data.epoch_end,
+                        fidelity=data.fidelity,
+                    ),
+                    sc_name=uuid4().hex,
+                )
+            elif satellite.id in latest_orbits:
+                item["orbit_file_name"] = latest_orbits[satellite.id].file_name
+                item["initial_mass"] = satellite.dry_mass
+            else:
+                skipped.append(satellite.id)
+                continue
+            items.append(item)
+
+        if not items:
+            msg = "None of the requested satellites has an initial state to propagate from."
+            raise ApplicationClientError(msg)
+
+        queue = task_queues.get("Orbit propagation batch queue")
+        job = await queue.enqueue(
+            "propagate_batch",
+            epoch_start=data.epoch_start,
+            epoch_end=data.epoch_end,
+            items=items,
+            timeout=None,
+        )
+
+        if job is None:
+            msg = "Failed to enqueue the batch propagation job."
+            raise ApplicationClientError(msg)
+
+        return BatchJobRequest(
+            queue_id=UUID(job.key),
+            location=f"saq/api/queues/{job.id}",
+            events=job_events_location(job.key),
+            satellite_ids=[UUID(item["satellite_id"]) for item in items],
+            skipped_satellite_ids=skipped,
+        )
+
+    @post(
+        operation_id="CreatePropagationEnsembleRequest",
+        name="propagate:ensemble",
+        summary="Request a Monte Carlo orbit propagation",
+        description="Submit a dispersion analysis around a nominal propagation request. The initial state, drag and SRP\
+              coefficients and mass are sampled around their nominal values and propagated in a process pool.\
+              Only the mean, covariance and percentile envelopes of the samples over time are saved.",
+        guards=[requires_active_user],
+        path=urls.PROPAGATION_ENSEMBLE_REQUEST,
+        return_dto=MsgspecDTO[PropagationEnsembleResult],
+    )
+    async def create_propagation_ensemble_request(
+        self,
+        satellite_service: SatelliteService,
+        data: PropagationEnsembleInput,
+        task_queues: TaskQueues,
+    ) -> JobRequest:
+        max_samples = get_settings().fdy.ENSEMBLE_MAX_SAMPLES
+        if data.samples > max_samples:
+            msg = f"An ensemble holds at most {max_samples} samples."
+            raise ApplicationClientError(msg)
+        if any(not 0 <= percentile <= 100 for percentile in data.percentiles):
+            msg = "Percentiles must be between 0 and 100."
+            raise ApplicationClientError(msg)
+
+        satellite = await satellite_service.get(data.satellite_id)
+
+        queue = task_queues.get("Orbit propagation queue")
+        job = await queue.enqueue(
+            "propagate_ensemble",
+            satellite_id=str(satellite.id),
+            tra_config=return_propagation_template(data, sc_name=uuid4().hex),
+            uni_config=uni_basic | get_dynamics_config(satellite.dynamics, satellite, data.fidelity),
+            drag_coefficient=satellite.drag_coefficient,
+            srp_coefficient=satellite.srp_coefficient,
+            mass=data.initial_mass,
+            samples=data.samples,
+            dispersion=msgspec.structs.asdict(data.dispersion),
+            step=data.step,
+            percentiles=data.percentiles,
+            seed=data.seed,
+            fidelity=data.fidelity,
+            timeout=None,
+        )
+
+        if job is None:
+            msg = "Failed to enqueue the ensemble propagation job."
+            raise ApplicationClientError(msg)
+
+        return JobRequest(
+            queue_id=UUID(job.key),
+            location=f"saq/api/queues/{job.id}",
+            events=job_events_location(job.key),
+        )
+
+    @post(
+        operation_id="CreatePropagationExtensionRequest",
+        name="propagate:extend",
+        summary="Request the extension of an orbit",
+        description="Extend a stored orbit up to a new end epoch. Only the new interval is propagated, starting from\
+              the final state of the stored orbit and using the satellite dynamics. The extension is saved as a new\
+              orbit referencing the extended one as its parent.",
+        guards=[requires_active_user],
+        path=urls.PROPAGATION_EXTENSION_REQUEST,
+        return_dto=MsgspecDTO[PropagationResult],
+    )
+    async def create_propagation_extension_request(
+        self,
+        orbit_service: OrbitService,
+        data: PropagationExtensionInput,
+        task_queues: TaskQueues,
+    ) -> JobRequest:
+        orbit = await orbit_service.get(data.orbit_id)
+        if convert_godot_epoch_to_datetime(Epoch(data.epoch_end)) <= orbit.end:
+            msg = "The new end epoch must be after the end of the orbit."
+            raise ApplicationClientError(msg)
+
+        satellite = orbit.satellite
+        fidelity = data.fidelity or orbit.fidelity or "operational"
+        uni_config = uni_basic | get_dynamics_config(satellite.dynamics, satellite, fidelity)
+        initial_mass = data.initial_mass if data.initial_mass is not None else satellite.dry_mass
+        # identical extensions in progress share the same job
+        job_key = extension_job_key(str(orbit.id), data.epoch_end, uni_config, initial_mass, fidelity)
+        queue = task_queues.get("Orbit propagation queue")
+        job = await queue.enqueue(
+            "extend_orbit",
+            key=job_key,
+            orbit_id=str(orbit.id),
+            epoch_end=data.epoch_end,
+            uni_config=uni_config,
+            initial_mass=initial_mass,
+            fidelity=fidelity,
+            timeout=get_settings().saq.PROPAGATION_TIMEOUT,
+            retries=get_settings().saq.PROPAGATION_RETRIES,
+        )
+        if job is None:
+            job = await queue.job(job_key)
+
+        if job is None:
+            msg = "Failed to enqueue the orbit extension job."
+            raise ApplicationClientError(msg)
+
+        return JobRequest(
+            queue_id=UUID(job.key),
+            location=f"saq/api/queues/{job.id}",
+            events=job_events_location(job.key),
+        )
+
+    @post(
+        operation_id="CreateAnalyticalPropagation",
+        name="propagate:analytical",
+        summary="Propagate an orbit analytically",
+        description="Propagate a satellite with an analytical model and return the states directly, without queueing\
+              a job. SGP4 propagates the latest TLE of the satellite, J2 applies the secular drift of the Earth\
+              oblateness to the given initial orbit. Both answer in milliseconds for spans of weeks, at the\
+              accuracy of a quick-look.",
+        guards=[requires_active_user],
+        path=urls.PROPAGATION_ANALYTICAL,
+    )
+    async def create_analytical_propagation(
+        self,
+        satellite_service: SatelliteService,
+        tle_service: TLEService,
+        data: AnalyticalPropagationInput,
+    ) -> AnalyticalPropagationResult:
+        satellite = await satellite_service.get(data.satellite_id)
+
+        start = convert_godot_epoch_to_datetime(Epoch(data.epoch_start))
+        duration = (convert_godot_epoch_to_datetime(Epoch(data.epoch_end)) - start).total_seconds()
+        if duration <= 0:
+            msg = "The end epoch must be after the start epoch."
+            raise ApplicationClientError(msg)
+        max_points = get_settings().fdy.ANALYTICAL_MAX_POINTS
+        if duration / data.step + 1 > max_points:
+            msg = f"An analytical propagation returns at most {max_points} epochs, increase the step."
+            raise ApplicationClientError(msg)
+        seconds = np.arange(0.0, duration, data.step)
+        seconds = np.append(seconds, duration) if seconds[-1] < duration else seconds
+
+        tle = None
+        if data.model == "sgp4":
+            tles = await tle_service.list(
+                OrderBy(field_name="epoch", sort_order="desc"),
+                LimitOffset(limit=1, offset=0),
+                TLE.satellite_id == satellite.id,
+            )
+            if not tles:
+                msg = "The satellite has no TLE to propagate."
+                raise ApplicationClientError(msg)
+            tle = tles[0]
+        elif data.initial_orbit is None:
+            msg = "The J2 model propagates an initial orbit."
+            raise ApplicationClientError(msg)
+
+        def propagate() -> AnalyticalPropagationResult:
+            try:
+                if tle is not None:
+                    propagator = Sgp4(TleElements.from_lines([(tle.line1, tle.line2)]))
+                    offset = (start - propagator.elements.epoch[0]).total_seconds()
+                    position, velocity = propagator.propagate((seconds + offset) / 60)
+                    states, frame = np.hstack([position[0], velocity[0]]), "TEME"
+                else:
+                    states, frame = propagate_j2(state_to_keplerian(data.initial_orbit), seconds), "ICRF"
+            except ValueError as e:
+                raise ApplicationClientError(str(e)) from e
+            return AnalyticalPropagationResult(
+                satellite_id=satellite.id,
+                model=data.model,
+                frame=frame,
+                epochs=[start + timedelta(seconds=second) for second in seconds.tolist()],
+                states=states.tolist(),
+                tle_id=tle.id if tle is not None else None,
+            )
+
+        # up to ANALYTICAL_MAX_POINTS states and their conversion, off the event loop
+        return await anyio.to_thread.run_sync(propagate)
+
+    @get(
+        operation_id="StreamPropagationJobEvents",
+        name="propagate:events",
+        summary="Stream the status of a propagation job",
+        description="Server-sent events stream pushing the status and progress of a propagation job every time it\
+              changes: the completed fraction, the current stage, the epoch reached by the integration and the\
+              estimated remaining time. The stream ends once the job is complete, failed or aborted, its last\
+              event holding the result or the error.",
+        guards=[requires_active_user],
+        path=urls.PROPAGATION_JOB_EVENTS,
+    )
+    async def stream_propagation_job_events(self, task_queues: TaskQueues, job_key: str) -> ServerSentEvent:
+        for name in ("Orbit propagation queue", "Orbit propagation batch queue"):
+            queue = task_queues.get(name)
+            if await queue.job(job_key) is not None:
+                return ServerSentEvent(job_events(queue, job_key))
+        raise NotFoundException(detail=f"No propagation job {job_key}.")
@@ -1,9 +1,12 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Literal
 from uuid import UUID
 
+import msgspec
 from msgspec import Meta
 
 from app.flight_dynamics.schemas.states import StateCart, StateCirc, StateKep
+from app.lib.fdy import Fidelity, get_integrator_settings
 from app.lib.schema import CamelizedBaseStruct
 
 UnionType = StateCart | StateKep | StateCirc
@@ -12,6 +15,14 @@ UnionType = StateCart | StateKep | StateCirc
 class JobRequest(CamelizedBaseStruct):
     location: Annotated[str, Meta(description="Location to check the status of the request.")]
     queue_id: Annotated[UUID, Meta(description="Queue id for the request.")]
+    orbit_id: Annotated[
+        UUID | None,
+        Meta(description="The stored orbit, when an identical propagation was already computed."),
+    ] = None
+    events: Annotated[
+        str | None,
+        Meta(description="Location of the server-sent events stream of the job status and progress."),
+    ] = None
 
 
 class PropagationInput(CamelizedBaseStruct):
@@ -20,6 +31,92 @@ class PropagationInput(CamelizedBaseStruct):
     initial_mass: float
     epoch_start: str
     epoch_end: str
+    fidelity: Annotated[
+        Fidelity,
+        Meta(
+            description="Fidelity profile, setting the integrator tolerance and the cap on the gravity field degree\
+                and order.",
+        ),
+    ] = "operational"
+
+
+class BatchSatelliteState(CamelizedBaseStruct):
+    satellite_id: UUID
+    initial_orbit: UnionType
+    initial_mass: float
+
+
+class PropagationBatchInput(CamelizedBaseStruct):
+    epoch_start: str
+    epoch_end: str
+    satellites: Annotated[
+        list[BatchSatelliteState],
+        Meta(description="Satellites to propagate, with their initial state at the start epoch."),
+    ] = []
+    group: Annotated[
+        str | None,
+        Meta(
+            description="Propagate all active satellites of this group as well. Satellites without an explicit\
+                initial state start from their latest orbit covering the start epoch.",
+        ),
+    ] = None
+    fidelity: Annotated[
+        Fidelity,
+        Meta(
+            description="Fidelity profile, setting the integrator tolerance and the cap on the gravity field degree\
+                and order.",
+        ),
+    ] = "operational"
+
+
+class BatchJobRequest(JobRequest, kw_only=True):
+    satellite_ids: Annotated[list[UUID], Meta(description="Satellites included in the batch.")]
+    skipped_satellite_ids: Annotated[
+        list[UUID],
+        Meta(description="Satellites without an initial state nor an orbit covering the start epoch."),
+    ]
+
+
+class PropagationExtensionInput(CamelizedBaseStruct):
+    orbit_id: Annotated[UUID, Meta(description="The orbit to extend.")]
+    epoch_end: Annotated[str, Meta(description="The new end epoch of the orbit.")]
+    initial_mass: Annotated[
+        float | None,
+        Meta(description="Mass at the end of the extended orbit in kg. Defaults to the satellite dry mass."),
+    ] = None
+    fidelity: Annotated[
+        Fidelity | None,
+        Meta(description="Fidelity profile of the extension. Defaults to the profile of the extended orbit."),
+    ] = None
+
+
+class EnsembleDispersion(CamelizedBaseStruct):
+    position_sigma: Annotated[float, Meta(description="Standard deviation of each position component in m.", ge=0)]
+    velocity_sigma: Annotated[float, Meta(description="Standard deviation of each velocity component in m/s.", ge=0)]
+    drag_coefficient_sigma: Annotated[
+        float,
+        Meta(description="Standard deviation of the drag coefficient.", ge=0),
+    ] = 0.0
+    srp_coefficient_sigma: Annotated[float, Meta(description="Standard deviation of the SRP coefficient.", ge=0)] = 0.0
+    mass_sigma: Annotated[float, Meta(description="Standard deviation of the mass in kg.", ge=0)] = 0.0
+
+
+class PropagationEnsembleInput(PropagationInput, kw_only=True):
+    dispersion: EnsembleDispersion
+    samples: Annotated[int, Meta(description="Number of samples, including the nominal one.", ge=2)] = 100
+    step: Annotated[float, Meta(description="Step of the output statistics in seconds.", gt=0)] = 60.0
+    percentiles: Annotated[
+        list[float],
+        Meta(description="Percentiles of the envelopes, between 0 and 100."),
+    ] = msgspec.field(default_factory=lambda: [5.0, 50.0, 95.0])
+    seed: Annotated[int | None, Meta(description="Seed of the random generator, for reproducible ensembles.")] = None
+
+
+class PropagationEnsembleResult(CamelizedBaseStruct):
+    ensemble_id: UUID
+    satellite_id: UUID
+    samples: int
+    execution_duration: float
 
 
 class PropagationResult(CamelizedBaseStruct):
@@ -28,9 +125,37 @@ class PropagationResult(CamelizedBaseStruct):
     execution_duration: float
 
 
-def return_propagation_template(propagation_input: PropagationInput) -> dict:
-    sc_name = propagation_input.satellite_id.hex
+class AnalyticalPropagationInput(CamelizedBaseStruct):
+    satellite_id: UUID
+    epoch_start: str
+    epoch_end: str
+    step: Annotated[float, Meta(description="Step of the output epochs in seconds.", gt=0)] = 60.0
+    model: Annotated[
+        Literal["sgp4", "j2"],
+        Meta(
+            description="Analytical model: SGP4 from the latest TLE of the satellite, or the secular J2 drift of the\
+                initial orbit.",
+        ),
+    ] = "sgp4"
+    initial_orbit: Annotated[
+        UnionType | None,
+        Meta(description="Initial orbit at the start epoch, in the Earth centred ICRF. Required by the J2 model."),
+    ] = None
+
+
+class AnalyticalPropagationResult(CamelizedBaseStruct):
+    satellite_id: UUID
+    model: str
+    frame: Annotated[str, Meta(description="Frame of the states: TEME for SGP4, ICRF for J2.")]
+    epochs: Annotated[list[datetime], Meta(description="UTC output epochs.")]
+    states: Annotated[list[list[float]], Meta(description="Cartesian states in km and km/s.")]
+    tle_id: Annotated[UUID | None, Meta(description="The TLE propagated by SGP4.")] = None
+
+
+def return_propagation_template(propagation_input: PropagationInput, sc_name: str | None = None) -> dict:
+    sc_name = sc_name or propagation_input.satellite_id.hex
     return {
+        "settings": get_integrator_settings(propagation_input.fidelity),
         "setup": [
             {
                 "name": sc_name,
@@ -0,0 +1,435 @@
+import asyncio
+import hashlib
+import io
+import json
+import time
+from datetime import datetime
+from tempfile import NamedTemporaryFile
+from typing import Any
+from uuid import UUID, uuid4
+
+import numpy as np
+from godot.core.tempo import Epoch
+from litestar.datastructures import UploadFile
+from saq.job import Status
+from saq.types import Context
+from structlog import get_logger
+
+from app.config.app import alchemy
+from app.config.base import get_settings
+from app.domain.propagation.schemas import PropagationInput, return_propagation_template
+from app.flight_dynamics import ensemble
+from app.flight_dynamics.propagation import initial_state_from_orbit, propagate_to_ipf
+from app.flight_dynamics.pyramid import build_pyramid
+from app.lib.job_progress import JobProgress
+from app.lib.process_pool import run_in_process
+from app.lib.storage_service import FileStorageService
+from app.lib.universe_pool import environment_fingerprint
+
+__all__ = ["extend_orbit", "propagate_and_save", "propagate_batch", "propagate_ensemble", "propagation_key"]
+
+logger = get_logger()
+
+_runtime_per_day: dict[str, float] = {}
+"""Moving average of the integration runtime in seconds per propagated day, by fidelity profile.
+
+Per worker process, it estimates the progress of integrations, which report none themselves.
+"""
+
+
+def convert_godot_epoch_to_datetime(godot_epoch: Epoch) -> datetime:
+    return datetime.fromisoformat(godot_epoch.calStr("UTC")[:-4] + "Z")
+
+
+def convert_datetime_to_godot_epoch(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f") + " UTC"
+
+
+def propagation_key(satellite_id: str, tra_config: dict, uni_config: dict) -> str:
+    """Return the content hash identifying the result of a propagation.
+
+    The hash covers the trajectory configuration, with its per-job spacecraft name normalized,
+    the universe configuration and the version of the environment files the universe is built
+    from, so a refresh of these files yields a new key.
+
+    Args:
+        satellite_id: The propagated satellite.
+        tra_config: The GODOT trajectory configuration.
+        uni_config: The GODOT universe configuration.
+
+    Returns:
+        The hex encoded SHA-256 digest.
+    """
+    sc_name = tra_config["setup"][0]["name"]
+    content = {
+        "satellite_id": satellite_id,
+        "trajectory": json.loads(json.dumps(tra_config).replace(sc_name, "spacecraft")),
+        "universe": uni_config,
+        "environment": environment_fingerprint(uni_config),
+    }
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def propagation_job_key(content_hash: str) -> str:
+    """Return the SAQ job key of a propagation, identical requests share the same job."""
+    return str(UUID(hex=content_hash[:32]))
+
+
+def extension_job_key(orbit_id: str, epoch_end: str, uni_config: dict, initial_mass: float, fidelity: str) -> str:
+    """Return the SAQ job key of an orbit extension, identical extensions share the same job.
+
+    The initial state of an extension is interpolated from the extended orbit, so the key covers
+    every input of the job, and the version of the environment files as :func:`propagation_key`.
+    """
+    content = {
+        "orbit_id": orbit_id,
+        "epoch_end": epoch_end,
+        "universe": uni_config,
+        "initial_mass": initial_mass,
+        "fidelity": fidelity,
+        "environment": environment_fingerprint(uni_config),
+    }
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return propagation_job_key(hashlib.sha256(canonical.encode()).hexdigest())
+
+
+def _record_runtime(fidelity: str, runtime: float, days: float) -> None:
+    if days <= 0:
+        return
+    rate = runtime / days
+    previous = _runtime_per_day.get(fidelity)
+    _runtime_per_day[fidelity] = rate if previous is None else 0.7 * previous + 0.3 * rate
+
+
+# simple file data store for now
+async def propagate_and_save(
+    ctx: Any,
+    *,
+    satellite_id: str,
+    tra_config: dict,
+    uni_config: dict,
+    content_hash: str | None = None,
+    parent_id: str | None = None,
+    fidelity: str | None = None,
+) -> dict:
+    # imported here, the task module is loaded by the queue configuration before the domain controllers
+    from app.domain.orbit.services import OrbitService
+
+    start_time = time.perf_counter()
+    progress = JobProgress(ctx)
+    if content_hash is not None:
+        async with alchemy.get_session() as db_session, OrbitService.new(session=db_session) as orbit_service:
+            cached = await orbit_service.repository.get_by_content_hash(content_hash)
+        if cached is not None:
+            return {
+                "orbit_id": str(cached.id),
+                "satellite_id": satellite_id,
+                "execution_duration": time.perf_counter() - start_time,
+            }
+    start = convert_godot_epoch_to_datetime(Epoch(tra_config["timeline"][0]["epoch"]))
+    end = convert_godot_epoch_to_datetime(Epoch(tra_config["timeline"][1]["point"]["epoch"]))
+    days = (end - start).total_seconds() / 86400
+    profile = fidelity or "operational"
+    rate = _runtime_per_day.get(profile)
+    with NamedTemporaryFile() as f:
+        try:
+            integration_start = time.perf_counter()
+            chebyshev = await progress.wait(
+                run_in_process(
+                    propagate_to_ipf,
+                    tra_config,
+                    uni_config,
+                    f.name,
+                    chebyshev_tolerance=get_settings().fdy.CHEBYSHEV_TOLERANCE / 1000,
+                ),
+                "integrating",
+                estimate=rate * days if rate is not None else None,
+                span=(0.0, 0.9),
+                start=start,
+                end=end,
+            )
+            _record_runtime(profile, time.perf_counter() - integration_start, days)
+        except Exception:
+            logger.exception("An error occurred during propagation.")
+            raise
+        await progress.update(0.9, "saving", epoch=end, force=True)
+        file_id = str(uuid4())
+        file_name = file_id + ".ipf"
+        uploads = [UploadFile("bytes", file_name, f.read())]
+        chebyshev_file_name = lod_file_name = None
+        # without a Chebyshev ephemeris within the tolerance, the orbit is only saved as IPF
+        if chebyshev is not None:
+            chebyshev_file_name = file_id + ".cheb.npz"
+            lod_file_name = file_id + ".lod.npy"
+            # plotting levels of detail, sampled from the Chebyshev ephemeris
+            lod = await run_in_process(build_pyramid, chebyshev)
+            uploads += [
+                UploadFile("bytes", chebyshev_file_name, chebyshev),
+                UploadFile("bytes", lod_file_name, lod),
+            ]
+
+        async with FileStorageService.new(
+            uploads_dir="data/uploads",
+            allow_extensions=["ipf", "npz", "npy"],
+        ) as file_storage_service:
+            await file_storage_service.upload(uploads)
+
+        async with (
+            alchemy.get_session() as db_session,
+            OrbitService.new(
+                session=db_session,
+            ) as orbit_service,
+        ):
+            orbit = await orbit_service.create(
+                data={
+                    "file_name": file_name,
+                    "chebyshev_file_name": chebyshev_file_name,
+                    "lod_file_name": lod_file_name,
+                    "start": start,
+                    "end": end,
+                    "satellite_id": satellite_id,
+                    "content_hash": content_hash,
+                    "parent_id": parent_id,
+                    "fidelity": fidelity,
+                },
+                auto_commit=True,
+                auto_refresh=True,
+            )
+    return {
+        "orbit_id": str(orbit.id),
+        "satellite_id": satellite_id,
+        "execution_duration": time.perf_counter() - start_time,
+    }
+
+
+async def extend_orbit(
+    ctx: Context,
+    *,
+    orbit_id: str,
+    epoch_end: str,
+    uni_config: dict,
+    initial_mass: float,
+    fidelity: str = "operational",
+) -> dict:
+    """Extend a stored orbit up to a new end epoch.
+
+    Only the new interval is propagated, from the final state interpolated from the stored orbit.
+    IPF files are written in one go, so the extension is saved as a new orbit starting at the end
+    of the extended one and referencing it as its parent.
+    """
+    # imported here, the task module is loaded by the queue configuration before the domain controllers
+    from app.domain.orbit.services import OrbitService
+
+    async with alchemy.get_session() as db_session, OrbitService.new(session=db_session) as orbit_service:
+        orbit = await orbit_service.get(UUID(orbit_id))
+    epoch_start = convert_datetime_to_godot_epoch(orbit.end)
+    satellite_id = str(orbit.satellite_id)
+    tra_config = return_propagation_template(
+        PropagationInput(
+            satellite_id=orbit.satellite_id,
+            initial_orbit=await run_in_process(initial_state_from_orbit, orbit.file_name, epoch_start),
+            initial_mass=initial_mass,
+            epoch_start=epoch_start,
+            epoch_end=epoch_end,
+            fidelity=fidelity,
+        ),
+        sc_name=uuid4().hex,
+    )
+    return await propagate_and_save(
+        ctx,
+        satellite_id=satellite_id,
+        tra_config=tra_config,
+        uni_config=uni_config,
+        content_hash=propagation_key(satellite_id, tra_config, uni_config),
+        parent_id=orbit_id,
+        fidelity=fidelity,
+    )
+
+
+async def propagate_batch(
+    ctx: Context,
+    *,
+    epoch_start: str,
+    epoch_end: str,
+    items: list[dict],
+) -> list[dict]:
+    """Fan a batch of propagations out over the propagation queue.
+
+    The batch runs on its own queue, so waiting on its children never holds a slot of the
+    propagation queue. The children are keyed by their content hash, so identical propagations
+    already queued are awaited instead of enqueued again.
+
+    Every item holds the ``satellite_id`` and ``uni_config`` of one satellite, together with either
+    a ready ``tra_config`` or the ``orbit_file_name`` and ``initial_mass`` to start from, in which
+    case the initial state is interpolated from that orbit at ``epoch_start``. At most
+    ``SAQ_PROPAGATION_BATCH_PARALLELISM`` child jobs run at the same time.
+
+    Returns:
+        One entry per satellite, with either the propagation result or the error.
+    """
+    # imported here, the task module is loaded by the queue configuration
+    from app.config.app import saq
+
+    queue = saq.get_queues().get("Orbit propagation queue")
+    await queue.connect()
+    settings = get_settings().saq
+    semaphore = asyncio.Semaphore(settings.PROPAGATION_BATCH_PARALLELISM)
+    progress = JobProgress(ctx)
+    done = 0
+
+    async def run(item: dict) -> dict:
+        nonlocal done
+        try:
+            return await propagate(item)
+        finally:
+            done += 1
+            await progress.count(done, len(items), "propagating")
+
+    async def propagate(item: dict) -> dict:
+        satellite_id = item["satellite_id"]
+        try:
+            tra_config = item.get("tra_config")
+            if tra_config is None:
+                initial_orbit = await run_in_process(initial_state_from_orbit, item["orbit_file_name"], epoch_start)
+                tra_config = return_propagation_template(
+                    PropagationInput(
+                        satellite_id=UUID(satellite_id),
+                        initial_orbit=initial_orbit,
+                        initial_mass=item["initial_mass"],
+                        epoch_start=epoch_start,
+                        epoch_end=epoch_end,
+                        fidelity=item.get("fidelity", "operational"),
+                    ),
+                    sc_name=uuid4().hex,
+                )
+            content_hash = propagation_key(satellite_id, tra_config, item["uni_config"])
+            key = propagation_job_key(content_hash)
+            async with semaphore:
+                job = await queue.enqueue(
+                    "propagate_and_save",
+                    key=key,
+                    satellite_id=satellite_id,
+                    tra_config=tra_config,
+                    uni_config=item["uni_config"],
+                    content_hash=content_hash,
+                    fidelity=item.get("fidelity"),
+                    timeout=settings.PROPAGATION_TIMEOUT,
+                    retries=settings.PROPAGATION_RETRIES,
+                )
+                if job is None:
+                    # an identical propagation is in progress or just done, share its job
+                    job = await queue.job(key)
+                if job is not None:
+                    await job.refresh(until_complete=0)
+        except Exception as e:
+            logger.exception("Batch propagation failed for satellite %s.", satellite_id)
+            return {"satellite_id": satellite_id, "error": str(e)}
+        if job is None:
+            return {"satellite_id": satellite_id, "error": "The propagation job expired."}
+        if job.status != Status.COMPLETE:
+            return {"satellite_id": satellite_id, "error": job.error}
+        return job.result
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+async def propagate_ensemble(
+    ctx: Context,
+    *,
+    satellite_id: str,
+    tra_config: dict,
+    uni_config: dict,
+    drag_coefficient: float,
+    srp_coefficient: float,
+    mass: float,
+    samples: int,
+    dispersion: dict,
+    step: float,
+    percentiles: list[float],
+    seed: int | None = None,
+    fidelity: str | None = None,
+) -> dict:
+    """Propagate a Monte Carlo ensemble around a nominal trajectory and save its statistics.
+
+    The samples run in the propagation process pool, each process holding one warm universe.
+    Only the mean, covariance and percentile envelopes over time are stored, in one
+    ``.npz`` file referenced by an :class:`OrbitEnsemble`.
+    """
+    # imported here, the task module is loaded by the queue configuration before the domain controllers
+    from app.domain.orbit.services import OrbitEnsembleService
+
+    start_time = time.perf_counter()
+    initial = tra_config["timeline"][0]
+    param_config = ensemble.parametrize_dynamics(uni_config, drag_coefficient, srp_coefficient, mass)
+    grid = (initial["epoch"], tra_config["timeline"][1]["point"]["epoch"], step)
+
+    nominal = await run_in_process(ensemble.nominal_state, param_config, tra_config)
+    draws = ensemble.draw_samples(
+        nominal,
+        drag_coefficient,
+        srp_coefficient,
+        mass,
+        samples=samples,
+        position_sigma=dispersion["position_sigma"] / 1000,
+        velocity_sigma=dispersion["velocity_sigma"] / 1000,
+        drag_coefficient_sigma=dispersion.get("drag_coefficient_sigma", 0.0),
+        srp_coefficient_sigma=dispersion.get("srp_coefficient_sigma", 0.0),
+        mass_sigma=dispersion.get("mass_sigma", 0.0),
+        seed=seed,
+    )
+    progress = JobProgress(ctx)
+    done = 0
+
+    async def run(sample: np.ndarray) -> np.ndarray:
+        nonlocal done
+        state = await run_in_process(ensemble.propagate_sample, param_config, tra_config, sample, grid)
+        done += 1
+        # the statistics and the upload take the last percent
+        await progress.update(0.99 * done / len(sample_array), "propagating", force=done == len(sample_array))
+        return state
+
+    sample_array = draws.as_array()
+    states = np.stack(await asyncio.gather(*(run(sample) for sample in sample_array)))
+
+    statistics = ensemble.summarize_ensemble(states, percentiles)
+    epochs = ensemble.output_grid(*grid)
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        epochs=np.array([convert_godot_epoch_to_datetime(epoch).isoformat() for epoch in epochs]),
+        percentile_levels=np.array(percentiles, dtype=float),
+        samples=draws.as_array(),
+        **statistics,
+    )
+    file_name = str(uuid4()) + ".npz"
+    async with FileStorageService.new(
+        uploads_dir="data/uploads",
+        allow_extensions=["npz"],
+    ) as file_storage_service:
+        await file_storage_service.upload([UploadFile("bytes", file_name, buffer.getvalue())])
+
+    async with (
+        alchemy.get_session() as db_session,
+        OrbitEnsembleService.new(
+            session=db_session,
+        ) as ensemble_service,
+    ):
+        orbit_ensemble = await ensemble_service.create(
+            data={
+                "file_name": file_name,
+                "start": convert_godot_epoch_to_datetime(epochs[0]),
+                "end": convert_godot_epoch_to_datetime(epochs[-1]),
+                "samples": samples,
+                "satellite_id": satellite_id,
+                "fidelity": fidelity,
+            },
+            auto_commit=True,
+            auto_refresh=True,
+        )
+    return {
+        "ensemble_id": str(orbit_ensemble.id),
+        "satellite_id": satellite_id,
+        "samples": samples,
+        "execution_duration": time.perf_counter() - start_time,
+    }
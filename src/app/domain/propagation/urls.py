@@ -1,5 +1,10 @@
 PROPAGATION_LIST = "/api/propagation"
 PROPAGATION_REQUEST = "/api/propagation"
+PROPAGATION_BATCH_REQUEST = "/api/propagation/batch"
+PROPAGATION_ENSEMBLE_REQUEST = "/api/propagation/ensemble"
+PROPAGATION_EXTENSION_REQUEST = "/api/propagation/extend"
+PROPAGATION_ANALYTICAL = "/api/propagation/analytical"
+PROPAGATION_JOB_EVENTS = "/api/propagation/jobs/{job_key:str}/events"
 # TAG_UPDATE = "/api/dynamics/{dynamics_id:uuid}"
 # TAG_DELETE = "/api/dynamics/{dynamics:uuid}"
 # TAG_DETAILS = "/api/dynamics/{dynamics:uuid}"
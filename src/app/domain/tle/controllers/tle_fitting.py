@@ -1,31 +1,32 @@
-from datetime import datetime
+from datetime import UTC
+from uuid import UUID
 
-from godot.core.tempo import Epoch
-from litestar import post
+from litestar import get, post
 from litestar.controller import Controller
 from litestar.di import Provide
 from litestar.dto import MsgspecDTO
+from litestar.exceptions import NotFoundException
+from litestar.response import ServerSentEvent
+from litestar_saq.config import TaskQueues
 
-from app.db.models import TLE
+from app.config.base import get_settings
 from app.domain.accounts.guards import requires_active_user
 from app.domain.orbit.dependencies import provide_orbit_service
 from app.domain.orbit.services import OrbitService
+from app.domain.propagation.schemas import JobRequest
 from app.domain.tle import urls
-from app.domain.tle.dtos import TLEDTO
-from app.domain.tle.schemas import TleGenerationFromOrbitInput
-from app.domain.tle.services import TLEService
-from app.domain.tle.tasks import fit_tle_from_orbit
+from app.domain.tle.schemas import TleBatchFitInput, TleGenerationFromOrbitInput
+from app.domain.tle.tasks import tle_fit_batch_job_key, tle_fit_job_key
+from app.lib.exceptions import ApplicationClientError
+from app.lib.job_progress import job_events
 
-from app.lib.deps import create_service_provider
 
-
-def convert_godot_epoch_to_datetime(godot_epoch: Epoch) -> datetime:
-    return datetime.fromisoformat(godot_epoch.calStr("UTC")[:-4] + "Z")
+def tle_fit_events_location(job_key: str) -> str:
+    return urls.TLE_FIT_EVENTS.replace("{job_key:str}", job_key).lstrip("/")
 
 
 class TleFitController(Controller):
     dependencies = {
-        "tle_service": create_service_provider(TLEService),
         "orbit_service": Provide(provide_orbit_service),
     }
     tags = ["TLE"]
@@ -34,29 +35,115 @@ class TleFitController(Controller):
         operation_id="CreateTleFitRequest",
         name="tle:fit",
         summary="Request TLE fit",
-        description="Fit a TLE through a numerically propagated orbit.",
+        description="Submit the fit of a TLE through a numerically propagated orbit. The fit runs on the TLE fitting\
+              queue and the resulting TLE is saved for the satellite of the orbit. The fit can be restricted to a\
+              window of the orbit and sample it per revolution. The job result reports the number of fitted\
+              observations, the convergence and the duration of the fit. Identical fits in progress share the same\
+              job.",
         guards=[requires_active_user],
         path=urls.TLE_FIT,
         dto=MsgspecDTO[TleGenerationFromOrbitInput],
-        return_dto=TLEDTO,
     )
-    async def create_propagation_request(
+    async def create_tle_fit_request(
         self,
         orbit_service: OrbitService,
-        tle_service: TLEService,
         data: TleGenerationFromOrbitInput,
-    ) -> TLE:
+        task_queues: TaskQueues,
+    ) -> JobRequest:
         orbit = await orbit_service.get(data.orbit_id)
 
-        [epoch, line1, line2] = fit_tle_from_orbit(orbit, data.step)
+        # naive bounds are taken as UTC
+        begin, end = (
+            bound.replace(tzinfo=UTC) if bound is not None and bound.tzinfo is None else bound
+            for bound in (data.begin_fit, data.end_fit)
+        )
+        if max(begin or orbit.start, orbit.start) >= min(end or orbit.end, orbit.end):
+            msg = f"The fit window must overlap the orbit, from {orbit.start.isoformat()} to {orbit.end.isoformat()}."
+            raise ApplicationClientError(msg)
 
-        db_obj = await tle_service.create(
-            TLE(
-                line1=line1,
-                line2=line2,
-                epoch=convert_godot_epoch_to_datetime(epoch),
-                originator="internal",
-                satellite_id=orbit.satellite.id,
-            ),
+        sampling = {
+            "begin_fit": begin.isoformat() if begin is not None else None,
+            "end_fit": end.isoformat() if end is not None else None,
+            "points_per_revolution": data.points_per_revolution,
+        }
+        job_key = tle_fit_job_key(
+            orbit.id,
+            data.step,
+            begin=sampling["begin_fit"],
+            end=sampling["end_fit"],
+            points_per_revolution=data.points_per_revolution,
+        )
+        queue = task_queues.get("TLE fitting queue")
+        job = await queue.enqueue(
+            "fit_tle_and_save",
+            key=job_key,
+            orbit_id=str(orbit.id),
+            step=data.step,
+            **sampling,
+            timeout=get_settings().saq.TLE_FIT_TIMEOUT,
         )
-        return tle_service.to_schema(db_obj)
+        if job is None:
+            # an identical fit is in progress, share its job
+            job = await queue.job(job_key)
+
+        if job is None:
+            msg = "Failed to enqueue the TLE fitting job."
+            raise ApplicationClientError(msg)
+
+        return JobRequest(
+            queue_id=UUID(job.key),
+            location=f"saq/api/queues/{job.id}",
+            events=tle_fit_events_location(job.key),
+        )
+
+    @post(
+        operation_id="CreateTleBatchFitRequest",
+        name="tle:fit-batch",
+        summary="Request TLE fits of all active satellites",
+        description="Submit the fit of a TLE through the latest orbit of every active satellite, optionally of a\
+              single group. The fits share the process pool of a TLE fitting worker and the resulting TLEs are saved\
+              together once all fits are done. The job result reports the convergence and duration of every fit.",
+        guards=[requires_active_user],
+        path=urls.TLE_FIT_BATCH,
+        dto=MsgspecDTO[TleBatchFitInput],
+    )
+    async def create_tle_batch_fit_request(self, data: TleBatchFitInput, task_queues: TaskQueues) -> JobRequest:
+        job_key = tle_fit_batch_job_key(data.group, data.step, data.points_per_revolution)
+        queue = task_queues.get("TLE fitting queue")
+        job = await queue.enqueue(
+            "fit_tle_batch",
+            key=job_key,
+            step=data.step,
+            group=data.group,
+            points_per_revolution=data.points_per_revolution,
+            timeout=None,
+        )
+        if job is None:
+            # an identical batch is in progress, share its job
+            job = await queue.job(job_key)
+
+        if job is None:
+            msg = "Failed to enqueue the batch TLE fitting job."
+            raise ApplicationClientError(msg)
+
+        return JobRequest(
+            queue_id=UUID(job.key),
+            location=f"saq/api/queues/{job.id}",
+            events=tle_fit_events_location(job.key),
+        )
+
+    @get(
+        operation_id="StreamTleFitJobEvents",
+        name="tle:fit-events",
+        summary="Stream the status of a TLE fitting job",
+        description="Server-sent events stream pushing the status and progress of a TLE fitting job every time it\
+              changes, with the iteration and residuals of the fit. The stream ends once the job is complete,\
+              failed or aborted, its last event holding the result or the error.",
+        guards=[requires_active_user],
+        path=urls.TLE_FIT_EVENTS,
+    )
+    async def stream_tle_fit_job_events(self, task_queues: TaskQueues, job_key: str) -> ServerSentEvent:
+        queue = task_queues.get("TLE fitting queue")
+        if await queue.job(job_key) is None:
+            raise NotFoundException(detail=f"No TLE fitting job {job_key}.")
+        return ServerSentEvent(job_events(queue, job_key))
@@ -2,13 +2,13 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Annotated
 
-from litestar import Controller, delete, get
-
+from litestar import Controller, Request, delete, get, post
 
 from app.db.models import TLE
 from app.domain.accounts.guards import requires_active_user, requires_superuser
 from app.domain.tle import urls
 from app.domain.tle.dtos import TLEDTO
+from app.domain.tle.schemas import TleCatalogIngestion
 from app.domain.tle.services import TLEService
 from app.lib.deps import create_service_provider
 
@@ -27,7 +27,7 @@ class TLEController(Controller):
     dependencies = {
         "tle_service": create_service_provider(TLEService),
     }
-    signature_namespace = {"TLEService": TLEService, "TLE": TLE}
+    signature_namespace = {"TLEService": TLEService, "TLE": TLE, "TleCatalogIngestion": TleCatalogIngestion}
     tle = ["TLE"]
     return_dto = TLEDTO
     tags = ["TLE"]
@@ -91,3 +91,18 @@ class TLEController(Controller):
     ) -> None:
         """Delete a tle."""
         _ = await tle_service.delete(tle_id)
+
+    @post(
+        operation_id="IngestTLECatalog",
+        name="tle:ingest-catalog",
+        path=urls.TLE_CATALOG,
+        summary="Ingest a TLE catalog",
+        description="Store the element sets of a 2LE or 3LE catalog, e.g. a Space-Track bulk download, sent as the\
+              plain text request body. The catalog is read as it is received and only the element sets of satellites\
+              whose TLE configuration has a matching NORAD id are stored, skipping the ones already stored for the\
+              same satellite and epoch.",
+        return_dto=None,
+    )
+    async def ingest_tle_catalog(self, tle_service: TLEService, request: Request) -> TleCatalogIngestion:
+        """Ingest a TLE catalog."""
+        return await tle_service.ingest_catalog(request.stream())
@@ -1,11 +1,54 @@
+from datetime import datetime
+from typing import Annotated
 from uuid import UUID
 
+from msgspec import Meta
+
 from app.lib.schema import CamelizedBaseStruct
 
+PointsPerRevolution = Annotated[
+    int,
+    Meta(
+        description="Sample the orbit with this number of points per revolution, equally spaced in true anomaly and\
+            so denser around perigee, instead of at a fixed step. A 60 s step amounts to about 95 points per\
+            revolution in low Earth orbit.",
+        ge=8,
+        le=1000,
+    ),
+]
+"""Number of samples per revolution of a fitted orbit."""
+
 
 class TleGenerationFromOrbitInput(CamelizedBaseStruct):
     # satellite_id: UUID
     orbit_id: UUID
-    step: float
-    # begin_fit: datetime
-    # end_fit: datetime
+    step: Annotated[float, Meta(description="Step of the fitted samples of the orbit in seconds.", gt=0)]
+    begin_fit: Annotated[
+        datetime | None,
+        Meta(description="Start of the fitted part of the orbit, and epoch of the TLE. The orbit start by default."),
+    ] = None
+    end_fit: Annotated[
+        datetime | None,
+        Meta(description="End of the fitted part of the orbit. The orbit end by default."),
+    ] = None
+    points_per_revolution: PointsPerRevolution | None = None
+
+
+class TleBatchFitInput(CamelizedBaseStruct):
+    step: Annotated[float, Meta(description="Step of the fitted samples of the orbits in seconds.", gt=0)]
+    group: Annotated[
+        str | None,
+        Meta(description="Only fit the active satellites of this group, all active satellites by default."),
+    ] = None
+    points_per_revolution: PointsPerRevolution | None = None
+
+
+class TleCatalogIngestion(CamelizedBaseStruct):
+    """Outcome of the ingestion of a TLE catalog."""
+
+    records: Annotated[int, Meta(description="Records read from the catalog.")] = 0
+    invalid: Annotated[int, Meta(description="Malformed records, e.g. with a wrong checksum.")] = 0
+    unknown: Annotated[int, Meta(description="Records of NORAD ids without a satellite.")] = 0
+    duplicates: Annotated[int, Meta(description="Records already stored for the same satellite and epoch.")] = 0
+    inserted: Annotated[int, Meta(description="Stored records.")] = 0
+    duration: Annotated[float, Meta(description="Duration of the ingestion in seconds.")] = 0.0
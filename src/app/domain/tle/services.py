@@ -1,12 +1,47 @@
 from __future__ import annotations
 
+import codecs
+import time
+import uuid
+from typing import TYPE_CHECKING
+
 from advanced_alchemy.repository import SQLAlchemyAsyncRepository
 from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService
+from sqlalchemy import select, text
 
 from app.db import models as m
+from app.domain.tle.schemas import TleCatalogIngestion
+from app.flight_dynamics.catalog import TleCatalog
+from app.flight_dynamics.tle_catalog import CatalogReader
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, Collection
+
+    from app.flight_dynamics.tle_catalog import TleCatalogChunk
 
 __all__ = ("TLEService",)
 
+# one statement per chunk: the rows are bound as arrays, duplicates of a stored (satellite, epoch)
+# or within the chunk are skipped
+_INSERT_CATALOG_CHUNK = text(
+    """
+    INSERT INTO tle (id, line1, line2, epoch, originator, satellite_id, created_at, updated_at)
+    SELECT DISTINCT ON (row.satellite_id, row.epoch)
+        row.id, row.line1, row.line2, row.epoch, CAST('spacetrack' AS tleorigin), row.satellite_id, now(), now()
+    FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:line1s AS varchar[]),
+        CAST(:line2s AS varchar[]),
+        CAST(:epochs AS timestamptz[]),
+        CAST(:satellite_ids AS uuid[])
+    ) AS row (id, line1, line2, epoch, satellite_id)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM tle WHERE tle.satellite_id = row.satellite_id AND tle.epoch = row.epoch
+    )
+    ORDER BY row.satellite_id, row.epoch
+    """,
+)
+
 
 class TLEService(SQLAlchemyAsyncRepositoryService[m.TLE]):
     """Handles basic lookup operations for an TLE."""
@@ -17,4 +52,79 @@ class TLEService(SQLAlchemyAsyncRepositoryService[m.TLE]):
         model_type = m.TLE
 
     repository_type = Repository
-    match_fields = ["name"]
\ No newline at end of file
+    match_fields = ["name"]
+
+    async def latest_catalog(self, satellite_ids: Collection[uuid.UUID] | None = None) -> TleCatalog:
+        """Return the latest TLE of every satellite, or of the given satellites, as a catalog.
+
+        The objects of the catalog are identified by their satellite id.
+        """
+        statement = (
+            select(m.TLE.satellite_id, m.TLE.line1, m.TLE.line2)
+            .order_by(m.TLE.satellite_id, m.TLE.epoch.desc())
+            .distinct(m.TLE.satellite_id)
+        )
+        if satellite_ids is not None:
+            statement = statement.where(m.TLE.satellite_id.in_(satellite_ids))
+        rows = (await self.repository.session.execute(statement)).all()
+        return TleCatalog.from_lines([row.satellite_id for row in rows], [(row.line1, row.line2) for row in rows])
+
+    async def ingest_catalog(
+        self,
+        content: AsyncIterable[str | bytes],
+        chunk_size: int = 10_000,
+    ) -> TleCatalogIngestion:
+        """Store the element sets of a TLE catalog for the satellites with a matching NORAD id.
+
+        The catalog is read as it streams in and stored in a single transaction, skipping the
+        element sets already stored for the same satellite and epoch. Malformed records, e.g. with
+        a wrong checksum, are counted and skipped.
+
+        Args:
+            content: The 2LE or 3LE catalog, in pieces of text or UTF-8 encoded bytes.
+            chunk_size: Number of records inserted per statement.
+        """
+        start_time = time.perf_counter()
+        session = self.repository.session
+        norad_ids = m.Satellite.tle_config["noradId"].as_integer()
+        rows = await session.execute(select(norad_ids, m.Satellite.id).where(norad_ids.is_not(None)))
+        satellites = dict(rows.all())
+
+        report = TleCatalogIngestion()
+        reader = CatalogReader(chunk_size=chunk_size)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        async def store(chunks: list[TleCatalogChunk]) -> None:
+            for chunk in chunks:
+                report.records += len(chunk)
+                report.invalid += int((~chunk.valid).sum())
+                rows = [
+                    (index, satellites[norad_id])
+                    for index, (norad_id, valid) in enumerate(zip(chunk.norad_id.tolist(), chunk.valid, strict=True))
+                    if valid and norad_id in satellites
+                ]
+                report.unknown += int(chunk.valid.sum()) - len(rows)
+                if not rows:
+                    continue
+                epochs = chunk.epochs()
+                result = await session.execute(
+                    _INSERT_CATALOG_CHUNK,
+                    {
+                        "ids": [uuid.uuid4() for _ in rows],
+                        "line1s": [chunk.line1[index] for index, _ in rows],
+                        "line2s": [chunk.line2[index] for index, _ in rows],
+                        "epochs": [epochs[index] for index, _ in rows],
+                        "satellite_ids": [satellite_id for _, satellite_id in rows],
+                    },
+                )
+                report.inserted += result.rowcount
+                report.duplicates += len(rows) - result.rowcount
+
+        async for piece in content:
+            await store(reader.feed(decoder.decode(piece) if isinstance(piece, bytes) else piece))
+        await store(reader.feed(decoder.decode(b"", final=True)) + reader.close())
+        await session.commit()
+
+        report.invalid += reader.malformed
+        report.duration = time.perf_counter() - start_time
+        return report
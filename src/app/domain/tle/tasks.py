@@ -1,18 +1,43 @@
+import asyncio
+import functools
+import hashlib
 import math
-from uuid import uuid4
+import queue
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import NAMESPACE_URL, UUID, uuid5
 
 import numpy as np
+from advanced_alchemy.filters import LimitOffset, OrderBy
 from godot import cosmos, model
 from godot.core import astro, num, tempo
 from numpy.typing import ArrayLike, NDArray
+from sqlalchemy import select
 from structlog import get_logger
 
-from app.db.models import IpfOrbit
+from app.config.app import alchemy
+from app.config.base import get_settings
+from app.flight_dynamics.j2 import cartesian_to_keplerian, true_from_mean_anomaly
+from app.flight_dynamics.propagation import load_orbit_point
+from app.flight_dynamics.sampling import true_anomaly_grid
+from app.flight_dynamics.sgp4 import Sgp4, TleElements
+from app.flight_dynamics.utils.convert import datetime_to_godot_epoch, godot_epoch_to_datetime
 from app.lib.exceptions import MaxIterationsExceededError
+from app.lib.job_progress import JobProgress
+from app.lib.process_pool import get_process_manager, run_in_process
 from app.lib.universe_assembler import uni_config
+from app.lib.universe_pool import get_universe_pool
 
 logger = get_logger()
 
+MIN_EPOCHS_PER_THREAD = 512
+"""Smallest share of the epochs worth handing to an evaluation thread."""
+MAX_INNER_ITERATIONS = 20
+"""Maximum number of damping increases of a TLE fit iteration."""
+
 
 class StateEqui(model.geometry.StateConverter):
     def __init__(self, uni: cosmos.Universe, satellite: str) -> None:
@@ -52,11 +77,14 @@ class TwoLineElement:
         self.element_number = element_number
         self.revolution_number = revolution_number
         self.__uni = uni
-        self.__name = uuid4().hex
 
         """Initialize TLE from orbital parameters"""
         self.epoch = epoch
+        self.update(pars)
 
+    def update(self, pars: ArrayLike) -> None:
+        """Set the elements from equinoctial elements and B*, reusing this instance."""
+        uni = self.__uni
         # Convert to Keplerian elements
         pars = np.asarray(pars)
         kep = astro.convert("Equi", "Kep", pars[:-1], {"mu": uni.constants.getMu("Earth")})
@@ -74,18 +102,6 @@ class TwoLineElement:
         # B* term
         self.bstar = pars[6]
 
-        config = {
-            "name": self.__name,
-            "type": "PointTle",
-            "config": {
-                "origin": "Earth",
-                "axes": "TEME",
-                "tle": [self.to_line1(), self.to_line2()],
-                "checkSum": True,
-            },
-        }
-        uni.createPlugin("frames", [config])
-
     def to_line1(self) -> str:
         """Generate first line of TLE"""
         line = f"1 {self.norad_id:05d}{self.classification} "
@@ -136,11 +152,13 @@ class TwoLineElement:
         if abs(self.bstar) < bstar_zero_tol:
             return " 00000+0"
         if abs(self.bstar) < 1.0:
-            bstar_str = f"{self.bstar:E}"
-            mantissa, exponent = bstar_str.split("E")
-            exponent_val = int(exponent) - 1
-            num_str = f"{float(mantissa):+.4f}".replace(".", "")[0:5] + f"-{abs(exponent_val)}"
-            return num_str if self.bstar < 0 else " " + num_str
+            # sign, five digits of a mantissa with an implied leading decimal point and the exponent
+            exponent = math.floor(math.log10(abs(self.bstar))) + 1
+            digits = round(abs(self.bstar) / 10**exponent * 1e5)
+            if digits == 100_000:
+                digits, exponent = 10_000, exponent + 1
+            sign = "-" if self.bstar < 0 else " "
+            return f"{sign}{digits:05d}{'-' if exponent < 0 else '+'}{abs(exponent)}"
         msg = f"B* value {self.bstar} exceeds maximum reasonable value."
         logger.error(msg)
         raise ValueError(msg)
@@ -155,44 +173,253 @@ class TwoLineElement:
                 sum_ += 1
         return sum_ % 10
 
+    def _frame(self) -> str:
+        """Return the GODOT point of the TLE, registering it on first use.
+
+        Plugins cannot be removed from a universe, so the point is named after the TLE lines and
+        shared by every evaluation of the same TLE.
+        """
+        lines = [self.to_line1(), self.to_line2()]
+        name = "tle_" + hashlib.sha1("\n".join(lines).encode(), usedforsecurity=False).hexdigest()
+        try:
+            self.__uni.frames.pointId(name)
+        except Exception:  # noqa: BLE001
+            config = {
+                "name": name,
+                "type": "PointTle",
+                "config": {"origin": "Earth", "axes": "TEME", "tle": lines, "checkSum": True},
+            }
+            self.__uni.createPlugin("frames", [config])
+        return name
+
     def eval(self, epoch: tempo.Epoch) -> NDArray:
-        return self.__uni.frames.vector6("Earth", self.__name, "TEME", epoch)
+        return self.__uni.frames.vector6("Earth", self._frame(), "TEME", epoch)
+
+
+def tle_elements(tles: Sequence[TwoLineElement]) -> TleElements:
+    """Return the mean elements of TLEs for the vectorized SGP4 propagator."""
+    return TleElements(
+        epoch=[godot_epoch_to_datetime(tle.epoch) for tle in tles],
+        bstar=np.array([tle.bstar for tle in tles], dtype=float),
+        inclination=np.array([tle.inc for tle in tles], dtype=float),
+        raan=np.array([tle.raan for tle in tles], dtype=float),
+        eccentricity=np.array([tle.ecc for tle in tles], dtype=float),
+        arg_perigee=np.array([tle.aop for tle in tles], dtype=float),
+        mean_anomaly=np.array([tle.mean_anomaly for tle in tles], dtype=float),
+        mean_motion=np.array([tle.mean_motion for tle in tles], dtype=float) * 2 * math.pi / 1440,
+    )
 
 
-def fit_tle_from_orbit(orbit: IpfOrbit, step: float) -> tuple[tempo.Epoch, str, str]:
-    uni = cosmos.Universe(uni_config)
-    try:
-        ipf_point_name = orbit.id.hex
+@functools.cache
+def _thread_pool(threads: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=threads, thread_name_prefix="tle-fit")
 
-        uni.frames.addIpfPoint(ipf_point_name, "data/uploads/" + orbit.file_name, {3: "Earth"})
 
-        blocks = uni.frames.blocks(uni.frames.pointId(ipf_point_name))
+def evaluate_tles(tles: Sequence[TwoLineElement], epochs: Sequence[tempo.Epoch], threads: int = 1) -> NDArray:
+    """Evaluate TLEs sharing the same epoch at all epochs in one vectorized SGP4 call.
 
-        fit_start, fit_end = blocks[0].range.start(), blocks[-1].range.end()
-        logger.info(f"{fit_start}")
-        logger.info(f"{fit_end}")
-        fit_range = tempo.EpochRange(fit_start, fit_end)
-        tle_epoch = fit_start
+    With several threads, the epochs are split between them. NumPy releases the GIL in the array
+    operations, and every state is computed by the same element-wise operations whatever the
+    split, so the result is bit-identical to the single threaded one.
+
+    Deep-space TLEs, which the vectorized propagator does not support, are evaluated epoch by
+    epoch with GODOT, in the calling thread.
 
-        kep_state = StateEqui(uni, ipf_point_name)
-        kep_state.eval(tle_epoch)
+    Returns:
+        The TEME states in km and km/s, of shape ``(len(tles), len(epochs), 6)``.
+    """
+    tle_epoch = tles[0].epoch
+    minutes = np.array([epoch - tle_epoch for epoch in epochs]) / 60
+    try:
+        propagator = Sgp4(tle_elements(tles))
+    except ValueError:
+        return np.stack([np.vstack([tle.eval(epoch) for epoch in epochs]) for tle in tles])
+    threads = min(threads, len(minutes) // MIN_EPOCHS_PER_THREAD)
+    if threads > 1:
+        parts = list(_thread_pool(threads).map(propagator.propagate, np.array_split(minutes, threads)))
+        position = np.concatenate([position for position, _ in parts], axis=1)
+        velocity = np.concatenate([velocity for _, velocity in parts], axis=1)
+    else:
+        position, velocity = propagator.propagate(minutes)
+    return np.concatenate([position, velocity], axis=-1)
+
+
+def tle_fit_job_key(
+    orbit_id: UUID,
+    step: float,
+    begin: str | None = None,
+    end: str | None = None,
+    points_per_revolution: int | None = None,
+) -> str:
+    """Return the SAQ job key of a TLE fit, identical fits in progress share the same job.
+
+    Every option is keyed by name, unset ones included, so two fits differing by any of them
+    never share a key.
+    """
+    return str(uuid5(orbit_id, f"tle-fit:step={step}:begin={begin}:end={end}:ppr={points_per_revolution}"))
+
+
+def _fit_window(
+    uni: cosmos.Universe,
+    point: str,
+    begin: datetime | None,
+    end: datetime | None,
+) -> tuple[tempo.Epoch, tempo.Epoch]:
+    """Return the part of an orbit loaded as a point which is fitted, see :func:`fit_tle_from_orbit`."""
+    blocks = uni.frames.blocks(uni.frames.pointId(point))
+    fit_start, fit_end = blocks[0].range.start(), blocks[-1].range.end()
+    if begin is not None and datetime_to_godot_epoch(begin) - fit_start > 0:
+        fit_start = datetime_to_godot_epoch(begin)
+    if end is not None and fit_end - datetime_to_godot_epoch(end) > 0:
+        fit_end = datetime_to_godot_epoch(end)
+    if fit_end - fit_start <= 0:
+        msg = "The fit window does not overlap the orbit."
+        raise ValueError(msg)
+    logger.info(f"{fit_start}")
+    logger.info(f"{fit_end}")
+    return fit_start, fit_end
 
-        logger.info(uni.constants.getMu("Earth"))
-        tle_variables = np.append(kep_state.eval(tle_epoch), 0.001)
-        obs_epochs = fit_range.createGrid(step)
+
+def _observation_epochs(
+    uni: cosmos.Universe,
+    point: str,
+    fit_start: tempo.Epoch,
+    fit_end: tempo.Epoch,
+    *,
+    step: float,
+    points_per_revolution: int | None,
+) -> list:
+    """Return the fitted epochs, every ``step`` seconds or ``points_per_revolution`` in true anomaly."""
+    if points_per_revolution is None:
+        return tempo.EpochRange(fit_start, fit_end).createGrid(step)
+    sma, ecc, *_, mean_anomaly = cartesian_to_keplerian(uni.frames.vector6("Earth", point, "ICRF", fit_start))
+    offsets = true_anomaly_grid(fit_end - fit_start, sma, ecc, mean_anomaly, points_per_revolution)
+    return [fit_start + float(offset) for offset in offsets]
+
+
+def fit_tle_from_orbit(
+    file_name: str,
+    tle_config: dict,
+    step: float,
+    progress: queue.Queue | None = None,
+    threads: int = 1,
+    initial_tle: tuple[str, str] | None = None,
+    begin: datetime | None = None,
+    end: datetime | None = None,
+    points_per_revolution: int | None = None,
+) -> dict:
+    """Fit a TLE through an orbit IPF file.
+
+    Runs in the process pool, so it only takes and returns picklable values. The orbit is loaded
+    in the warm universe of the process, see :func:`app.lib.universe_pool.get_universe_pool`.
+
+    Args:
+        file_name: The orbit file, in the uploads directory.
+        tle_config: The TLE identification of the satellite.
+        step: Step of the fitted samples of the orbit in seconds.
+        progress: Queue on which ``(fraction, details)`` tuples are put after every iteration.
+        threads: Number of threads evaluating the TLEs, see :func:`evaluate_tles`.
+        initial_tle: Previous TLE of the satellite to start the fit from, see
+            :func:`warm_start_variables`. The fit starts from the osculating elements of the orbit
+            otherwise.
+        begin: Start of the fitted part of the orbit, the start of the orbit by default.
+        end: End of the fitted part of the orbit, the end of the orbit by default.
+        points_per_revolution: Sample the orbit with this number of points per revolution, equally
+            spaced in true anomaly, instead of every ``step`` seconds, see
+            :func:`app.flight_dynamics.sampling.true_anomaly_grid`.
+
+    Returns:
+        The UTC ``epoch`` and the ``line1`` and ``line2`` of the TLE, the number of fitted
+        ``observations`` and of ``iterations``, whether the fit ``converged``, the final weighted
+        ``residuals`` and the ``duration`` of the fit in seconds.
+    """
+    start_time = time.perf_counter()
+    uni = get_universe_pool().get(uni_config)
+    try:
+        ipf_point_name = load_orbit_point(uni, file_name)
+        fit_start, fit_end = _fit_window(uni, ipf_point_name, begin, end)
+        tle_epoch = fit_start
+
+        tle_variables = warm_start_variables(uni, initial_tle, tle_epoch) if initial_tle is not None else None
+        if tle_variables is None:
+            kep_state = StateEqui(uni, ipf_point_name)
+            tle_variables = np.append(kep_state.eval(tle_epoch), 0.001)
+        else:
+            logger.info("Warm starting the TLE fit from %s", initial_tle[1])
+        obs_epochs = _observation_epochs(
+            uni,
+            ipf_point_name,
+            fit_start,
+            fit_end,
+            step=step,
+            points_per_revolution=points_per_revolution,
+        )
         obs = np.vstack([uni.frames.vector6("Earth", ipf_point_name, "TEME", e) for e in obs_epochs])
-        tle_config: dict = orbit.satellite.tle_config
     except Exception:
         logger.exception("An error occurred during tle fitting.")
         raise
-    return fit_tle(
+
+    details: dict = {}
+
+    def report(fraction: float, iteration_details: dict) -> None:
+        details.update(iteration_details)
+        if progress is not None:
+            progress.put((fraction, iteration_details))
+
+    epoch, line1, line2 = fit_tle(
         uni,
         tle_config=tle_config,
         tle_epoch=tle_epoch,
         initial_tle_variables=tle_variables,
         obs_epochs=obs_epochs,
         obs=obs,
+        progress=report,
+        threads=threads,
     )
+    return {
+        "epoch": godot_epoch_to_datetime(epoch),
+        "line1": line1,
+        "line2": line2,
+        "observations": len(obs_epochs),
+        "iterations": details.get("iteration"),
+        "converged": details.get("converged"),
+        "residuals": details.get("residuals"),
+        "duration": time.perf_counter() - start_time,
+    }
+
+
+def warm_start_variables(uni: cosmos.Universe, tle_lines: tuple[str, str], epoch: tempo.Epoch) -> NDArray | None:
+    """Return the fit variables of a previous TLE, moved to the epoch of a fit.
+
+    The mean elements are moved with the secular SGP4 terms, see :meth:`Sgp4.advance`, and
+    converted to the equinoctial elements and B* of :class:`TwoLineElement`.
+
+    Returns:
+        The variables, ``None`` for a deep-space TLE or a TLE that decayed before the epoch.
+    """
+    elements = TleElements.from_lines([tle_lines])
+    minutes = (godot_epoch_to_datetime(epoch) - elements.epoch[0]).total_seconds() / 60
+    try:
+        advanced = Sgp4(elements).advance([minutes])
+    except ValueError:
+        return None
+    ecc = advanced.eccentricity[0]
+    if not np.isfinite(advanced.mean_motion[0]) or not 0 <= ecc < 1:
+        return None
+    mu = uni.constants.getMu("Earth")
+    # the inverse of the mean motion of TwoLineElement.update
+    sma = (mu / (advanced.mean_motion[0] / 60) ** 2) ** (1 / 3)
+    kep = np.array(
+        [
+            sma,
+            ecc,
+            advanced.inclination[0],
+            advanced.raan[0],
+            advanced.arg_perigee[0],
+            true_from_mean_anomaly(advanced.mean_anomaly[0], ecc),
+        ],
+    )
+    return np.append(astro.convert("Kep", "Equi", kep, {"mu": mu}), advanced.bstar[0])
 
 
 def fit_tle(
@@ -202,34 +429,40 @@ def fit_tle(
     initial_tle_variables: NDArray,
     obs_epochs: list,
     obs: NDArray,
-    max_iter: int = 5,
+    max_iter: int = 10,
+    tolerance: float = 1e-4,
+    residuals_floor: float = 1e-6,
     lm_damping_factor: float = 1e-3,
     coe_limit: bool = True,
+    progress: Callable[[float, dict], Any] | None = None,
+    threads: int = 1,
 ) -> tuple[tempo.Epoch, str, str]:
+    """Fit a TLE through TEME states with a Levenberg-Marquardt least squares.
+
+    The fit stops once an iteration decreases the weighted residuals by less than ``tolerance``
+    relative to their previous value, once they fall below ``residuals_floor`` per epoch (in km^2,
+    the default amounts to about a metre), or after ``max_iter`` iterations.
+    """
     earth_radius = uni.constants.getRadius("Earth")
     earth_mu = uni.constants.getMu("Earth")
 
     initial_coe = initial_tle_variables
     original_a = np.asarray(initial_coe)[0]
-    variances = np.array([1, 1, 1, 0.001, 0.001, 0.001])
-    w = np.diag(1 / np.square(variances))
-    variances[0:3] /= earth_radius
-    variances[3:] /= np.sqrt(earth_mu / original_a)
-    w_scaled = np.diag(1 / np.square(variances))
-
-    b_scale = np.ones(6)
-    b_scale[0:3] /= earth_radius
-    b_scale[3:] /= np.sqrt(earth_mu / original_a)
+    w, w_scaled, b_scale = residual_weights(earth_radius, earth_mu, original_a)
 
+    # the TLEs are updated in place over the iterations
+    tle = TwoLineElement(uni, epoch=tle_epoch, pars=initial_coe, tle_config=tle_config)
+    tle_new = TwoLineElement(uni, epoch=tle_epoch, pars=initial_coe, tle_config=tle_config)
+    # elements, residuals and Jacobian evaluated around the first trial of the previous iteration
+    speculative: tuple[NDArray, NDArray, NDArray] | None = None
     for iteration in range(max_iter):
         logger.info("TLE fitting iteration %s", iteration + 1)
-        tle = TwoLineElement(uni, epoch=tle_epoch, pars=initial_coe, tle_config=tle_config)
-
-        max_inner_iterations = 20  # Maximum iterations for the inner while loop
-        inner_iteration = 0  # Counter for inner iterations
+        tle.update(initial_coe)
 
-        while True:
-            logger.info("TLE fitting inner iteration %s", inner_iteration + 1)
+        # the residuals and Jacobian only depend on the elements, not on the damping of the inner loop
+        if speculative is not None and np.array_equal(speculative[0], initial_coe):
+            _, residuals, jacobian = speculative
+        else:
             residuals, jacobian = compute_residuals_and_jacobian(
                 uni,
                 tle,
@@ -240,52 +473,165 @@ def fit_tle(
                 earth_radius,
                 earth_mu,
                 original_a,
+                threads=threads,
             )
-            at_w_a = np.zeros((7, 7))
-            at_w_b = np.zeros(7)
-
-            for i_epoch in range(len(residuals)):
-                at_w_a += jacobian[i_epoch].T @ w_scaled @ jacobian[i_epoch]
-                at_w_b += jacobian[i_epoch].T @ w_scaled @ (residuals[i_epoch] * b_scale)
-
-            pseudo_inverse = np.linalg.pinv(at_w_a + lm_damping_factor * at_w_a, hermitian=True)
-            dx = pseudo_inverse @ at_w_b
-
-            dx[0] *= earth_radius  # Rescale the first element
-            logger.info("dx %s", dx)
-            btwbs = residuals @ w @ residuals.T
-
-            res_old = np.sum(btwbs) / 2
+        # only the damping changes in the inner loop
+        at_w_a, at_w_b = normal_equations(jacobian, residuals * b_scale, w_scaled)
+        res_old = weighted_cost(residuals, w)
 
+        for inner_iteration in range(MAX_INNER_ITERATIONS):
+            logger.info("TLE fitting inner iteration %s", inner_iteration + 1)
+            dx = damped_correction(at_w_a, at_w_b, lm_damping_factor, earth_radius)
             new_els = initial_coe + dx
-
             new_els[6] = np.clip(new_els[6], -1, 1)  # Limit B*
 
-            tle_new = TwoLineElement(uni, epoch=tle_epoch, pars=new_els, tle_config=tle_config)
-            residuals_new = np.vstack([tle_new.eval(epoch) - ob for ob, epoch in zip(obs, obs_epochs, strict=False)])
-
-            res_new = np.sum(residuals_new @ w @ residuals_new.T) / 2
-
-            if res_new > res_old or np.isnan(res_new):
-                lm_damping_factor *= 10
-                inner_iteration += 1  # Increment inner iteration counter
-                if inner_iteration >= max_inner_iterations:  # Check if max iterations reached
-                    logger.warning("Inner loop exceeded maximum iterations, raising MaxIterationsExceededError.")
-                    msg = "Maximum iterations exceeded during TLE fitting."
-                    raise MaxIterationsExceededError(msg)
-                continue
-            lm_damping_factor = max(1e-3, lm_damping_factor / 10)
-            break
+            residuals_new, speculative = evaluate_trial(
+                uni,
+                tle_new,
+                new_els,
+                obs=obs,
+                obs_epochs=obs_epochs,
+                tle_epoch=tle_epoch,
+                constants=(earth_radius, earth_mu, original_a),
+                speculate=inner_iteration == 0,
+                threads=threads,
+            )
+            res_new = weighted_cost(residuals_new, w)
+
+            if res_new <= res_old:
+                lm_damping_factor = max(1e-3, lm_damping_factor / 10)
+                break
+            if res_new - res_old <= tolerance * res_old:
+                # the elements cannot be improved any further, keep them
+                dx[:] = 0
+                res_new = res_old
+                tle_new.update(initial_coe)
+                break
+            lm_damping_factor *= 10
+        else:
+            logger.warning("Inner loop exceeded maximum iterations, raising MaxIterationsExceededError.")
+            msg = "Maximum iterations exceeded during TLE fitting."
+            raise MaxIterationsExceededError(msg)
         initial_coe += dx
         if coe_limit:
-            initial_coe[1] = np.clip(initial_coe[1], 0, 1)  # Limit eccentricity
-            initial_coe[6] = np.clip(initial_coe[6], -1, 1)  # Limit B*
+            limit_variables(initial_coe)
 
         logger.info("Updated parameters: %s", initial_coe)
         logger.info("Residuals: %s", res_new)
+        converged = res_old - res_new <= tolerance * res_old or res_new <= residuals_floor * len(obs)
+        if progress is not None:
+            progress(
+                1.0 if converged else (iteration + 1) / max_iter,
+                {"iteration": iteration + 1, "residuals": float(res_new), "converged": bool(converged)},
+            )
+        if converged:
+            logger.info("TLE fit converged after %s iterations", iteration + 1)
+            break
+    else:
+        logger.warning("TLE fit did not converge within %s iterations.", max_iter)
     return tle_epoch, tle_new.to_line1(), tle_new.to_line2()
 
 
+def residual_weights(earth_radius: float, earth_mu: float, original_a: float) -> tuple[NDArray, NDArray, NDArray]:
+    """Return the weights of the residuals of a TLE fit.
+
+    Returns:
+        The diagonal weights of the position and velocity residuals, the same weights for the
+        residuals normalized by the Earth radius and the circular velocity, and that normalization.
+    """
+    variances = np.array([1, 1, 1, 0.001, 0.001, 0.001])
+    w = 1 / np.square(variances)
+    b_scale = np.ones(6)
+    b_scale[0:3] /= earth_radius
+    b_scale[3:] /= np.sqrt(earth_mu / original_a)
+    return w, 1 / np.square(variances * b_scale), b_scale
+
+
+def damped_correction(at_w_a: NDArray, at_w_b: NDArray, damping: float, earth_radius: float) -> NDArray:
+    """Return the Levenberg-Marquardt correction of the fit variables for a damping factor."""
+    pseudo_inverse = np.linalg.pinv(at_w_a + damping * at_w_a, hermitian=True)
+    dx = pseudo_inverse @ at_w_b
+    dx[0] *= earth_radius  # Rescale the first element
+    logger.info("dx %s", dx)
+    return dx
+
+
+def limit_variables(variables: NDArray) -> None:
+    """Clip the eccentricity and B* of fit variables to their valid range, in place."""
+    variables[1] = np.clip(variables[1], 0, 1)  # Limit eccentricity
+    variables[6] = np.clip(variables[6], -1, 1)  # Limit B*
+
+
+def evaluate_trial(
+    uni: cosmos.Universe,
+    tle: TwoLineElement,
+    variables: NDArray,
+    *,
+    obs: NDArray,
+    obs_epochs: list,
+    tle_epoch: tempo.Epoch,
+    constants: tuple[float, float, float],
+    speculate: bool,
+    threads: int = 1,
+) -> tuple[NDArray, tuple[NDArray, NDArray, NDArray] | None]:
+    """Return the residuals of trial fit variables, updating ``tle`` to them.
+
+    The first trial of an iteration is usually accepted, so with ``speculate`` the Jacobian of the
+    next iteration is evaluated around it in the same pass as the trial itself.
+
+    Args:
+        uni: The universe of the fit.
+        tle: The TLE evaluated at the trial variables.
+        variables: The trial variables.
+        obs: The fitted TEME states.
+        obs_epochs: Epochs of the fitted states.
+        tle_epoch: Epoch of the TLE.
+        constants: The Earth radius, the Earth gravitational parameter and the original semi-major axis.
+        speculate: Whether to evaluate the Jacobian as well.
+        threads: Number of threads evaluating the TLEs.
+
+    Returns:
+        The residuals, and the trial variables with their residuals and Jacobian if ``speculate``.
+    """
+    tle.update(variables)
+    if not speculate:
+        return evaluate_tles([tle], obs_epochs, threads=threads)[0] - obs, None
+    residuals, jacobian = compute_residuals_and_jacobian(
+        uni,
+        tle,
+        obs,
+        obs_epochs,
+        tle_epoch,
+        variables,
+        *constants,
+        threads=threads,
+    )
+    return -residuals, (variables, residuals, jacobian)
+
+
+def normal_equations(jacobian: NDArray, residuals: NDArray, weights: NDArray) -> tuple[NDArray, NDArray]:
+    """Accumulate the weighted normal equations of a least squares problem over all epochs.
+
+    Args:
+        jacobian: Jacobian of shape ``(epochs, 6, variables)``.
+        residuals: Residuals of shape ``(epochs, 6)``.
+        weights: Diagonal weights of the six residual components.
+
+    Returns:
+        ``A^T W A`` of shape ``(variables, variables)`` and ``A^T W b`` of shape ``(variables,)``.
+    """
+    weighted = jacobian * weights[:, None]
+    return (
+        np.tensordot(weighted, jacobian, axes=([0, 1], [0, 1])),
+        np.tensordot(weighted, residuals, axes=([0, 1], [0, 1])),
+    )
+
+
+def weighted_cost(residuals: NDArray, weights: NDArray) -> float:
+    """Return half the sum over the epochs of the weighted squared residuals ``b_i^T W b_i``."""
+    return float(np.einsum("ei,i,ei->", residuals, weights, residuals)) / 2
+
+
 def compute_residuals_and_jacobian(
     uni: cosmos.Universe,
     tle: TwoLineElement,
@@ -296,25 +642,237 @@ def compute_residuals_and_jacobian(
     earth_radius: float,
     earth_mu: float,
     original_a: float,
+    threads: int = 1,
 ) -> tuple[NDArray, NDArray]:
-    """Compute residuals and the Jacobian matrix."""
-    percent_chg = 1e-3
-    residuals = np.vstack([ob - tle.eval(e) for ob, e in zip(obs, epochs, strict=False)])
-    jacobian = np.zeros((len(epochs), 6, 7))  # Initialize the Jacobian matrix
+    """Compute residuals and the Jacobian matrix.
 
+    The nominal TLE and the seven perturbed TLEs of the finite differences are evaluated at all
+    epochs in one pass, split over ``threads`` threads.
+    """
+    percent_chg = 1e-3
+    perturbed = []
+    deltas = np.zeros(len(tle_variables))
     for idx, element in enumerate(tle_variables):
         variables_i = tle_variables.copy()
         delta_amt = 1e-08 if abs(element) < 1e-06 else element * percent_chg
         variables_i[idx] = element + delta_amt
-        tle_plus = TwoLineElement(uni, epoch=tle_epoch, pars=variables_i)
+        perturbed.append(TwoLineElement(uni, epoch=tle_epoch, pars=variables_i))
+        deltas[idx] = delta_amt / earth_radius if idx == 0 else delta_amt
 
-        if idx == 0:
-            delta_amt /= earth_radius
+    states = evaluate_tles([tle, *perturbed], epochs, threads=threads)
+    residuals = obs - states[0]
 
-        for i_epoch, epoch_i in enumerate(epochs):
-            res = tle_plus.eval(epoch_i) - tle.eval(epoch_i)
-            jacobian[i_epoch, 0:3, idx] = res[:3] / earth_radius
-            jacobian[i_epoch, 3:6, idx] = res[3:] / np.sqrt(earth_mu / original_a)
-            jacobian[i_epoch, :, idx] /= delta_amt
+    # (epochs, 6, variables) finite differences, scaled as the residuals
+    scale = np.array([earth_radius] * 3 + [np.sqrt(earth_mu / original_a)] * 3)
+    jacobian = (states[1:] - states[0]).transpose(1, 2, 0) / scale[:, None] / deltas
 
     return residuals, jacobian
+
+
+def warm_start_lines(tle: Any, start: datetime) -> tuple[str, str] | None:
+    """Return the lines of a previous TLE to start a fit at ``start`` from, if it is recent enough."""
+    max_age = timedelta(days=get_settings().fdy.TLE_FIT_WARM_START_DAYS)
+    if tle is None or abs(tle.epoch - start) > max_age:
+        return None
+    return tle.line1, tle.line2
+
+
+async def fit_tle_and_save(
+    ctx: Any,
+    *,
+    orbit_id: str,
+    step: float,
+    begin_fit: str | None = None,
+    end_fit: str | None = None,
+    points_per_revolution: int | None = None,
+) -> dict:
+    """Fit a TLE through a stored orbit and save it for the satellite of the orbit.
+
+    The fit window bounds are ISO formatted, see :func:`fit_tle_from_orbit` for the options.
+    """
+    # imported here, the task module is loaded by the queue configuration before the domain controllers
+    from app.db.models import TLE
+    from app.domain.orbit.services import OrbitService
+    from app.domain.tle.services import TLEService
+
+    start_time = time.perf_counter()
+    async with (
+        alchemy.get_session() as db_session,
+        OrbitService.new(session=db_session) as orbit_service,
+        TLEService.new(session=db_session) as tle_service,
+    ):
+        orbit = await orbit_service.get(UUID(orbit_id))
+        satellite_id = orbit.satellite_id
+        tle_config = orbit.satellite.tle_config
+        previous = await tle_service.list(
+            OrderBy(field_name="epoch", sort_order="desc"),
+            LimitOffset(limit=1, offset=0),
+            TLE.satellite_id == satellite_id,
+        )
+
+    updates = get_process_manager().Queue()
+    begin = datetime.fromisoformat(begin_fit) if begin_fit is not None else orbit.start
+    fit = await JobProgress(ctx).follow(
+        run_in_process(
+            fit_tle_from_orbit,
+            orbit.file_name,
+            tle_config,
+            step,
+            updates,
+            threads=get_settings().fdy.TLE_FIT_THREADS,
+            initial_tle=warm_start_lines(previous[0] if previous else None, begin),
+            begin=begin,
+            end=datetime.fromisoformat(end_fit) if end_fit is not None else None,
+            points_per_revolution=points_per_revolution,
+        ),
+        updates,
+        "fitting",
+    )
+
+    async with alchemy.get_session() as db_session, TLEService.new(session=db_session) as tle_service:
+        tle = await tle_service.create(
+            data={
+                "line1": fit["line1"],
+                "line2": fit["line2"],
+                "epoch": fit["epoch"],
+                "originator": "internal",
+                "satellite_id": satellite_id,
+            },
+            auto_commit=True,
+            auto_refresh=True,
+        )
+    return {
+        "tle_id": str(tle.id),
+        "satellite_id": str(satellite_id),
+        "observations": fit["observations"],
+        "iterations": fit["iterations"],
+        "converged": fit["converged"],
+        "residuals": fit["residuals"],
+        "fit_duration": fit["duration"],
+        "execution_duration": time.perf_counter() - start_time,
+    }
+
+
+def tle_fit_batch_job_key(group: str | None, step: float, points_per_revolution: int | None = None) -> str:
+    """Return the SAQ job key of a batch TLE fit, identical batches in progress share the same job."""
+    return str(uuid5(NAMESPACE_URL, f"tle-fit-batch:group={group}:step={step}:ppr={points_per_revolution}"))
+
+
+async def fit_tle_batch(
+    ctx: Any,
+    *,
+    step: float,
+    group: str | None = None,
+    points_per_revolution: int | None = None,
+) -> dict:
+    """Fit a TLE through the latest orbit of every active satellite and save them together.
+
+    The fits are spread over the process pool, every process fitting in its warm universe, and
+    the resulting TLEs are inserted in a single transaction once all fits are done. A failed fit
+    is reported without failing the batch.
+
+    Args:
+        ctx: The SAQ context.
+        step: Step of the fitted samples of the orbits in seconds.
+        group: Only fit the active satellites of this group.
+        points_per_revolution: Sample the orbits per revolution instead, see
+            :func:`fit_tle_from_orbit`.
+
+    Returns:
+        One entry per satellite with its ``orbit_id``, whether the fit started from the previous
+        TLE of the satellite (``warm_start``), the ``tle_id``, number of ``observations`` and
+        ``iterations``, convergence, final ``residuals`` and ``duration`` of the fit, or its
+        ``error``, the satellites without any orbit and the total duration of the batch.
+    """
+    # imported here, the task module is loaded by the queue configuration before the domain controllers
+    from app.db.models import TLE, IpfOrbit, Satellite
+    from app.domain.orbit.services import OrbitService
+    from app.domain.satellite.services import SatelliteService
+    from app.domain.tle.services import TLEService
+
+    start_time = time.perf_counter()
+    conditions = [Satellite.is_active]
+    if group is not None:
+        conditions.append(Satellite.group == group)
+    async with (
+        alchemy.get_session() as db_session,
+        SatelliteService.new(session=db_session) as satellite_service,
+        OrbitService.new(session=db_session) as orbit_service,
+        TLEService.new(session=db_session) as tle_service,
+    ):
+        satellites = await satellite_service.list(*conditions)
+        # latest orbit of every satellite, with DISTINCT ON
+        latest = (
+            select(IpfOrbit)
+            .where(IpfOrbit.satellite_id.in_([satellite.id for satellite in satellites]))
+            .order_by(IpfOrbit.satellite_id, IpfOrbit.created_at.desc())
+            .distinct(IpfOrbit.satellite_id)
+        )
+        orbits = await orbit_service.list(statement=latest)
+        # latest TLE of every satellite, to start the fits from
+        latest_tles = (
+            select(TLE)
+            .where(TLE.satellite_id.in_([orbit.satellite_id for orbit in orbits]))
+            .order_by(TLE.satellite_id, TLE.epoch.desc())
+            .distinct(TLE.satellite_id)
+        )
+        previous = {tle.satellite_id: tle for tle in await tle_service.list(statement=latest_tles)}
+    tle_configs = {satellite.id: satellite.tle_config for satellite in satellites}
+    skipped = sorted({satellite.id for satellite in satellites} - {orbit.satellite_id for orbit in orbits}, key=str)
+
+    progress = JobProgress(ctx)
+    threads = get_settings().fdy.TLE_FIT_THREADS
+    done = 0
+
+    async def fit(orbit: Any) -> dict:
+        nonlocal done
+        initial_tle = warm_start_lines(previous.get(orbit.satellite_id), orbit.start)
+        report = {
+            "satellite_id": str(orbit.satellite_id),
+            "orbit_id": str(orbit.id),
+            "warm_start": initial_tle is not None,
+        }
+        try:
+            return report | await run_in_process(
+                fit_tle_from_orbit,
+                orbit.file_name,
+                tle_configs[orbit.satellite_id],
+                step,
+                threads=threads,
+                initial_tle=initial_tle,
+                points_per_revolution=points_per_revolution,
+            )
+        except Exception as e:
+            logger.exception("TLE fit failed for satellite %s.", orbit.satellite_id)
+            return report | {"error": str(e)}
+        finally:
+            done += 1
+            await progress.count(done, len(orbits), "fitting")
+
+    reports = await asyncio.gather(*(fit(orbit) for orbit in orbits))
+
+    fitted = [report for report in reports if "error" not in report]
+    if fitted:
+        async with alchemy.get_session() as db_session, TLEService.new(session=db_session) as tle_service:
+            tles = await tle_service.create_many(
+                data=[
+                    {
+                        "line1": report["line1"],
+                        "line2": report["line2"],
+                        "epoch": report["epoch"],
+                        "originator": "internal",
+                        "satellite_id": UUID(report["satellite_id"]),
+                    }
+                    for report in fitted
+                ],
+                auto_commit=True,
+            )
+        for report, tle in zip(fitted, tles, strict=True):
+            report["tle_id"] = str(tle.id)
+            report["epoch"] = report["epoch"].isoformat()
+
+    return {
+        "satellites": reports,
+        "skipped_satellite_ids": [str(satellite_id) for satellite_id in skipped],
+        "execution_duration": time.perf_counter() - start_time,
+    }
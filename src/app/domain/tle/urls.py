@@ -1,4 +1,7 @@
 TLE_LIST = "/api/tles"
+TLE_CATALOG = "/api/tles/catalog"
 TLE_DELETE = "/api/tles/{tle_id:uuid}"
 TLE_DETAILS = "/api/tles/{tle_id:uuid}"
 TLE_FIT = "/api/tle/fit"
+TLE_FIT_BATCH = "/api/tle/fit/batch"
+TLE_FIT_EVENTS = "/api/tle/fit/{job_key:str}/events"
@@ -1,4 +1,3 @@
-from godot import cosmos
 from godot.core.astro import convert
 from godot.core.tempo import Epoch
 from litestar import post
@@ -15,6 +14,7 @@ from app.domain.util.schemas import (
     TimeScaleConversionOutput,
 )
 from app.lib.universe_assembler import uni_config
+from app.lib.universe_pool import get_universe_pool
 
 logger = get_logger()
 
@@ -37,7 +37,7 @@ class ConversionController(Controller):
         self,
         data: StateConversionInput,
     ) -> StateConversionOutput:
-        uni = cosmos.Universe(uni_config)
+        uni = get_universe_pool().get(uni_config)
 
         return StateConversionOutput(
             state=convert(
@@ -0,0 +1,197 @@
+"""Propagation of a whole TLE catalog to a common epoch grid.
+
+:class:`TleCatalog` holds one element set per object in a structure-of-arrays layout, one array
+per mean element, and evaluates SGP4 for every object at every epoch of a grid as array
+operations. The work is split in blocks of objects and epochs whose size bounds the memory taken
+by the intermediate arrays of SGP4. Blocks are independent and picklable, so they can also be
+propagated in other processes.
+
+Deep-space objects (orbital period of 225 minutes or more) are not supported by
+:class:`~app.flight_dynamics.sgp4.Sgp4`; their states are ``nan``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from app.flight_dynamics.sgp4 import Sgp4, TleElements, is_deep_space
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from concurrent.futures import Executor
+
+    from numpy.typing import ArrayLike, DTypeLike, NDArray
+
+    from app.flight_dynamics.tle_catalog import TleCatalogChunk
+
+__all__ = ("MAX_BLOCK_SIZE", "CatalogBlock", "CatalogStates", "TleCatalog", "as_datetime64")
+
+MAX_BLOCK_SIZE = 250_000
+"""Default number of object epochs propagated at once, about 2 MB per intermediate array."""
+
+
+def as_datetime64(epochs: Sequence[datetime] | ArrayLike) -> NDArray:
+    """Return epochs as a ``datetime64[us]`` array of UTC epochs, naive datetimes taken as UTC."""
+    if isinstance(epochs, np.ndarray) and np.issubdtype(epochs.dtype, np.datetime64):
+        return epochs.astype("datetime64[us]")
+    return np.array(
+        [epoch.astimezone(UTC).replace(tzinfo=None) if epoch.tzinfo is not None else epoch for epoch in epochs],
+        dtype="datetime64[us]",
+    )
+
+
+@dataclass
+class CatalogBlock:
+    """Objects and epochs of a catalog propagated together."""
+
+    objects: NDArray
+    """Indices of the objects in the catalog."""
+    columns: slice
+    """Indices of the epochs in the grid."""
+    elements: TleElements
+    epochs: NDArray
+    """UTC epochs of the block as ``datetime64[us]``."""
+
+    def propagate(self) -> tuple[NDArray, NDArray]:
+        """Return the TEME positions in km and velocities in km/s of the block."""
+        tle_epochs = as_datetime64(self.elements.epoch)
+        tsince = (self.epochs[None, :] - tle_epochs[:, None]) / np.timedelta64(1, "m")
+        return Sgp4(self.elements).propagate(tsince)
+
+
+@dataclass
+class CatalogStates:
+    """States of the objects of a catalog on an epoch grid."""
+
+    ids: list[Any]
+    epochs: NDArray
+    """UTC epochs of the grid as ``datetime64[us]``."""
+    position: NDArray
+    """TEME positions in km, of shape ``(n_objects, n_epochs, 3)``."""
+    velocity: NDArray
+    """TEME velocities in km/s, of shape ``(n_objects, n_epochs, 3)``."""
+
+    def store(self, block: CatalogBlock, position: NDArray, velocity: NDArray) -> None:
+        """Store the propagated states of a block."""
+        self.position[block.objects, block.columns] = position
+        self.velocity[block.objects, block.columns] = velocity
+
+
+@dataclass
+class TleCatalog:
+    """Element sets of a catalog of objects, one per object."""
+
+    ids: list[Any]
+    """Identifier of every object, e.g. its satellite id or NORAD id."""
+    elements: TleElements
+    epoch: NDArray
+    """UTC epochs of the element sets as ``datetime64[us]``."""
+    deep_space: NDArray
+    """Whether an object needs the deep-space model, which is not supported."""
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_lines(cls, ids: Sequence[Any], lines: Sequence[tuple[str, str]]) -> TleCatalog:
+        """Build a catalog from the ``(line1, line2)`` pair of every object."""
+        elements = TleElements.from_lines(lines)
+        return cls(
+            ids=list(ids),
+            elements=elements,
+            epoch=as_datetime64(elements.epoch),
+            deep_space=is_deep_space(elements),
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[TleCatalogChunk]) -> TleCatalog:
+        """Build a catalog from the valid records of a catalog file, identified by NORAD id.
+
+        The last record of every NORAD id is kept.
+        """
+        records: dict[int, tuple[str, str]] = {}
+        for chunk in chunks:
+            for norad_id, line1, line2, valid in zip(
+                chunk.norad_id.tolist(),
+                chunk.line1,
+                chunk.line2,
+                chunk.valid,
+                strict=True,
+            ):
+                if valid:
+                    records[norad_id] = (line1, line2)
+        return cls.from_lines(list(records), list(records.values()))
+
+    def take(self, indices: ArrayLike) -> TleCatalog:
+        """Return the catalog of the objects at the given indices."""
+        indices = np.asarray(indices, dtype=np.intp)
+        return TleCatalog(
+            ids=[self.ids[index] for index in indices.tolist()],
+            elements=self.elements.take(indices),
+            epoch=self.epoch[indices],
+            deep_space=self.deep_space[indices],
+        )
+
+    def blocks(self, epochs: NDArray, max_block_size: int = MAX_BLOCK_SIZE) -> Iterator[CatalogBlock]:
+        """Split the propagation of the supported objects to an epoch grid in blocks.
+
+        Args:
+            epochs: UTC epochs of the grid as ``datetime64[us]``.
+            max_block_size: Maximum number of object epochs of a block.
+        """
+        epoch_step = max(1, min(len(epochs), max_block_size))
+        object_step = max(1, max_block_size // epoch_step)
+        supported = np.flatnonzero(~self.deep_space)
+        for first_object in range(0, len(supported), object_step):
+            objects = supported[first_object : first_object + object_step]
+            elements = self.elements.take(objects)
+            for first_epoch in range(0, len(epochs), epoch_step):
+                columns = slice(first_epoch, first_epoch + epoch_step)
+                yield CatalogBlock(objects=objects, columns=columns, elements=elements, epochs=epochs[columns])
+
+    def empty_states(self, epochs: NDArray, dtype: DTypeLike = np.float64) -> CatalogStates:
+        """Return the states of the catalog on an epoch grid, all ``nan`` until blocks are stored."""
+        shape = (len(self), len(epochs), 3)
+        return CatalogStates(
+            ids=self.ids,
+            epochs=epochs,
+            position=np.full(shape, np.nan, dtype=dtype),
+            velocity=np.full(shape, np.nan, dtype=dtype),
+        )
+
+    def propagate(
+        self,
+        epochs: Sequence[datetime] | ArrayLike,
+        max_block_size: int = MAX_BLOCK_SIZE,
+        executor: Executor | None = None,
+        dtype: DTypeLike = np.float64,
+    ) -> CatalogStates:
+        """Propagate every object of the catalog to the same epochs.
+
+        Args:
+            epochs: UTC epochs of the grid, naive datetimes taken as UTC.
+            max_block_size: Maximum number of object epochs propagated at once.
+            executor: Executor to propagate the blocks in, e.g. a process pool. The blocks are
+                propagated in place by default.
+            dtype: Data type of the stored states, e.g. ``float32`` to halve their memory.
+
+        Returns:
+            The states of every object, ``nan`` for deep-space objects and for objects that
+            decayed.
+        """
+        epochs = as_datetime64(epochs)
+        states = self.empty_states(epochs, dtype)
+        blocks = self.blocks(epochs, max_block_size)
+        if executor is None:
+            for block in blocks:
+                states.store(block, *block.propagate())
+        else:
+            # the blocks only hold their element sets and epochs, their states are stored as they come
+            blocks = list(blocks)
+            for block, result in zip(blocks, executor.map(CatalogBlock.propagate, blocks), strict=True):
+                states.store(block, *result)
+        return states
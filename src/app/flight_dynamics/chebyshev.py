@@ -0,0 +1,158 @@
+"""Piecewise Chebyshev representation of an ephemeris.
+
+The span of an orbit is split into equal segments, and the position over every segment is
+approximated by one Chebyshev polynomial per component, as in JPL SPK type 2 segments. The
+velocity is the derivative of that polynomial. The segments all have the same length, so looking
+up the segment of an epoch is a division, and evaluating a state takes a few multiplications
+without loading a GODOT universe.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from numpy.typing import ArrayLike, NDArray
+
+__all__ = ("ChebyshevEphemeris", "fit_chebyshev")
+
+
+@dataclass
+class ChebyshevEphemeris:
+    """Equal length Chebyshev segments of the position of an orbit."""
+
+    start: datetime
+    """Start epoch of the first segment."""
+    interval: float
+    """Length of every segment in seconds."""
+    coefficients: NDArray
+    """Chebyshev coefficients of the position in km, shape ``(n_segments, 3, degree + 1)``."""
+
+    @property
+    def duration(self) -> float:
+        """Covered span in seconds."""
+        return self.interval * len(self.coefficients)
+
+    @property
+    def degree(self) -> int:
+        return self.coefficients.shape[-1] - 1
+
+    def _evaluate(self, seconds: ArrayLike, derivative: bool) -> NDArray:
+        seconds = np.asarray(seconds, dtype=float)
+        if np.any((seconds < 0) | (seconds > self.duration)):
+            msg = "Epoch outside of the span of the ephemeris."
+            raise ValueError(msg)
+        flat = np.atleast_1d(seconds)
+        index = np.minimum((flat // self.interval).astype(int), len(self.coefficients) - 1)
+        # normalized time within the segment, in [-1, 1]
+        tau = 2 * (flat - index * self.interval) / self.interval - 1
+        # (degree + 1, 3, n) coefficients, evaluated column-wise
+        coefficients = self.coefficients[index].transpose(2, 1, 0)
+        values = [chebyshev.chebval(tau, coefficients, tensor=False)]
+        if derivative:
+            values.append(chebyshev.chebval(tau, chebyshev.chebder(coefficients), tensor=False) * 2 / self.interval)
+        result = np.concatenate(values).T
+        return result.reshape(*seconds.shape, result.shape[-1])
+
+    def position(self, seconds: ArrayLike) -> NDArray:
+        """Return the positions in km at epochs given in seconds since :attr:`start`."""
+        return self._evaluate(seconds, derivative=False)
+
+    def state(self, seconds: ArrayLike) -> NDArray:
+        """Return the states in km and km/s at epochs given in seconds since :attr:`start`.
+
+        Returns:
+            An array of shape ``(n, 6)``, or ``(6,)`` for a scalar epoch.
+        """
+        return self._evaluate(seconds, derivative=True)
+
+    def seconds_since_start(self, epoch: datetime) -> float:
+        return (epoch - self.start).total_seconds()
+
+    def to_bytes(self) -> bytes:
+        """Serialize the ephemeris to a compressed ``.npz`` file."""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            start=np.array(self.start.isoformat()),
+            interval=np.array(self.interval),
+            coefficients=self.coefficients,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> ChebyshevEphemeris:
+        """Load an ephemeris serialized with :meth:`to_bytes`."""
+        with np.load(io.BytesIO(content)) as data:
+            return cls(
+                start=datetime.fromisoformat(str(data["start"])),
+                interval=float(data["interval"]),
+                coefficients=data["coefficients"],
+            )
+
+
+def fit_chebyshev(
+    sample: Callable[[NDArray], NDArray],
+    start: datetime,
+    duration: float,
+    tolerance: float,
+    degree: int = 12,
+    max_segments: int = 2**16,
+) -> ChebyshevEphemeris:
+    """Fit Chebyshev segments to a trajectory within a position tolerance.
+
+    The number of segments is doubled until the position error, checked between the fitting
+    nodes, is below the tolerance.
+
+    Args:
+        sample: Returns the positions in km, shape ``(n, 3)`` or more columns, at epochs given in
+            seconds since ``start``.
+        start: Start epoch of the trajectory.
+        duration: Span of the trajectory in seconds.
+        tolerance: Maximum position error in km.
+        degree: Degree of the polynomial of every segment.
+        max_segments: Maximum number of segments.
+
+    Returns:
+        The fitted ephemeris.
+
+    Raises:
+        ValueError: If the tolerance is not met with ``max_segments`` segments.
+    """
+    nodes = np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))[::-1]
+    # the extrema of the polynomials interleave with the nodes and include the segment boundaries
+    checks = np.cos(np.pi * np.arange(degree + 2) / (degree + 1))[::-1]
+    vandermonde = np.linalg.pinv(chebyshev.chebvander(nodes, degree))
+
+    segments = max(1, math.ceil(duration / 86400))
+    while True:
+        interval = duration / segments
+        offsets = np.arange(segments)[:, None] * interval
+        positions = np.asarray(sample((offsets + (nodes + 1) * interval / 2).ravel()))[:, :3]
+        # (degree + 1, segments * 3) least squares solution, reshaped to (segments, 3, degree + 1)
+        values = positions.reshape(segments, degree + 1, 3).transpose(1, 0, 2).reshape(degree + 1, -1)
+        coefficients = vandermonde @ values
+        coefficients = coefficients.reshape(degree + 1, segments, 3).transpose(1, 2, 0)
+
+        check_times = (offsets + (checks + 1) * interval / 2).ravel()
+        expected = np.asarray(sample(check_times))[:, :3]
+        fitted = np.moveaxis(chebyshev.chebval(checks, np.moveaxis(coefficients, -1, 0)), -1, 1).reshape(-1, 3)
+        error = np.max(np.linalg.norm(fitted - expected, axis=1))
+        if error <= tolerance:
+            return ChebyshevEphemeris(start=start, interval=interval, coefficients=coefficients)
+        if segments >= max_segments:
+            msg = (
+                f"Position error of {error:.3g} km with {segments} segments, "
+                f"above the tolerance of {tolerance:.3g} km."
+            )
+            raise ValueError(msg)
+        segments *= 2
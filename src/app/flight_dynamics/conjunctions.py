@@ -0,0 +1,353 @@
+"""Conjunction screening of a TLE catalog.
+
+Comparing every pair of objects at every epoch is quadratic in the size of the catalog. The
+screening instead narrows the pairs down in three stages, each close to linear in that size:
+
+1. Apogee/perigee filter: an object whose radial shell, from its perigee to its apogee radius,
+   overlaps no other shell cannot approach any other object and is not propagated.
+2. Spatial hash grid: at every epoch of the grid, the positions are binned in cubic cells and only
+   the objects of neighbouring cells are compared. A pair is a candidate when it may come within
+   the threshold before the neighbouring epochs given the speeds of its objects, and when their
+   shells overlap.
+3. Refinement: the time of closest approach (TCA) of every candidate is found by Newton
+   iterations on the range rate, propagating both objects with SGP4.
+
+The grid is screened in windows of epochs, see :func:`screen_windows`, which are independent and
+can run in other processes.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.flight_dynamics.sgp4 import EARTH_RADIUS, X2O3, XKE, Sgp4, unkozai_mean_motion
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+    from app.flight_dynamics.catalog import TleCatalog
+
+__all__ = (
+    "ConjunctionCandidates",
+    "Conjunctions",
+    "find_candidates",
+    "refine_candidates",
+    "screen_catalog",
+    "screen_windows",
+    "shell_filter",
+)
+
+SHELL_MARGIN = 50.0
+"""Padding in km of the radial shells, for the short periodic terms and the decay within a screening."""
+MAX_ACCELERATION = 0.00982
+"""Upper bound of the acceleration of an orbiting object in km/s^2, to bound its motion between epochs."""
+MAX_WINDOW_STATES = 1_000_000
+"""Default number of object epochs of a screening window."""
+_CELL_BITS = 21
+_CELL_MASK = (1 << _CELL_BITS) - 1
+# the cell itself and half of its 26 neighbours, every pair of adjacent cells being visited once
+_HALF_NEIGHBOURHOOD = np.array(
+    [offset for offset in itertools.product((-1, 0, 1), repeat=3) if offset >= (0, 0, 0)],
+    dtype=np.int64,
+)
+
+
+@dataclass
+class ConjunctionCandidates:
+    """Pairs of objects that may approach within the threshold around epochs of the grid."""
+
+    first: NDArray
+    """Index of the first object of every pair in the catalog."""
+    second: NDArray
+    """Index of the second object of every pair, greater than the first."""
+    epoch_index: NDArray
+    """Index of the epoch in the grid."""
+    distance: NDArray
+    """Distance of the objects at the epoch in km."""
+
+    def __len__(self) -> int:
+        return len(self.first)
+
+    @classmethod
+    def concatenate(cls, candidates: list[ConjunctionCandidates]) -> ConjunctionCandidates:
+        return cls(
+            *(np.concatenate([getattr(part, field.name) for part in candidates]) for field in fields(cls)),
+        )
+
+
+@dataclass
+class Conjunctions:
+    """Close approaches of pairs of objects of a catalog."""
+
+    first: NDArray
+    """Index of the first object of every pair in the catalog."""
+    second: NDArray
+    """Index of the second object of every pair, greater than the first."""
+    tca: NDArray
+    """Time of closest approach as ``datetime64[us]``."""
+    miss_distance: NDArray
+    """Distance of the objects at the TCA in km."""
+    relative_speed: NDArray
+    """Relative speed of the objects at the TCA in km/s."""
+
+    def __len__(self) -> int:
+        return len(self.first)
+
+
+def shell_bounds(catalog: TleCatalog) -> tuple[NDArray, NDArray]:
+    """Return the mean perigee and apogee radii of the objects in km."""
+    elements = catalog.elements
+    sma = (XKE / unkozai_mean_motion(elements)) ** X2O3 * EARTH_RADIUS
+    return sma * (1 - elements.eccentricity), sma * (1 + elements.eccentricity)
+
+
+def shell_filter(catalog: TleCatalog, threshold: float) -> NDArray:
+    """Return the indices of the supported objects whose radial shell overlaps the shell of another one.
+
+    Sorted by perigee, an object overlaps an earlier one when the largest earlier apogee reaches its
+    perigee, and a later one when the next perigee is within its apogee.
+    """
+    supported = np.flatnonzero(~catalog.deep_space)
+    perigee, apogee = (bound[supported] for bound in shell_bounds(catalog))
+    pad = threshold + 2 * SHELL_MARGIN
+    order = np.argsort(perigee, kind="stable")
+    perigee, apogee = perigee[order], apogee[order]
+    earlier = np.maximum.accumulate(np.concatenate(([-np.inf], apogee[:-1])))
+    later = np.concatenate((perigee[1:], [np.inf]))
+    overlaps = (earlier + pad >= perigee) | (later <= apogee + pad)
+    return np.sort(supported[order[overlaps]])
+
+
+def _cell_keys(cells: NDArray) -> NDArray:
+    """Hash integer cell coordinates, wrapping them around: collisions only add candidates."""
+    cells = cells & _CELL_MASK
+    return (cells[:, 0] << 2 * _CELL_BITS) | (cells[:, 1] << _CELL_BITS) | cells[:, 2]
+
+
+def neighbour_pairs(position: NDArray, cell_size: float) -> tuple[NDArray, NDArray]:
+    """Return the pairs ``i < j`` of points in the same or in adjacent cells of a cubic grid.
+
+    Every pair of points closer than ``cell_size`` is returned, along with pairs up to about
+    ``2 * sqrt(3) * cell_size`` apart. Points with ``nan`` coordinates are skipped.
+    """
+    points = np.flatnonzero(np.isfinite(position).all(axis=1))
+    cells = np.floor(position[points] / cell_size).astype(np.int64)
+    keys = _cell_keys(cells)
+    order = np.argsort(keys, kind="stable")
+    # translating the cells keeps their order, so the searched keys are sorted as well
+    points, cells, keys = points[order], cells[order], keys[order]
+    first, second = [], []
+    for offset in _HALF_NEIGHBOURHOOD:
+        neighbours = _cell_keys(cells + offset)
+        low = np.searchsorted(keys, neighbours, side="left")
+        counts = np.searchsorted(keys, neighbours, side="right") - low
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        # the points of the neighbouring cell of every point, as ranges of the sorted points
+        index = np.repeat(np.arange(len(cells)), counts)
+        other = np.arange(total) + np.repeat(low - np.cumsum(counts) + counts, counts)
+        if not offset.any():
+            keep = index < other
+            index, other = index[keep], other[keep]
+        index, other = points[index], points[other]
+        first.append(np.minimum(index, other))
+        second.append(np.maximum(index, other))
+    if not first:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(first), np.concatenate(second)
+
+
+def _reach(velocity: NDArray, step: float) -> NDArray:
+    """Return how far objects may move within half a step of the grid, in km."""
+    half_step = step / 2
+    return np.linalg.norm(velocity, axis=-1) * half_step + MAX_ACCELERATION * half_step**2 / 2
+
+
+def find_candidates(
+    catalog: TleCatalog,
+    epochs: NDArray,
+    threshold: float,
+    step: float,
+    first_index: int = 0,
+) -> ConjunctionCandidates:
+    """Find the candidate pairs of a window of the epoch grid.
+
+    Args:
+        catalog: The screened objects.
+        epochs: UTC epochs of the window as ``datetime64[us]``.
+        threshold: Screening distance in km.
+        step: Step of the epoch grid in seconds.
+        first_index: Index of the first epoch of the window in the grid.
+    """
+    states = catalog.propagate(epochs)
+    perigee, apogee = shell_bounds(catalog)
+    pad = threshold + 2 * SHELL_MARGIN
+    half_step = step / 2
+    # bound of the departure from a straight relative motion within half a step
+    curvature = MAX_ACCELERATION * half_step**2
+    candidates = []
+    for column in range(len(epochs)):
+        position = states.position[:, column]
+        velocity = states.velocity[:, column]
+        reach = _reach(velocity, step)
+        first, second = neighbour_pairs(position, threshold + 2 * np.nanmax(reach, initial=0.0) + curvature)
+        overlap = np.maximum(perigee[first], perigee[second]) <= np.minimum(apogee[first], apogee[second]) + pad
+        first, second = first[overlap], second[overlap]
+        # closest distance of the straight relative motion within half a step of the epoch
+        relative_position = position[second] - position[first]
+        relative_velocity = velocity[second] - velocity[first]
+        rate = np.einsum("ij,ij->i", relative_position, relative_velocity)
+        speed2 = np.maximum(np.einsum("ij,ij->i", relative_velocity, relative_velocity), 1e-12)
+        tau = np.clip(-rate / speed2, -half_step, half_step)
+        closest = np.linalg.norm(relative_position + tau[:, None] * relative_velocity, axis=-1)
+        keep = closest <= threshold + curvature
+        candidates.append(
+            ConjunctionCandidates(
+                first=first[keep],
+                second=second[keep],
+                epoch_index=np.full(int(keep.sum()), first_index + column),
+                distance=np.linalg.norm(relative_position[keep], axis=-1),
+            ),
+        )
+    return ConjunctionCandidates.concatenate(candidates)
+
+
+def _closest_samples(candidates: ConjunctionCandidates) -> ConjunctionCandidates:
+    """Keep the closest sample of every run of consecutive epochs of a pair."""
+    order = np.lexsort((candidates.epoch_index, candidates.second, candidates.first))
+    first, second, epoch_index = (
+        candidates.first[order],
+        candidates.second[order],
+        candidates.epoch_index[order],
+    )
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (first[1:] != first[:-1]) | (second[1:] != second[:-1]) | (epoch_index[1:] != epoch_index[:-1] + 1)
+    run = np.cumsum(starts)
+    closest = np.lexsort((candidates.distance[order], run))
+    closest = closest[np.concatenate(([True], run[closest][1:] != run[closest][:-1]))]
+    return ConjunctionCandidates(
+        first=first[closest],
+        second=second[closest],
+        epoch_index=epoch_index[closest],
+        distance=candidates.distance[order][closest],
+    )
+
+
+def refine_candidates(
+    catalog: TleCatalog,
+    epochs: NDArray,
+    candidates: ConjunctionCandidates,
+    threshold: float,
+    step: float,
+    iterations: int = 8,
+) -> Conjunctions:
+    """Find the time of closest approach of the candidates and keep the conjunctions within the threshold.
+
+    Args:
+        catalog: The screened objects.
+        epochs: UTC epochs of the grid as ``datetime64[us]``.
+        candidates: The candidate pairs of the whole grid.
+        threshold: Screening distance in km.
+        step: Step of the epoch grid in seconds.
+        iterations: Maximum number of Newton iterations.
+    """
+    if len(candidates) == 0:
+        empty = np.empty(0)
+        return Conjunctions(
+            first=np.empty(0, dtype=np.intp),
+            second=np.empty(0, dtype=np.intp),
+            tca=np.empty(0, dtype="datetime64[us]"),
+            miss_distance=empty,
+            relative_speed=empty,
+        )
+    candidates = _closest_samples(candidates)
+    origin = epochs[0]
+    first_sgp4 = Sgp4(catalog.elements.take(candidates.first))
+    second_sgp4 = Sgp4(catalog.elements.take(candidates.second))
+    # epochs as seconds since the start of the grid
+    first_offset = (catalog.epoch[candidates.first] - origin) / np.timedelta64(1, "s")
+    second_offset = (catalog.epoch[candidates.second] - origin) / np.timedelta64(1, "s")
+    sample = (epochs[candidates.epoch_index] - origin) / np.timedelta64(1, "s")
+    end = (epochs[-1] - origin) / np.timedelta64(1, "s")
+
+    def relative_state(t: NDArray) -> tuple[NDArray, NDArray]:
+        first_position, first_velocity = first_sgp4.propagate(((t - first_offset) / 60.0)[:, None])
+        second_position, second_velocity = second_sgp4.propagate(((t - second_offset) / 60.0)[:, None])
+        return second_position[:, 0] - first_position[:, 0], second_velocity[:, 0] - first_velocity[:, 0]
+
+    # the range rate vanishes at the TCA, its derivative is about the squared relative speed
+    t = sample.copy()
+    for _ in range(iterations):
+        position, velocity = relative_state(t)
+        range_rate = np.einsum("ij,ij->i", position, velocity)
+        correction = -range_rate / np.maximum(np.einsum("ij,ij->i", velocity, velocity), 1e-12)
+        correction = np.nan_to_num(np.clip(correction, -step, step))
+        t = np.clip(np.clip(t + correction, sample - step, sample + step), 0.0, end)
+        if np.all(np.abs(correction) < 1e-3):
+            break
+    position, velocity = relative_state(t)
+    miss_distance = np.linalg.norm(position, axis=-1)
+    relative_speed = np.linalg.norm(velocity, axis=-1)
+    tca = origin + np.rint(t * 1e6).astype("timedelta64[us]")
+
+    keep = miss_distance <= threshold
+    # runs split by a missed sample may converge to the same approach
+    order = np.lexsort((t, candidates.second, candidates.first))
+    order = order[keep[order]]
+    duplicate = np.zeros(len(order), dtype=bool)
+    duplicate[1:] = (
+        (candidates.first[order][1:] == candidates.first[order][:-1])
+        & (candidates.second[order][1:] == candidates.second[order][:-1])
+        & (np.diff(t[order]) < step)
+    )
+    order = order[~duplicate]
+    return Conjunctions(
+        first=candidates.first[order],
+        second=candidates.second[order],
+        tca=tca[order],
+        miss_distance=miss_distance[order],
+        relative_speed=relative_speed[order],
+    )
+
+
+def screen_windows(catalog: TleCatalog, epochs: NDArray, max_window_states: int = MAX_WINDOW_STATES) -> list[slice]:
+    """Split an epoch grid in windows of at most ``max_window_states`` object epochs."""
+    size = max(1, max_window_states // max(1, len(catalog)))
+    return [slice(start, min(start + size, len(epochs))) for start in range(0, len(epochs), size)]
+
+
+def screen_catalog(
+    catalog: TleCatalog,
+    epochs: NDArray,
+    threshold: float,
+    max_window_states: int = MAX_WINDOW_STATES,
+) -> Conjunctions:
+    """Screen a catalog for conjunctions on a uniform epoch grid.
+
+    Args:
+        catalog: The objects to screen.
+        epochs: UTC epochs of the grid as ``datetime64[us]``, at least two.
+        threshold: Screening distance in km.
+        max_window_states: Maximum number of object epochs propagated at once.
+
+    Returns:
+        The conjunctions, indexing ``catalog``.
+    """
+    step = (epochs[1] - epochs[0]) / np.timedelta64(1, "s")
+    screened = shell_filter(catalog, threshold)
+    subset = catalog.take(screened)
+    candidates = ConjunctionCandidates.concatenate(
+        [
+            find_candidates(subset, epochs[window], threshold, step, window.start)
+            for window in screen_windows(subset, epochs, max_window_states)
+        ],
+    )
+    conjunctions = refine_candidates(subset, epochs, candidates, threshold, step)
+    conjunctions.first = screened[conjunctions.first]
+    conjunctions.second = screened[conjunctions.second]
+    return conjunctions
@@ -0,0 +1,223 @@
+"""Monte Carlo propagation of a dispersed set of initial conditions.
+
+The samples of an ensemble only differ by their initial state, drag and SRP coefficients and
+mass. The coefficients and the mass are therefore declared as universe parameters, so that every
+sample can be computed in the same (pooled) universe by setting these parameters, instead of
+building a universe per sample.
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+import numpy as np
+from godot import cosmos
+from godot.core import tempo
+
+from app.lib.universe_pool import get_universe_pool
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+__all__ = (
+    "ENSEMBLE_PARAMETERS",
+    "EnsembleSamples",
+    "draw_samples",
+    "nominal_state",
+    "output_grid",
+    "parametrize_dynamics",
+    "propagate_sample",
+    "summarize_ensemble",
+)
+
+DRAG_COEFFICIENT = "ensemble_cd"
+SRP_COEFFICIENT = "ensemble_cr"
+MASS = "ensemble_mass"
+ENSEMBLE_PARAMETERS = (DRAG_COEFFICIENT, SRP_COEFFICIENT, MASS)
+
+
+def parametrize_dynamics(uni_config: dict, drag_coefficient: float, srp_coefficient: float, mass: float) -> dict:
+    """Return a copy of a universe configuration with the dispersed quantities as parameters.
+
+    Args:
+        uni_config: The universe configuration, as built by ``get_dynamics_config``.
+        drag_coefficient: The nominal drag coefficient.
+        srp_coefficient: The nominal SRP coefficient.
+        mass: The nominal spacecraft mass in kg.
+
+    Returns:
+        The parametrized universe configuration.
+    """
+    config = copy.deepcopy(uni_config)
+    for dynamics in config["dynamics"]:
+        if dynamics["type"] == "SimpleDrag":
+            dynamics["config"] |= {"cd": DRAG_COEFFICIENT, "mass": MASS}
+        elif dynamics["type"] == "SimpleSRP":
+            dynamics["config"] |= {"cr": SRP_COEFFICIENT, "mass": MASS}
+    config["parameters"] = [
+        *config.get("parameters", []),
+        {"name": DRAG_COEFFICIENT, "value": drag_coefficient},
+        {"name": SRP_COEFFICIENT, "value": srp_coefficient},
+        {"name": MASS, "value": f"{mass} kg"},
+    ]
+    return config
+
+
+@dataclass
+class EnsembleSamples:
+    """Dispersed inputs of an ensemble, one row per sample."""
+
+    states: NDArray
+    """Initial Cartesian states in km and km/s, shape ``(n, 6)``."""
+    drag_coefficients: NDArray
+    srp_coefficients: NDArray
+    masses: NDArray
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def as_array(self) -> NDArray:
+        """Return the samples as one ``(n, 9)`` array."""
+        return np.column_stack([self.states, self.drag_coefficients, self.srp_coefficients, self.masses])
+
+
+def draw_samples(
+    nominal_state: NDArray,
+    drag_coefficient: float,
+    srp_coefficient: float,
+    mass: float,
+    *,
+    samples: int,
+    position_sigma: float,
+    velocity_sigma: float,
+    drag_coefficient_sigma: float,
+    srp_coefficient_sigma: float,
+    mass_sigma: float,
+    seed: int | None = None,
+) -> EnsembleSamples:
+    """Draw normally distributed samples around the nominal inputs.
+
+    The first sample is always the nominal one.
+
+    Args:
+        nominal_state: Nominal initial Cartesian state in km and km/s.
+        drag_coefficient: Nominal drag coefficient.
+        srp_coefficient: Nominal SRP coefficient.
+        mass: Nominal mass in kg.
+        samples: Number of samples, including the nominal one.
+        position_sigma: Standard deviation of each position component in km.
+        velocity_sigma: Standard deviation of each velocity component in km/s.
+        drag_coefficient_sigma: Standard deviation of the drag coefficient.
+        srp_coefficient_sigma: Standard deviation of the SRP coefficient.
+        mass_sigma: Standard deviation of the mass in kg.
+        seed: Seed of the random generator, for reproducible ensembles.
+
+    Returns:
+        The drawn samples.
+    """
+    rng = np.random.default_rng(seed)
+    sigma = np.array([position_sigma] * 3 + [velocity_sigma] * 3)
+    sigmas = np.concatenate([sigma, [drag_coefficient_sigma, srp_coefficient_sigma, mass_sigma]])
+    deviations = rng.standard_normal((samples, 9)) * sigmas
+    deviations[0] = 0.0
+    return EnsembleSamples(
+        states=np.asarray(nominal_state, dtype=float) + deviations[:, :6],
+        drag_coefficients=np.clip(drag_coefficient + deviations[:, 6], 0.0, None),
+        srp_coefficients=np.clip(srp_coefficient + deviations[:, 7], 0.0, None),
+        masses=np.clip(mass + deviations[:, 8], np.finfo(float).tiny, None),
+    )
+
+
+def output_grid(start: str, end: str, step: float) -> list[tempo.Epoch]:
+    """Return the epochs at which the samples are evaluated."""
+    return list(tempo.EpochRange(tempo.Epoch(start), tempo.Epoch(end)).createGrid(step))
+
+
+def nominal_state(uni_config: dict, tra_config: dict) -> NDArray:
+    """Propagate the nominal trajectory and return its initial ICRF Cartesian state.
+
+    The initial orbit of a propagation request may be given in any state representation, the
+    samples are dispersed around its Cartesian equivalent.
+    """
+    uni = get_universe_pool().get(uni_config)
+    tra = cosmos.Trajectory(uni, tra_config)
+    tra.compute(False)
+    initial = tra_config["timeline"][0]
+    return np.asarray(uni.frames.vector6("Earth", initial["state"][0]["name"], "ICRF", tempo.Epoch(initial["epoch"])))
+
+
+def propagate_sample(
+    uni_config: dict,
+    tra_config: dict,
+    sample: NDArray,
+    grid: tuple[str, str, float],
+) -> NDArray:
+    """Propagate one sample and return its states on the output grid.
+
+    This runs in the propagation process pool, so the arguments are plain picklable values.
+
+    Args:
+        uni_config: The parametrized universe configuration.
+        tra_config: The nominal trajectory configuration.
+        sample: One row of :meth:`EnsembleSamples.as_array`.
+        grid: Start epoch, end epoch and step in seconds of the output grid.
+
+    Returns:
+        The ICRF Cartesian states in km and km/s, shape ``(n_epochs, 6)``.
+    """
+    uni = get_universe_pool().get(uni_config)
+    for name, value in zip(ENSEMBLE_PARAMETERS, sample[6:], strict=True):
+        uni.parameters.get(name).setPhysicalValue(float(value))
+
+    tra_config = copy.deepcopy(tra_config)
+    sc_name = uuid4().hex
+    tra_config["setup"][0]["name"] = sc_name
+    initial = tra_config["timeline"][0]
+    units = ["km"] * 3 + ["km/s"] * 3
+    initial["state"][0] |= {
+        "name": sc_name + "_center",
+        "value": {
+            key: f"{value} {unit}"
+            for key, value, unit in zip(
+                ("pos_x", "pos_y", "pos_z", "vel_x", "vel_y", "vel_z"),
+                sample[:6],
+                units,
+                strict=True,
+            )
+        },
+    }
+    initial["state"][1] |= {"name": sc_name + "_mass", "value": f"{sample[8]} kg"}
+    initial["state"][2]["name"] = sc_name + "_dv"
+    tra_config["timeline"][1]["input"] = sc_name
+
+    tra = cosmos.Trajectory(uni, tra_config)
+    tra.compute(False)
+
+    return np.vstack([uni.frames.vector6("Earth", sc_name + "_center", "ICRF", epoch) for epoch in output_grid(*grid)])
+
+
+def summarize_ensemble(states: NDArray, percentiles: list[float]) -> dict[str, NDArray]:
+    """Reduce the propagated samples to summary statistics over time.
+
+    Args:
+        states: The sample states, shape ``(n_samples, n_epochs, 6)``.
+        percentiles: The percentiles of the envelopes, between 0 and 100.
+
+    Returns:
+        ``mean`` ``(n_epochs, 6)`` and ``covariance`` ``(n_epochs, 6, 6)`` of the states,
+        ``percentiles`` ``(n_percentiles, n_epochs, 6)`` of every state component and
+        ``position_envelope`` ``(n_percentiles, n_epochs)``, the percentiles of the distance
+        to the mean position.
+    """
+    mean = states.mean(axis=0)
+    deviations = states - mean
+    covariance = np.einsum("sei,sej->eij", deviations, deviations) / max(len(states) - 1, 1)
+    return {
+        "mean": mean,
+        "covariance": covariance,
+        "percentiles": np.percentile(states, percentiles, axis=0),
+        "position_envelope": np.percentile(np.linalg.norm(deviations[..., :3], axis=-1), percentiles, axis=0),
+    }
@@ -0,0 +1,191 @@
+"""Interpolation of the states of stored orbits.
+
+Answering a query from scratch means loading a universe and reading the IPF file of the orbit
+into it, which takes far longer than interpolating a few states. :class:`EphemerisCache` keeps the
+orbits queried in the current process open, least recently used first, so repeated queries of hot
+orbits only interpolate.
+
+ICRF states are evaluated without any universe from the Chebyshev ephemeris stored next to an
+orbit when it has one, see :mod:`app.flight_dynamics.chebyshev`, else from the memory-mapped
+state table of its IPF file when it was built, see :mod:`app.lib.state_table`. Other frames, and
+the remaining orbits, are interpolated by GODOT from the IPF file loaded as a point of the
+universe of the cache.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+from godot import cosmos
+from structlog import get_logger
+
+from app.flight_dynamics.chebyshev import ChebyshevEphemeris
+from app.flight_dynamics.utils.convert import datetime_to_godot_epoch
+from app.lib.state_table import StateTable, state_table_path
+from app.lib.universe_assembler import uni_config as uni_basic
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from datetime import datetime
+
+    from numpy.typing import NDArray
+
+__all__ = ("FRAMES", "EphemerisCache", "OpenOrbit", "as_utc", "get_ephemeris_cache")
+
+logger = get_logger()
+
+FRAMES = ("ICRF", "ITRF", "TEME")
+"""Axes of the Earth centred states, as defined in the basic universe."""
+Frame = Literal["ICRF", "ITRF", "TEME"]
+
+UPLOADS = Path("data/uploads")
+# id of the Earth as center of the ephemerides, according to the IMSORB body identification scheme
+EARTH_ID = 3
+
+
+def as_utc(epoch: datetime) -> datetime:
+    """Return an epoch as an aware UTC datetime, naive datetimes taken as UTC."""
+    return epoch.astimezone(UTC) if epoch.tzinfo is not None else epoch.replace(tzinfo=UTC)
+
+
+@dataclass
+class OpenOrbit:
+    """An orbit opened for queries."""
+
+    file_name: str
+    chebyshev: ChebyshevEphemeris | None = None
+    table: StateTable | None = None
+    point: str | None = None
+    """Name of the IPF point of the orbit in the universe of the cache, once loaded."""
+
+
+class EphemerisCache:
+    """LRU cache of the orbits opened in a process.
+
+    GODOT cannot remove a point from a universe, so the cache builds a universe of its own rather
+    than loading orbits into the pooled ones, see :mod:`app.lib.universe_pool`. Evicted orbits stay
+    loaded in it until it has loaded ``max_loaded`` orbit files. A new universe is then built, and
+    the orbits of the cache are loaded into it again when queried.
+    """
+
+    def __init__(self, max_size: int, max_loaded: int | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of orbits kept open.
+            max_loaded: Number of orbit files loaded in a universe before it is replaced, four
+                times ``max_size`` by default.
+        """
+        self.max_size = max_size
+        self.max_loaded = max_loaded or 4 * max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, OpenOrbit] = OrderedDict()
+        self._universe: cosmos.Universe | None = None
+        self._loaded = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, file_name: str) -> bool:
+        return file_name in self._entries
+
+    def open(self, file_name: str, chebyshev_file_name: str | None = None) -> OpenOrbit:
+        """Return the opened orbit of an IPF file.
+
+        Its Chebyshev ephemeris is read if given, and its state table is mapped if it exists.
+        """
+        with self._lock:
+            orbit = self._entries.get(file_name)
+            if orbit is not None:
+                self.hits += 1
+                self._entries.move_to_end(file_name)
+                return orbit
+            self.misses += 1
+            orbit = OpenOrbit(file_name=file_name)
+            if chebyshev_file_name is not None:
+                orbit.chebyshev = ChebyshevEphemeris.from_bytes((UPLOADS / chebyshev_file_name).read_bytes())
+            table_path = state_table_path(UPLOADS / file_name)
+            if table_path.exists():
+                orbit.table = StateTable.open(table_path)
+            self._entries[file_name] = orbit
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return orbit
+
+    def discard(self, file_name: str) -> None:
+        """Drop an orbit from the cache, e.g. once its file is deleted."""
+        with self._lock:
+            self._entries.pop(file_name, None)
+
+    def clear(self) -> None:
+        """Drop all orbits and the universe of the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._universe = None
+            self._loaded = 0
+
+    def _point(self, orbit: OpenOrbit) -> tuple[cosmos.Universe, str]:
+        """Return the universe of the cache and the point of an orbit in it, loading its IPF file if needed."""
+        if self._universe is None or self._loaded >= self.max_loaded:
+            if self._universe is not None:
+                logger.info("Rebuilding the ephemeris universe after loading %d orbits.", self._loaded)
+            self._universe = cosmos.Universe(uni_basic)
+            self._loaded = 0
+            for entry in self._entries.values():
+                entry.point = None
+        if orbit.point is None:
+            point = "ephemeris_" + Path(orbit.file_name).stem.replace("-", "")
+            try:
+                self._universe.frames.pointId(point)
+            except Exception:  # noqa: BLE001
+                # not loaded in this universe yet
+                self._universe.frames.addIpfPoint(point, str(UPLOADS / orbit.file_name), {EARTH_ID: "Earth"})
+                self._loaded += 1
+            orbit.point = point
+        return self._universe, orbit.point
+
+    def states(self, orbit: OpenOrbit, epochs: Sequence[datetime], frame: Frame = "ICRF") -> tuple[NDArray, str]:
+        """Interpolate the states of an opened orbit.
+
+        Args:
+            orbit: The orbit, as returned by :meth:`open`.
+            epochs: The epochs, within the span of the orbit.
+            frame: The axes of the Earth centred states.
+
+        Returns:
+            The states in km and km/s, of shape ``(n, 6)``, and their source: ``chebyshev``,
+            ``table`` or ``ipf``.
+        """
+        if frame == "ICRF" and orbit.chebyshev is None and orbit.table is not None:
+            return orbit.table.state_at(epochs), "table"
+        if frame == "ICRF" and orbit.chebyshev is not None:
+            start = orbit.chebyshev.start
+            if start.tzinfo is None:
+                # naive Chebyshev starts are UTC
+                start = start.replace(tzinfo=UTC)
+            seconds = [(as_utc(epoch) - start).total_seconds() for epoch in epochs]
+            return orbit.chebyshev.state(np.array(seconds, dtype=float).reshape(len(seconds))), "chebyshev"
+        # the universe is shared by the queries of the process
+        with self._lock:
+            uni, point = self._point(orbit)
+            states = [
+                uni.frames.vector6("Earth", point, frame, datetime_to_godot_epoch(as_utc(epoch))) for epoch in epochs
+            ]
+        return np.array(states, dtype=float).reshape(len(states), 6), "ipf"
+
+
+@lru_cache(maxsize=1)
+def get_ephemeris_cache() -> EphemerisCache:
+    """Return the ephemeris cache of the current process."""
+    from app.config import get_settings
+
+    return EphemerisCache(max_size=get_settings().fdy.EPHEMERIS_CACHE_SIZE)
@@ -0,0 +1,157 @@
+"""Analytical propagation with the secular J2 perturbation.
+
+The semi-major axis, eccentricity and inclination are constant, while the node, the argument of
+perigee and the mean anomaly drift linearly with the first order secular rates of the Earth
+oblateness. Only the secular part is modelled, so the result is a quick-look approximation whose
+error grows with the short periodic J2 terms (a few km in low Earth orbit) and every force that
+is left out.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike, NDArray
+
+__all__ = ("cartesian_to_keplerian", "keplerian_to_cartesian", "propagate_j2", "true_from_mean_anomaly")
+
+MU = 398600.4418
+"""Gravitational parameter of the Earth in km^3/s^2."""
+EARTH_RADIUS = 6378.137
+"""Equatorial radius of the Earth in km."""
+J2 = 1.08262668e-3
+
+
+def _solve_kepler(mean_anomaly: NDArray, ecc: float, iterations: int = 20) -> NDArray:
+    eccentric_anomaly = np.where(ecc < 0.8, mean_anomaly, np.pi)
+    for _ in range(iterations):
+        residual = eccentric_anomaly - ecc * np.sin(eccentric_anomaly) - mean_anomaly
+        step = residual / (1 - ecc * np.cos(eccentric_anomaly))
+        eccentric_anomaly = eccentric_anomaly - step
+        if np.max(np.abs(step)) < 1e-14:
+            break
+    return eccentric_anomaly
+
+
+def true_from_mean_anomaly(mean_anomaly: ArrayLike, ecc: ArrayLike) -> NDArray:
+    """Return the true anomaly in [0, 2 pi) of elliptical orbits from their mean anomaly in rad."""
+    ecc = np.asarray(ecc, dtype=float)
+    eccentric_anomaly = _solve_kepler(np.mod(np.asarray(mean_anomaly, dtype=float), 2 * np.pi), ecc)
+    true_anomaly = 2 * np.arctan2(
+        np.sqrt(1 + ecc) * np.sin(eccentric_anomaly / 2),
+        np.sqrt(1 - ecc) * np.cos(eccentric_anomaly / 2),
+    )
+    return np.mod(true_anomaly, 2 * np.pi)
+
+
+def keplerian_to_cartesian(elements: ArrayLike, mu: float = MU) -> NDArray:
+    """Convert Keplerian elements to Cartesian states.
+
+    Args:
+        elements: Semi-major axis in km, eccentricity, inclination, right ascension of the ascending
+            node, argument of perigee and mean anomaly in rad, of shape ``(6,)`` or ``(n, 6)``.
+        mu: Gravitational parameter in km^3/s^2.
+
+    Returns:
+        The states in km and km/s, of the shape of ``elements``.
+    """
+    elements = np.asarray(elements, dtype=float)
+    sma, ecc, inc, raan, aop, mean_anomaly = np.moveaxis(elements, -1, 0)
+    eccentric_anomaly = _solve_kepler(np.mod(mean_anomaly, 2 * np.pi), ecc)
+    cos_e, sin_e = np.cos(eccentric_anomaly), np.sin(eccentric_anomaly)
+    root = np.sqrt(1 - ecc**2)
+    # position and velocity in the perifocal frame
+    radius = sma * (1 - ecc * cos_e)
+    p = np.stack([sma * (cos_e - ecc), sma * root * sin_e])
+    v = np.sqrt(mu * sma) / radius * np.stack([-sin_e, root * cos_e])
+
+    cos_o, sin_o = np.cos(raan), np.sin(raan)
+    cos_w, sin_w = np.cos(aop), np.sin(aop)
+    cos_i, sin_i = np.cos(inc), np.sin(inc)
+    # first two columns of the perifocal to inertial rotation
+    rotation = np.stack(
+        [
+            np.stack([cos_o * cos_w - sin_o * sin_w * cos_i, -cos_o * sin_w - sin_o * cos_w * cos_i]),
+            np.stack([sin_o * cos_w + cos_o * sin_w * cos_i, -sin_o * sin_w + cos_o * cos_w * cos_i]),
+            np.stack([sin_w * sin_i, cos_w * sin_i]),
+        ],
+    )
+    position = np.einsum("ij...,j...->...i", rotation, p)
+    velocity = np.einsum("ij...,j...->...i", rotation, v)
+    return np.concatenate([position, velocity], axis=-1)
+
+
+def cartesian_to_keplerian(state: ArrayLike, mu: float = MU) -> NDArray:
+    """Convert a Cartesian state in km and km/s to the Keplerian elements of :func:`keplerian_to_cartesian`.
+
+    Circular and equatorial orbits are handled by setting the undefined angles to zero.
+    """
+    state = np.asarray(state, dtype=float)
+    r, v = state[:3], state[3:]
+    radius = np.linalg.norm(r)
+    h = np.cross(r, v)
+    node = np.cross([0.0, 0.0, 1.0], h)
+    ecc_vector = np.cross(v, h) / mu - r / radius
+    ecc = np.linalg.norm(ecc_vector)
+    sma = 1 / (2 / radius - v @ v / mu)
+    if sma <= 0 or ecc >= 1:
+        msg = "Only elliptical orbits can be propagated analytically."
+        raise ValueError(msg)
+    inc = math.acos(np.clip(h[2] / np.linalg.norm(h), -1, 1))
+
+    def angle(a: NDArray, b: NDArray, sign: float) -> float:
+        value = math.acos(np.clip(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)), -1, 1))
+        return value if sign >= 0 else 2 * math.pi - value
+
+    equatorial = np.linalg.norm(node) < 1e-11 * np.linalg.norm(h)
+    node = np.array([1.0, 0.0, 0.0]) if equatorial else node
+    raan = 0.0 if equatorial else angle(np.array([1.0, 0.0, 0.0]), node, node[1])
+    if ecc < 1e-11:
+        aop = 0.0
+        true_anomaly = angle(node, r, np.cross(node, r) @ h)
+    else:
+        aop = angle(node, ecc_vector, np.cross(node, ecc_vector) @ h)
+        true_anomaly = angle(ecc_vector, r, r @ v)
+    eccentric_anomaly = 2 * math.atan2(
+        math.sqrt(1 - ecc) * math.sin(true_anomaly / 2),
+        math.sqrt(1 + ecc) * math.cos(true_anomaly / 2),
+    )
+    mean_anomaly = (eccentric_anomaly - ecc * math.sin(eccentric_anomaly)) % (2 * math.pi)
+    return np.array([sma, ecc, inc, raan, aop, mean_anomaly])
+
+
+def secular_rates(elements: ArrayLike, mu: float = MU, radius: float = EARTH_RADIUS, j2: float = J2) -> NDArray:
+    """Return the secular rates in rad/s of the node, the argument of perigee and the mean anomaly."""
+    sma, ecc, inc = np.asarray(elements, dtype=float)[:3]
+    mean_motion = math.sqrt(mu / sma**3)
+    factor = 1.5 * j2 * (radius / (sma * (1 - ecc**2))) ** 2 * mean_motion
+    cos_i = math.cos(inc)
+    return np.array(
+        [
+            -factor * cos_i,
+            factor * (2 - 2.5 * (1 - cos_i**2)),
+            mean_motion + factor * math.sqrt(1 - ecc**2) * (1 - 1.5 * (1 - cos_i**2)),
+        ],
+    )
+
+
+def propagate_j2(elements: ArrayLike, seconds: ArrayLike, mu: float = MU) -> NDArray:
+    """Propagate Keplerian elements with the secular J2 rates.
+
+    Args:
+        elements: Initial Keplerian elements, see :func:`keplerian_to_cartesian`.
+        seconds: Offsets in seconds from the epoch of the initial elements, of shape ``(n,)``.
+        mu: Gravitational parameter in km^3/s^2.
+
+    Returns:
+        The Cartesian states in km and km/s, of shape ``(n, 6)``, in the frame of the elements.
+    """
+    elements = np.asarray(elements, dtype=float)
+    seconds = np.atleast_1d(np.asarray(seconds, dtype=float))
+    propagated = np.broadcast_to(elements, (len(seconds), 6)).copy()
+    propagated[:, 3:] += seconds[:, None] * secular_rates(elements, mu=mu)
+    return keplerian_to_cartesian(propagated, mu=mu)
@@ -0,0 +1,159 @@
+"""Numerical propagation steps run in the propagation process pool.
+
+The functions of this module are blocking and only take and return picklable values, so the
+SAQ tasks can hand them to :func:`app.lib.process_pool.run_in_process`.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+from godot import cosmos
+from godot.core import ipfwrap
+from godot.core.tempo import Epoch
+from structlog import get_logger
+
+from app.flight_dynamics.chebyshev import fit_chebyshev
+from app.flight_dynamics.schemas.states import StateCart
+from app.flight_dynamics.utils.convert import datetime_to_godot_epoch
+from app.lib.state_table import state_table_path, write_state_table
+from app.lib.universe_assembler import uni_config as uni_basic
+from app.lib.universe_pool import get_universe_pool
+
+__all__ = ("build_state_table", "initial_state_from_orbit", "load_orbit_point", "propagate_to_ipf")
+
+logger = get_logger()
+
+# id of the Earth as center of the ephemerides, according to the IMSORB body identification scheme
+EARTH_ID = 3
+
+
+def propagate_to_ipf(
+    tra_config: dict,
+    uni_config: dict,
+    path: str,
+    chebyshev_tolerance: float | None = None,
+) -> bytes | None:
+    """Propagate a trajectory and write the ephemerides of the spacecraft to an IPF file.
+
+    Args:
+        tra_config: The GODOT trajectory configuration.
+        uni_config: The GODOT universe configuration.
+        path: Path of the IPF file to write.
+        chebyshev_tolerance: Position tolerance in km of the Chebyshev ephemeris to fit to the
+            trajectory, if any.
+
+    Returns:
+        The serialized Chebyshev ephemeris, if a tolerance is given and met.
+    """
+    uni = get_universe_pool().get(uni_config)
+    tra = cosmos.Trajectory(uni, tra_config)
+    tra.compute(False)
+
+    file_header = [0, EARTH_ID, 1, 0, 0, 0, 0, 0]
+    ipf_writer = ipfwrap.IpfWriter(
+        path,
+        dimension=6,  # 6 state elements (position and velocity)
+        derivatives=0,  # the ephemerides don't provide derivatives
+        fileType=1,  # indicates that this is an orbit interpolation file
+        blockHeaderSize=2,  # required block size for orbit interpolation files
+        fileHeader=file_header,
+    )
+    point = tra_config["setup"][0]["name"] + "_center"
+    cosmos.writeIpf(ipf_writer, uni, tra, point, "ICRF", {"Earth": EARTH_ID})
+    del ipf_writer
+
+    if chebyshev_tolerance is None:
+        return None
+    start = Epoch(tra_config["timeline"][0]["epoch"])
+    end = Epoch(tra_config["timeline"][1]["point"]["epoch"])
+
+    def sample(seconds: np.ndarray) -> np.ndarray:
+        return np.vstack([uni.frames.vector6("Earth", point, "ICRF", start + float(t)) for t in seconds])
+
+    try:
+        ephemeris = fit_chebyshev(
+            sample,
+            datetime.fromisoformat(start.calStr("UTC")[:-4] + "Z"),
+            duration=float(end - start),
+            tolerance=chebyshev_tolerance,
+        )
+    except ValueError as e:
+        # the orbit is then only served from its IPF file
+        logger.warning("No Chebyshev ephemeris for the trajectory: %s", e)
+        return None
+    return ephemeris.to_bytes()
+
+
+def load_orbit_point(uni: cosmos.Universe, file_name: str) -> str:
+    """Return the point of a stored orbit file in a universe, adding it on first use.
+
+    The point is named after the file, so a pooled universe holds every orbit file once.
+    """
+    point_name = "orbit_" + Path(file_name).stem.replace("-", "")
+    try:
+        uni.frames.pointId(point_name)
+    except Exception:  # noqa: BLE001
+        uni.frames.addIpfPoint(point_name, "data/uploads/" + file_name, {EARTH_ID: "Earth"})
+    return point_name
+
+
+def initial_state_from_orbit(file_name: str, epoch: str) -> StateCart:
+    """Interpolate the ICRF state of a stored orbit file at an epoch.
+
+    Args:
+        file_name: Name of the IPF orbit file in the uploads directory.
+        epoch: The epoch, in GODOT epoch format.
+
+    Returns:
+        The Cartesian state in km and km/s.
+    """
+    uni = get_universe_pool().get(uni_basic)
+    point_name = load_orbit_point(uni, file_name)
+    state = uni.frames.vector6("Earth", point_name, "ICRF", Epoch(epoch))
+    return StateCart(
+        pos_x=f"{state[0]} km",
+        pos_y=f"{state[1]} km",
+        pos_z=f"{state[2]} km",
+        vel_x=f"{state[3]} km/s",
+        vel_y=f"{state[4]} km/s",
+        vel_z=f"{state[5]} km/s",
+    )
+
+
+def build_state_table(file_name: str, start: datetime, end: datetime, step: float) -> int:
+    """Sample the ICRF states of a stored orbit file into its state table.
+
+    See :mod:`app.lib.state_table`.
+
+    Args:
+        file_name: Name of the IPF orbit file in the uploads directory.
+        start: Start of the orbit.
+        end: End of the orbit.
+        step: Step between the nodes in seconds, the last node being at the end.
+
+    Returns:
+        The number of nodes of the table.
+    """
+    uni = get_universe_pool().get(uni_basic)
+    point_name = load_orbit_point(uni, file_name)
+    first, last = start.timestamp(), end.timestamp()
+    timestamps = np.append(np.arange(first, last, step), last)
+
+    def sample(chunk: np.ndarray) -> np.ndarray:
+        return np.vstack(
+            [
+                uni.frames.vector6(
+                    "Earth",
+                    point_name,
+                    "ICRF",
+                    datetime_to_godot_epoch(datetime.fromtimestamp(timestamp, UTC)),
+                )
+                for timestamp in chunk.tolist()
+            ],
+        )
+
+    write_state_table(state_table_path("data/uploads/" + file_name), timestamps, sample)
+    return len(timestamps)
@@ -0,0 +1,184 @@
+"""Level-of-detail pyramids of the states of an orbit, to plot it.
+
+Plotting a month-long orbit does not need its states every second. A pyramid holds the ICRF
+states of an orbit sampled at a few steps, e.g. 1 s, 60 s and 600 s, plus the extrema of every
+revolution: the perigee, the apogee and the most northern and southern points. A plot of a time
+window reads the finest level that fits its point budget.
+
+The pyramid is sampled from the Chebyshev ephemeris of the orbit, see
+:mod:`app.flight_dynamics.chebyshev`, and saved as one ``.npy`` array of shape ``(8, n)``: the
+step of the level of every node, 0 for the extrema, then the UTC POSIX timestamps of the nodes,
+their positions in km and velocities in km/s. The nodes are sorted by level, then by epoch, so a
+memory-mapped pyramid is read only around the selected level and window.
+"""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from datetime import UTC
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.flight_dynamics.chebyshev import ChebyshevEphemeris
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from pathlib import Path
+
+    from numpy.typing import NDArray
+
+__all__ = ("EXTREMA", "LEVEL_STEPS", "MAX_LEVEL_NODES", "EphemerisPyramid", "PyramidLevel", "build_pyramid")
+
+LEVEL_STEPS = (1.0, 60.0, 600.0)
+"""Default steps of the sampled levels in seconds."""
+EXTREMA = 0.0
+"""Step identifying the level of the extrema of every revolution."""
+MAX_LEVEL_NODES = 1_000_000
+"""Levels with more nodes are left out, about 11 days at 1 s."""
+CHUNK_SIZE = 100_000
+ROWS = 8
+
+
+def revolution_extrema(states: NDArray) -> NDArray:
+    """Return the sorted indices of the extrema of every revolution of sampled states.
+
+    Revolutions are split at the ascending node crossings. The first and last states are kept,
+    so the extrema span the whole orbit.
+    """
+    z = states[:, 2]
+    radius = np.linalg.norm(states[:, :3], axis=1)
+    ascending = np.flatnonzero((z[:-1] < 0) & (z[1:] >= 0)) + 1
+    bounds = np.concatenate([[0], ascending, [len(states)]])
+    indices = [0, len(states) - 1]
+    for first, last in zip(bounds[:-1].tolist(), bounds[1:].tolist(), strict=True):
+        if last > first:
+            window = slice(first, last)
+            indices += [
+                first + int(np.argmin(radius[window])),
+                first + int(np.argmax(radius[window])),
+                first + int(np.argmin(z[window])),
+                first + int(np.argmax(z[window])),
+            ]
+    return np.unique(indices)
+
+
+def _sample(ephemeris: ChebyshevEphemeris, seconds: NDArray) -> NDArray:
+    return np.concatenate(
+        [ephemeris.state(seconds[first : first + CHUNK_SIZE]) for first in range(0, len(seconds), CHUNK_SIZE)],
+    )
+
+
+def build_pyramid(
+    chebyshev: bytes,
+    steps: Sequence[float] = LEVEL_STEPS,
+    max_level_nodes: int = MAX_LEVEL_NODES,
+) -> bytes:
+    """Sample the pyramid of an orbit from its Chebyshev ephemeris.
+
+    Args:
+        chebyshev: The serialized Chebyshev ephemeris of the orbit.
+        steps: Steps of the sampled levels in seconds. The coarsest level is always kept, the
+            others only if they have at most ``max_level_nodes`` nodes.
+        max_level_nodes: Maximum number of nodes of a sampled level.
+
+    Returns:
+        The pyramid as ``.npy`` content.
+    """
+    ephemeris = ChebyshevEphemeris.from_bytes(chebyshev)
+    start = ephemeris.start if ephemeris.start.tzinfo is not None else ephemeris.start.replace(tzinfo=UTC)
+    origin = start.timestamp()
+    coarsest = max(steps)
+    levels: dict[float, NDArray] = {}
+    for step in sorted(steps):
+        seconds = np.append(np.arange(0, ephemeris.duration, step), ephemeris.duration)
+        if len(seconds) > max_level_nodes and step != coarsest:
+            continue
+        levels[step] = np.vstack([origin + seconds, _sample(ephemeris, seconds).T])
+    # the extrema are located on the finest level
+    finest = levels[min(levels)]
+    levels[EXTREMA] = finest[:, revolution_extrema(finest[1:].T)]
+
+    pyramid = np.concatenate(
+        [np.vstack([np.full(nodes.shape[1], step), nodes]) for step, nodes in sorted(levels.items())],
+        axis=1,
+    )
+    buffer = io.BytesIO()
+    np.save(buffer, pyramid)
+    return buffer.getvalue()
+
+
+@dataclass
+class PyramidLevel:
+    """Nodes of a level of a pyramid within a time window."""
+
+    step: float
+    """Step of the level in seconds, :data:`EXTREMA` for the extrema of the revolutions."""
+    timestamps: NDArray
+    """UTC POSIX timestamps of the nodes."""
+    states: NDArray
+    """ICRF states of the nodes in km and km/s, of shape ``(n, 6)``."""
+
+
+class EphemerisPyramid:
+    """Levels of detail of the states of an orbit."""
+
+    def __init__(self, pyramid: NDArray) -> None:
+        """Wrap a pyramid of shape ``(8, n)``, see :func:`build_pyramid`."""
+        if pyramid.ndim != 2 or pyramid.shape[0] != ROWS:
+            msg = f"Invalid pyramid of shape {pyramid.shape}."
+            raise ValueError(msg)
+        self.pyramid = pyramid
+
+    @classmethod
+    def open(cls, path: str | Path) -> EphemerisPyramid:
+        """Memory-map a pyramid."""
+        return cls(np.load(path, mmap_mode="r"))
+
+    def levels(self) -> Iterator[tuple[float, slice]]:
+        """Yield the step and the node range of every level, by increasing step."""
+        keys = self.pyramid[0]
+        first = 0
+        while first < len(keys):
+            step = float(keys[first])
+            last = int(np.searchsorted(keys, step, side="right"))
+            yield step, slice(first, last)
+            first = last
+
+    def select(self, start: float, end: float, max_points: int) -> PyramidLevel:
+        """Return the nodes of the finest level with at most ``max_points`` nodes in a window.
+
+        The extrema are returned when every sampled level has too many nodes, evenly thinned out
+        if they have too many nodes themselves.
+
+        Args:
+            start: Start of the window as a UTC POSIX timestamp.
+            end: End of the window as a UTC POSIX timestamp.
+            max_points: Maximum number of nodes returned.
+        """
+        windows = {}
+        for step, nodes in self.levels():
+            timestamps = self.pyramid[1, nodes]
+            first = int(np.searchsorted(timestamps, start, side="left"))
+            last = int(np.searchsorted(timestamps, end, side="right"))
+            window = slice(nodes.start + first, nodes.start + last)
+            if step != EXTREMA and window.stop - window.start <= max_points:
+                return self._level(step, window)
+            windows[step] = window
+        window = windows[EXTREMA]
+        if window.stop - window.start <= max_points:
+            return self._level(EXTREMA, window)
+        indices = np.unique(np.linspace(window.start, window.stop - 1, max_points).astype(np.intp))
+        return PyramidLevel(
+            step=EXTREMA,
+            timestamps=np.asarray(self.pyramid[1, indices]),
+            states=np.asarray(self.pyramid[2:, indices]).T,
+        )
+
+    def _level(self, step: float, window: slice) -> PyramidLevel:
+        return PyramidLevel(
+            step=step,
+            timestamps=np.array(self.pyramid[1, window]),
+            states=np.array(self.pyramid[2:, window]).T,
+        )
@@ -0,0 +1,68 @@
+"""Epochs at which an orbit is sampled, e.g. to fit a TLE through it.
+
+A uniform grid spends as many samples on the slow apogee arc of an eccentric orbit as on the
+fast perigee pass, where the state changes most. Sampling a fixed number of points per
+revolution, equally spaced in true anomaly, follows the motion instead: the sample density
+scales with the angular velocity, so it is highest around perigee, and the number of samples no
+longer depends on the orbital period.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.flight_dynamics.j2 import MU, true_from_mean_anomaly
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+__all__ = ("true_anomaly_grid",)
+
+
+def _mean_from_true(true_anomaly: NDArray, ecc: float) -> NDArray:
+    """Return the mean anomaly of unwrapped true anomalies, continuous across revolutions."""
+    revolutions = np.floor(true_anomaly / (2 * np.pi))
+    wrapped = true_anomaly - 2 * np.pi * revolutions
+    eccentric_anomaly = 2 * np.arctan2(
+        math.sqrt(1 - ecc) * np.sin(wrapped / 2),
+        math.sqrt(1 + ecc) * np.cos(wrapped / 2),
+    )
+    mean_anomaly = np.mod(eccentric_anomaly - ecc * np.sin(eccentric_anomaly), 2 * np.pi)
+    return mean_anomaly + 2 * np.pi * revolutions
+
+
+def true_anomaly_grid(
+    duration: float,
+    sma: float,
+    ecc: float,
+    mean_anomaly: float,
+    points_per_revolution: int,
+    mu: float = MU,
+) -> NDArray:
+    """Return sampling offsets equally spaced in true anomaly along a Keplerian orbit.
+
+    Args:
+        duration: Sampled span in seconds.
+        sma: Semi-major axis in km at the start of the span.
+        ecc: Eccentricity at the start of the span.
+        mean_anomaly: Mean anomaly in rad at the start of the span.
+        points_per_revolution: Number of samples per revolution.
+        mu: Gravitational parameter in km^3/s^2.
+
+    Returns:
+        Increasing offsets in seconds from the start of the span, starting at 0 and ending at
+        ``duration``.
+    """
+    if points_per_revolution < 2:
+        msg = "An orbit needs at least two samples per revolution."
+        raise ValueError(msg)
+    mean_motion = math.sqrt(mu / sma**3)
+    start = float(true_from_mean_anomaly(mean_anomaly, ecc))
+    count = math.ceil(duration * mean_motion / (2 * math.pi) * points_per_revolution) + 1
+    true_anomaly = start + np.arange(count) * 2 * np.pi / points_per_revolution
+    mean_anomalies = _mean_from_true(true_anomaly, ecc)
+    offsets = (mean_anomalies - mean_anomalies[0]) / mean_motion
+    return np.append(offsets[offsets < duration], duration)
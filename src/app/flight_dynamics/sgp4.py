@@ -0,0 +1,447 @@
+"""Vectorized SGP4 propagation of two-line elements.
+
+NumPy implementation of the near-earth SGP4 model, following the reference implementation of
+Vallado et al., "Revisiting Spacetrack Report #3" (AIAA 2006-6753), with the WGS-72 constants
+used to generate the public TLE catalog. Element sets are propagated together as arrays, so one
+call evaluates many satellites at many epochs.
+
+Deep-space element sets (orbital period of 225 minutes or more) need the SDP4 lunar-solar
+perturbations, which are not implemented; they are rejected.
+
+States are expressed in the TEME frame, in km and km/s.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import ArrayLike, NDArray
+
+__all__ = ("Sgp4", "TleElements", "is_deep_space", "parse_tle_epoch", "unkozai_mean_motion")
+
+# WGS-72 constants
+MU = 398600.8
+EARTH_RADIUS = 6378.135
+XKE = 60.0 / math.sqrt(EARTH_RADIUS**3 / MU)
+J2 = 0.001082616
+J3 = -0.00000253881
+J4 = -0.00000165597
+J3OJ2 = J3 / J2
+X2O3 = 2.0 / 3.0
+TWO_PI = 2 * math.pi
+DEEP_SPACE_PERIOD = 225.0
+"""Orbital period in minutes from which SDP4 applies."""
+
+
+def parse_tle_epoch(field: str) -> datetime:
+    """Return the UTC epoch of the ``YYDDD.DDDDDDDD`` epoch field of a TLE."""
+    year = int(field[:2])
+    year += 2000 if year < 57 else 1900
+    return datetime(year, 1, 1, tzinfo=UTC) + timedelta(days=float(field[2:]) - 1)
+
+
+def _parse_exponent(field: str) -> float:
+    """Parse a TLE field with an implied leading decimal point and an exponent, e.g. `` 28098-4``."""
+    field = field.strip()
+    if not field:
+        return 0.0
+    sign = -1.0 if field[0] == "-" else 1.0
+    field = field.lstrip("+-")
+    mantissa, exponent = field[:-2], field[-2:]
+    return sign * float("0." + mantissa.strip()) * 10 ** int(exponent)
+
+
+@dataclass
+class TleElements:
+    """Mean elements of a set of TLEs, as arrays of shape ``(n,)``."""
+
+    epoch: list[datetime]
+    bstar: NDArray
+    """Drag term in 1/earth radii."""
+    inclination: NDArray
+    """Inclination in rad."""
+    raan: NDArray
+    """Right ascension of the ascending node in rad."""
+    eccentricity: NDArray
+    arg_perigee: NDArray
+    """Argument of perigee in rad."""
+    mean_anomaly: NDArray
+    """Mean anomaly in rad."""
+    mean_motion: NDArray
+    """Kozai mean motion in rad/min."""
+
+    def __len__(self) -> int:
+        return len(self.epoch)
+
+    def take(self, indices: ArrayLike) -> TleElements:
+        """Return the element sets at the given indices."""
+        indices = np.asarray(indices, dtype=np.intp)
+        return TleElements(
+            epoch=[self.epoch[index] for index in indices.tolist()],
+            bstar=self.bstar[indices],
+            inclination=self.inclination[indices],
+            raan=self.raan[indices],
+            eccentricity=self.eccentricity[indices],
+            arg_perigee=self.arg_perigee[indices],
+            mean_anomaly=self.mean_anomaly[indices],
+            mean_motion=self.mean_motion[indices],
+        )
+
+    @classmethod
+    def from_lines(cls, lines: Sequence[tuple[str, str]]) -> TleElements:
+        """Parse TLEs given as ``(line1, line2)`` pairs."""
+        line1s = [line1 for line1, _ in lines]
+        line2s = [line2 for _, line2 in lines]
+        deg = np.pi / 180
+        return cls(
+            epoch=[parse_tle_epoch(line[18:32]) for line in line1s],
+            bstar=np.array([_parse_exponent(line[53:61]) for line in line1s]),
+            inclination=np.array([float(line[8:16]) for line in line2s]) * deg,
+            raan=np.array([float(line[17:25]) for line in line2s]) * deg,
+            eccentricity=np.array([float("0." + line[26:33].strip()) for line in line2s]),
+            arg_perigee=np.array([float(line[34:42]) for line in line2s]) * deg,
+            mean_anomaly=np.array([float(line[43:51]) for line in line2s]) * deg,
+            mean_motion=np.array([float(line[52:63]) for line in line2s]) * TWO_PI / 1440.0,
+        )
+
+
+def unkozai_mean_motion(elements: TleElements) -> NDArray:
+    """Recover the original (Brouwer) mean motion in rad/min from the Kozai mean motion."""
+    omeosq = 1.0 - elements.eccentricity**2
+    cosio2 = np.cos(elements.inclination) ** 2
+    ak = (XKE / elements.mean_motion) ** X2O3
+    d1 = 0.75 * J2 * (3.0 * cosio2 - 1.0) / (np.sqrt(omeosq) * omeosq)
+    delta = d1 / (ak * ak)
+    adel = ak * (1.0 - delta * delta - delta * (1.0 / 3.0 + 134.0 * delta * delta / 81.0))
+    delta = d1 / (adel * adel)
+    return elements.mean_motion / (1.0 + delta)
+
+
+def is_deep_space(elements: TleElements) -> NDArray:
+    """Return whether the element sets need the SDP4 deep-space model, which is not supported."""
+    return TWO_PI / unkozai_mean_motion(elements) >= DEEP_SPACE_PERIOD
+
+
+def _solve_kepler(u: NDArray, axnl: NDArray, aynl: NDArray) -> tuple[NDArray, NDArray]:
+    """Solve Kepler's equation for the eccentric longitude.
+
+    Returns:
+        Its sine and cosine.
+    """
+    eo1 = u.copy()
+    active = np.ones_like(u, dtype=bool)
+    for _ in range(10):
+        sineo1 = np.sin(eo1)
+        coseo1 = np.cos(eo1)
+        tem5 = (u - aynl * coseo1 + axnl * sineo1 - eo1) / (1.0 - coseo1 * axnl - sineo1 * aynl)
+        tem5 = np.clip(tem5, -0.95, 0.95)
+        eo1 = eo1 + np.where(active, tem5, 0.0)
+        active &= np.abs(tem5) >= 1.0e-12
+        if not active.any():
+            break
+    return np.sin(eo1), np.cos(eo1)
+
+
+def _orientation(su: NDArray, xnode: NDArray, xinc: NDArray) -> tuple[NDArray, NDArray]:
+    """Return the unit vectors of the position and of the along-track direction."""
+    sinsu, cossu = np.sin(su), np.cos(su)
+    snod, cnod = np.sin(xnode), np.cos(xnode)
+    sini, cosi = np.sin(xinc), np.cos(xinc)
+    xmx = -snod * cosi
+    xmy = cnod * cosi
+    ux = np.stack([xmx * sinsu + cnod * cossu, xmy * sinsu + snod * cossu, sini * sinsu], axis=-1)
+    vx = np.stack([xmx * cossu - cnod * sinsu, xmy * cossu - snod * sinsu, sini * cossu], axis=-1)
+    return ux, vx
+
+
+class Sgp4:
+    """SGP4 propagator of a set of TLEs.
+
+    The initialization constants of every element set are computed once, :meth:`propagate` then
+    evaluates all of them at once.
+    """
+
+    def __init__(self, elements: TleElements) -> None:
+        self.elements = elements
+        ecco = elements.eccentricity
+        inclo = elements.inclination
+
+        omeosq = 1.0 - ecco * ecco
+        cosio = np.cos(inclo)
+        cosio2 = cosio * cosio
+        no_unkozai = unkozai_mean_motion(elements)
+        if np.any(TWO_PI / no_unkozai >= DEEP_SPACE_PERIOD):
+            msg = "Deep-space element sets (period of 225 minutes or more) are not supported."
+            raise ValueError(msg)
+
+        ao = (XKE / no_unkozai) ** X2O3
+        sinio = np.sin(inclo)
+        self.no_unkozai = no_unkozai
+        self.con41 = -(1.0 - 5.0 * cosio2) - cosio2 - cosio2
+        self.x1mth2 = 1.0 - cosio2
+        self.x7thm1 = 7.0 * cosio2 - 1.0
+        denominator = np.where(np.abs(cosio + 1.0) > 1.5e-12, 1.0 + cosio, 1.5e-12)
+        self.xlcof = -0.25 * J3OJ2 * sinio * (3.0 + 5.0 * cosio) / denominator
+        self.aycof = -0.5 * J3OJ2 * sinio
+
+        xhdot1 = self._init_gravity(ao, omeosq, cosio)
+        self._init_drag(ao, omeosq, sinio, xhdot1)
+
+    def _init_gravity(self, ao: NDArray, omeosq: NDArray, cosio: NDArray) -> NDArray:
+        """Set the secular rates of the mean anomaly, argument of perigee and node due to gravity.
+
+        Returns:
+            The first order rate of the node, which also scales its drag term.
+        """
+        rteosq = np.sqrt(omeosq)
+        cosio2 = cosio * cosio
+        cosio4 = cosio2 * cosio2
+        pinvsq = 1.0 / (ao * omeosq) ** 2
+        temp1 = 1.5 * J2 * pinvsq * self.no_unkozai
+        temp2 = 0.5 * temp1 * J2 * pinvsq
+        temp3 = -0.46875 * J4 * pinvsq * pinvsq * self.no_unkozai
+        self.mdot = (
+            self.no_unkozai
+            + 0.5 * temp1 * rteosq * self.con41
+            + 0.0625 * temp2 * rteosq * (13.0 - 78.0 * cosio2 + 137.0 * cosio4)
+        )
+        self.argpdot = (
+            -0.5 * temp1 * (1.0 - 5.0 * cosio2)
+            + 0.0625 * temp2 * (7.0 - 114.0 * cosio2 + 395.0 * cosio4)
+            + temp3 * (3.0 - 36.0 * cosio2 + 49.0 * cosio4)
+        )
+        xhdot1 = -temp1 * cosio
+        self.nodedot = xhdot1 + (0.5 * temp2 * (4.0 - 19.0 * cosio2) + 2.0 * temp3 * (3.0 - 7.0 * cosio2)) * cosio
+        return xhdot1
+
+    def _init_drag(self, ao: NDArray, omeosq: NDArray, sinio: NDArray, xhdot1: NDArray) -> None:
+        """Set the coefficients of the atmospheric drag terms."""
+        ecco = self.elements.eccentricity
+        argpo = self.elements.arg_perigee
+        mo = self.elements.mean_anomaly
+        bstar = self.elements.bstar
+        rp = ao * (1.0 - ecco)
+
+        # simplified drag model below a perigee of 220 km
+        isimp = rp < 220.0 / EARTH_RADIUS + 1.0
+        perige = (rp - 1.0) * EARTH_RADIUS
+        sfour = np.where(perige < 98.0, 20.0, perige - 78.0)
+        qzms24 = np.where(perige < 156.0, ((120.0 - sfour) / EARTH_RADIUS) ** 4, ((120.0 - 78.0) / EARTH_RADIUS) ** 4)
+        sfour = np.where(perige < 156.0, sfour / EARTH_RADIUS + 1.0, 78.0 / EARTH_RADIUS + 1.0)
+
+        tsi = 1.0 / (ao - sfour)
+        eta = ao * ecco * tsi
+        etasq = eta * eta
+        eeta = ecco * eta
+        psisq = np.abs(1.0 - etasq)
+        coef = qzms24 * tsi**4
+        coef1 = coef / psisq**3.5
+        cc2 = (
+            coef1
+            * self.no_unkozai
+            * (
+                ao * (1.0 + 1.5 * etasq + eeta * (4.0 + etasq))
+                + 0.375 * J2 * tsi / psisq * self.con41 * (8.0 + 3.0 * etasq * (8.0 + etasq))
+            )
+        )
+        cc1 = bstar * cc2
+        large_ecc = ecco > 1.0e-4
+        safe_ecco = np.where(large_ecc, ecco, 1.0)
+        cc3 = np.where(large_ecc, -2.0 * coef * tsi * J3OJ2 * self.no_unkozai * sinio / safe_ecco, 0.0)
+        self.cc4 = (
+            2.0
+            * self.no_unkozai
+            * coef1
+            * ao
+            * omeosq
+            * (
+                eta * (2.0 + 0.5 * etasq)
+                + ecco * (0.5 + 2.0 * etasq)
+                - J2
+                * tsi
+                / (ao * psisq)
+                * (
+                    -3.0 * self.con41 * (1.0 - 2.0 * eeta + etasq * (1.5 - 0.5 * eeta))
+                    + 0.75 * self.x1mth2 * (2.0 * etasq - eeta * (1.0 + etasq)) * np.cos(2.0 * argpo)
+                )
+            )
+        )
+        self.cc5 = 2.0 * coef1 * ao * omeosq * (1.0 + 2.75 * (etasq + eeta) + eeta * etasq)
+        self.omgcof = bstar * cc3 * np.cos(argpo)
+        safe_eeta = np.where(large_ecc, eeta, 1.0)
+        self.xmcof = np.where(large_ecc, -X2O3 * coef * bstar / safe_eeta, 0.0)
+        self.nodecf = 3.5 * omeosq * xhdot1 * cc1
+        self.t2cof = 1.5 * cc1
+        self.delmo = (1.0 + eta * np.cos(mo)) ** 3
+        self.sinmao = np.sin(mo)
+        self.cc1 = cc1
+        self.eta = eta
+
+        cc1sq = cc1 * cc1
+        d2 = 4.0 * ao * tsi * cc1sq
+        temp = d2 * tsi * cc1 / 3.0
+        d3 = (17.0 * ao + sfour) * temp
+        d4 = 0.5 * temp * ao * tsi * (221.0 * ao + 31.0 * sfour) * cc1
+        # the higher order drag terms are dropped by the simplified model
+        self.isimp = isimp
+        self.d2 = np.where(isimp, 0.0, d2)
+        self.d3 = np.where(isimp, 0.0, d3)
+        self.d4 = np.where(isimp, 0.0, d4)
+        self.t3cof = np.where(isimp, 0.0, d2 + 2.0 * cc1sq)
+        self.t4cof = np.where(isimp, 0.0, 0.25 * (3.0 * d3 + cc1 * (12.0 * d2 + 10.0 * cc1sq)))
+        t5cof = 0.2 * (3.0 * d4 + 12.0 * cc1 * d3 + 6.0 * d2 * d2 + 15.0 * cc1sq * (2.0 * d2 + cc1sq))
+        self.t5cof = np.where(isimp, 0.0, t5cof)
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def _column(self, value: NDArray) -> NDArray:
+        return value[:, None]
+
+    def _secular(self, t: NDArray) -> tuple[NDArray, ...]:
+        """Return the mean elements updated for the secular gravity and drag effects."""
+        c = self._column
+        elements = self.elements
+        xmdf = c(elements.mean_anomaly) + c(self.mdot) * t
+        argpdf = c(elements.arg_perigee) + c(self.argpdot) * t
+        nodedf = c(elements.raan) + c(self.nodedot) * t
+        t2 = t * t
+        nodem = nodedf + c(self.nodecf) * t2
+        tempa = 1.0 - c(self.cc1) * t
+        tempe = c(elements.bstar * self.cc4) * t
+        templ = c(self.t2cof) * t2
+
+        simplified = c(self.isimp)
+        delomg = c(self.omgcof) * t
+        delm = c(self.xmcof) * ((1.0 + c(self.eta) * np.cos(xmdf)) ** 3 - c(self.delmo))
+        correction = np.where(simplified, 0.0, delomg + delm)
+        mm = xmdf + correction
+        argpm = argpdf - correction
+        t3 = t2 * t
+        t4 = t3 * t
+        tempa = tempa - c(self.d2) * t2 - c(self.d3) * t3 - c(self.d4) * t4
+        tempe = tempe + np.where(simplified, 0.0, c(elements.bstar * self.cc5) * (np.sin(mm) - c(self.sinmao)))
+        templ = templ + c(self.t3cof) * t3 + t4 * (c(self.t4cof) + t * c(self.t5cof))
+
+        am = (XKE / c(self.no_unkozai)) ** X2O3 * tempa * tempa
+        nm = XKE / am**1.5
+        em = c(elements.eccentricity) - tempe
+        invalid = (em >= 1.0) | (em < -0.001)
+        em = np.maximum(em, 1.0e-6)
+        mm = mm + c(self.no_unkozai) * templ
+        xlm = mm + argpm + nodem
+        nodem = np.fmod(nodem, TWO_PI)
+        argpm = np.fmod(argpm, TWO_PI)
+        xlm = np.fmod(xlm, TWO_PI)
+        mm = np.fmod(xlm - argpm - nodem, TWO_PI)
+        return am, nm, em, nodem, argpm, mm, invalid
+
+    def advance(self, tsince: ArrayLike) -> TleElements:
+        """Move the element sets to new epochs with the secular gravity and drag effects.
+
+        The periodic terms are not applied, so the result holds mean elements that propagate to
+        approximately the same states, e.g. to start a TLE fit at another epoch.
+
+        Args:
+            tsince: Minutes since the epoch of every element set, of shape ``(n_sets,)``.
+
+        Returns:
+            The element sets at the new epochs.
+        """
+        tsince = np.broadcast_to(np.asarray(tsince, dtype=float), (len(self),))
+        _, nm, em, nodem, argpm, mm, _ = self._secular(tsince[:, None])
+        elements = self.elements
+        return TleElements(
+            epoch=[epoch + timedelta(minutes=float(t)) for epoch, t in zip(elements.epoch, tsince, strict=True)],
+            bstar=elements.bstar.copy(),
+            inclination=elements.inclination.copy(),
+            raan=np.mod(nodem[:, 0], TWO_PI),
+            eccentricity=em[:, 0],
+            arg_perigee=np.mod(argpm[:, 0], TWO_PI),
+            mean_anomaly=np.mod(mm[:, 0], TWO_PI),
+            # the secular change of the Brouwer mean motion, applied to the Kozai one
+            mean_motion=elements.mean_motion * nm[:, 0] / self.no_unkozai,
+        )
+
+    def propagate(self, tsince: ArrayLike) -> tuple[NDArray, NDArray]:
+        """Propagate the element sets.
+
+        Args:
+            tsince: Minutes since the epoch of every element set, of shape ``(n_epochs,)`` to use
+                the same offsets for every element set, or ``(n_sets, n_epochs)``.
+
+        Returns:
+            The TEME positions in km and velocities in km/s, each of shape ``(n_sets, n_epochs, 3)``.
+            Element sets that decayed or became hyperbolic at an epoch yield ``nan``.
+        """
+        c = self._column
+        t = np.broadcast_to(np.asarray(tsince, dtype=float), (len(self), np.shape(tsince)[-1]))
+        am, nm, em, nodem, argpm, mm, invalid = self._secular(t)
+
+        inclination = c(self.elements.inclination)
+        sinip = np.sin(inclination)
+        cosip = np.cos(inclination)
+
+        # long period periodics
+        axnl = em * np.cos(argpm)
+        temp = 1.0 / (am * (1.0 - em * em))
+        aynl = em * np.sin(argpm) + temp * c(self.aycof)
+        xl = mm + argpm + nodem + temp * c(self.xlcof) * axnl
+
+        sineo1, coseo1 = _solve_kepler(np.fmod(xl - nodem, TWO_PI), axnl, aynl)
+
+        # short period preliminary quantities
+        ecose = axnl * coseo1 + aynl * sineo1
+        esine = axnl * sineo1 - aynl * coseo1
+        el2 = axnl * axnl + aynl * aynl
+        pl = am * (1.0 - el2)
+        invalid |= pl < 0.0
+        pl = np.where(invalid, 1.0, pl)
+        rl = am * (1.0 - ecose)
+        rdotl = np.sqrt(am) * esine / rl
+        rvdotl = np.sqrt(pl) / rl
+        betal = np.sqrt(np.maximum(1.0 - el2, 0.0))
+        temp = esine / (1.0 + betal)
+        sinu = am / rl * (sineo1 - aynl - axnl * temp)
+        cosu = am / rl * (coseo1 - axnl + aynl * temp)
+        su = np.arctan2(sinu, cosu)
+        sin2u = (cosu + cosu) * sinu
+        cos2u = 1.0 - 2.0 * sinu * sinu
+        temp = 1.0 / pl
+        temp1 = 0.5 * J2 * temp
+        temp2 = temp1 * temp
+
+        # short period periodics
+        mrt = rl * (1.0 - 1.5 * temp2 * betal * c(self.con41)) + 0.5 * temp1 * c(self.x1mth2) * cos2u
+        su = su - 0.25 * temp2 * c(self.x7thm1) * sin2u
+        xnode = nodem + 1.5 * temp2 * cosip * sin2u
+        xinc = inclination + 1.5 * temp2 * cosip * sinip * cos2u
+        mvt = rdotl - nm * temp1 * c(self.x1mth2) * sin2u / XKE
+        rvdot = rvdotl + nm * temp1 * (c(self.x1mth2) * cos2u + 1.5 * c(self.con41)) / XKE
+        invalid |= mrt < 1.0
+
+        ux, vx = _orientation(su, xnode, xinc)
+        position = (mrt * EARTH_RADIUS)[..., None] * ux
+        velocity = (EARTH_RADIUS * XKE / 60.0) * (mvt[..., None] * ux + rvdot[..., None] * vx)
+        position[invalid] = np.nan
+        velocity[invalid] = np.nan
+        return position, velocity
+
+    def propagate_to(self, epochs: Sequence[datetime]) -> tuple[NDArray, NDArray]:
+        """Propagate every element set to the same UTC epochs.
+
+        Returns:
+            The TEME positions in km and velocities in km/s, each of shape ``(n_sets, n_epochs, 3)``.
+        """
+        tsince = np.array(
+            [[(epoch - tle_epoch).total_seconds() / 60.0 for epoch in epochs] for tle_epoch in self.elements.epoch],
+        ).reshape(len(self), len(epochs))
+        return self.propagate(tsince)
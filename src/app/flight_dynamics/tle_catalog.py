@@ -0,0 +1,175 @@
+"""Streaming reader of TLE catalog files.
+
+Catalogs such as the Space-Track bulk downloads hold tens of thousands of element sets, either as
+two-line (2LE) or three-line (3LE, with a name line) records. :class:`CatalogReader` is fed the
+text as it arrives and hands out chunks of records, whose checksums, NORAD ids and epochs are
+decoded for the whole chunk at once from its lines as a byte array.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+__all__ = ("CatalogReader", "TleCatalogChunk", "decode_lines")
+
+LINE_LENGTH = 69
+_ZERO = ord("0")
+# Alpha-5 NORAD ids replace the leading digit of ids above 99999 by a letter, skipping I and O
+_ALPHA5 = np.full(256, -1, dtype=np.int64)
+_ALPHA5[_ZERO : _ZERO + 10] = np.arange(10)
+for _value, _letter in enumerate("ABCDEFGHJKLMNPQRSTUVWXYZ", start=10):
+    _ALPHA5[ord(_letter)] = _value
+
+
+@dataclass
+class TleCatalogChunk:
+    """Records of a catalog, as arrays of shape ``(n,)``."""
+
+    names: list[str | None]
+    line1: list[str]
+    line2: list[str]
+    norad_id: NDArray
+    epoch: NDArray
+    """UTC epochs as ``datetime64[us]``."""
+    valid: NDArray
+    """Whether the record is well-formed: line lengths and numbers, checksums and matching NORAD ids."""
+
+    def __len__(self) -> int:
+        return len(self.line1)
+
+    def epochs(self) -> list[datetime]:
+        """Return the epochs as timezone aware datetimes."""
+        return [epoch.replace(tzinfo=UTC) for epoch in self.epoch.astype(datetime)]
+
+
+def _as_bytes(lines: list[str]) -> tuple[NDArray, NDArray]:
+    """Return the lines as an ``(n, 69)`` byte array, with whether they have the expected length."""
+    fits = np.array([len(line) == LINE_LENGTH for line in lines], dtype=bool)
+    padded = "".join(line if ok else " " * LINE_LENGTH for line, ok in zip(lines, fits, strict=True))
+    array = np.frombuffer(padded.encode("ascii", "replace"), dtype=np.uint8).reshape(len(lines), LINE_LENGTH)
+    return array, fits
+
+
+def _checksums_valid(array: NDArray) -> NDArray:
+    """Check the modulo 10 checksums: digits count their value, minus signs count one."""
+    digits = array[:, :-1].astype(np.int64) - _ZERO
+    values = np.where((digits >= 0) & (digits <= 9), digits, 0) + (array[:, :-1] == ord("-"))
+    return values.sum(axis=1) % 10 == array[:, -1].astype(np.int64) - _ZERO
+
+
+def _digits(array: NDArray, columns: slice) -> tuple[NDArray, NDArray]:
+    """Return the integers written in columns of every line, with whether they only hold digits."""
+    digits = array[:, columns].astype(np.int64) - _ZERO
+    ok = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    return (digits * 10 ** np.arange(digits.shape[1] - 1, -1, -1)).sum(axis=1), ok
+
+
+def _norad_ids(array: NDArray) -> tuple[NDArray, NDArray]:
+    leading = _ALPHA5[array[:, 2]]
+    rest, ok = _digits(array, slice(3, 7))
+    return leading * 10_000 + rest, ok & (leading >= 0)
+
+
+def decode_lines(names: list[str | None], line1: list[str], line2: list[str]) -> TleCatalogChunk:
+    """Decode and validate records given as lists of lines."""
+    array1, fits1 = _as_bytes(line1)
+    array2, fits2 = _as_bytes(line2)
+    norad1, ok1 = _norad_ids(array1)
+    norad2, ok2 = _norad_ids(array2)
+
+    # epoch as YYDDD.DDDDDDDD, two digit years from 1957 to 2056
+    year, year_ok = _digits(array1, slice(18, 20))
+    day, day_ok = _digits(array1, slice(20, 23))
+    fraction, fraction_ok = _digits(array1, slice(24, 32))
+    year = np.where(year < 57, 2000 + year, 1900 + year)
+    microseconds = np.rint(((day - 1) + fraction * 1e-8) * 86_400e6).astype(np.int64)
+    epoch = (year - 1970).astype("datetime64[Y]").astype("datetime64[us]") + microseconds.astype("timedelta64[us]")
+
+    valid = (
+        fits1
+        & fits2
+        & (array1[:, 0] == ord("1"))
+        & (array2[:, 0] == ord("2"))
+        & _checksums_valid(array1)
+        & _checksums_valid(array2)
+        & ok1
+        & ok2
+        & (norad1 == norad2)
+        & year_ok
+        & day_ok
+        & fraction_ok
+        & (array1[:, 23] == ord("."))
+    )
+    return TleCatalogChunk(names=names, line1=line1, line2=line2, norad_id=norad1, epoch=epoch, valid=valid)
+
+
+class CatalogReader:
+    """Incremental reader of a 2LE or 3LE catalog.
+
+    Text is fed in pieces of any size, e.g. as it is received, and the reader returns the records
+    it completed in chunks of ``chunk_size``. Lines other than a line 1 directly followed by a line
+    2 are taken as the name of the next record; an orphan line 1 or 2 is counted as malformed.
+    """
+
+    def __init__(self, chunk_size: int = 10_000) -> None:
+        self.chunk_size = chunk_size
+        self.malformed = 0
+        self._partial = ""
+        self._name: str | None = None
+        self._line1: str | None = None
+        self._records: tuple[list[str | None], list[str], list[str]] = ([], [], [])
+
+    def feed(self, text: str) -> list[TleCatalogChunk]:
+        """Read a piece of the catalog, returning the chunks completed by it."""
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        chunks = []
+        for line in lines:
+            self._read_line(line)
+            if len(self._records[1]) >= self.chunk_size:
+                chunks.append(self._flush())
+        return chunks
+
+    def close(self) -> list[TleCatalogChunk]:
+        """Read the end of the catalog, returning the last chunk."""
+        if self._partial:
+            self._read_line(self._partial)
+            self._partial = ""
+        if self._line1 is not None:
+            self.malformed += 1
+            self._line1 = None
+        return [self._flush()] if self._records[1] else []
+
+    def _read_line(self, line: str) -> None:
+        line = line.rstrip()
+        if not line:
+            return
+        if self._line1 is not None:
+            if line.startswith("2 "):
+                names, line1s, line2s = self._records
+                names.append(self._name)
+                line1s.append(self._line1)
+                line2s.append(line)
+                self._name = self._line1 = None
+                return
+            self.malformed += 1
+            self._line1 = None
+        if line.startswith("1 "):
+            self._line1 = line
+        elif line.startswith("2 "):
+            self.malformed += 1
+        else:
+            # 3LE names are prefixed with "0 "
+            self._name = line[2:].strip() if line.startswith("0 ") else line.strip()
+
+    def _flush(self) -> TleCatalogChunk:
+        names, line1s, line2s = self._records
+        self._records = ([], [], [])
+        return decode_lines(names, line1s, line2s)
@@ -1,7 +1,55 @@
-from datetime import datetime
+import math
+from datetime import UTC, datetime
 
+import numpy as np
 from godot.core.tempo import Epoch
 
+from app.flight_dynamics.j2 import cartesian_to_keplerian
+from app.flight_dynamics.schemas.states import AnyState, StateCart, StateKep
+
+UNITS = {"km": 1.0, "m": 1e-3, "km/s": 1.0, "m/s": 1e-3, "rad": 1.0, "deg": math.pi / 180}
+"""Scale factors of the units of the state quantities to km, km/s and rad."""
+
 
 def godot_epoch_to_datetime(godot_epoch: Epoch) -> datetime:
     return datetime.fromisoformat(godot_epoch.calStr("UTC")[:-4] + "Z")
+
+
+def datetime_to_godot_epoch(value: datetime) -> Epoch:
+    return Epoch(value.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S.%f") + " UTC")
+
+
+def parse_quantity(quantity: str) -> float:
+    """Parse a quantity such as ``"7000 km"`` to km, km/s or rad."""
+    value, _, unit = quantity.strip().partition(" ")
+    try:
+        return float(value) * UNITS[unit.strip()]
+    except (KeyError, ValueError) as e:
+        msg = f"Unsupported quantity {quantity!r}, expected a value in {', '.join(UNITS)}."
+        raise ValueError(msg) from e
+
+
+def state_to_keplerian(state: AnyState) -> np.ndarray:
+    """Return the Keplerian elements of a state, with the mean anomaly.
+
+    The elements are ordered as semi-major axis in km, eccentricity, and inclination, right ascension
+    of the ascending node, argument of perigee and mean anomaly in rad.
+    """
+    if isinstance(state, StateCart):
+        return cartesian_to_keplerian(
+            [parse_quantity(getattr(state, name)) for name in ("pos_x", "pos_y", "pos_z", "vel_x", "vel_y", "vel_z")],
+        )
+    if isinstance(state, StateKep):
+        ecc, aop = state.ecc, parse_quantity(state.aop)
+        true_anomaly = parse_quantity(state.tan)
+    else:
+        ecc, aop = math.hypot(state.ecx, state.ecy), math.atan2(state.ecy, state.ecx)
+        true_anomaly = parse_quantity(state.aol) - aop
+    eccentric_anomaly = 2 * math.atan2(
+        math.sqrt(1 - ecc) * math.sin(true_anomaly / 2),
+        math.sqrt(1 + ecc) * math.cos(true_anomaly / 2),
+    )
+    mean_anomaly = (eccentric_anomaly - ecc * math.sin(eccentric_anomaly)) % (2 * math.pi)
+    return np.array(
+        [parse_quantity(state.sma), ecc, parse_quantity(state.inc), parse_quantity(state.ran), aop, mean_anomaly],
+    )
@@ -1,5 +1,36 @@
+from dataclasses import dataclass
+from typing import Literal
+
 from app.db.models import Dynamics, Satellite
 
+Fidelity = Literal["quicklook", "operational", "precise"]
+
+
+@dataclass(frozen=True)
+class FidelityProfile:
+    """Integrator and force model settings trading accuracy for runtime."""
+
+    tolerance: float
+    """Relative tolerance of the integrator."""
+    max_steps: int
+    """Maximum number of integration steps of a propagation."""
+    max_harmonics: int | None
+    """Cap on the degree and order of the Earth gravity field, ``None`` for no cap."""
+
+
+FIDELITY_PROFILES: dict[str, FidelityProfile] = {
+    "quicklook": FidelityProfile(tolerance=1e-7, max_steps=20_000, max_harmonics=8),
+    "operational": FidelityProfile(tolerance=1e-9, max_steps=100_000, max_harmonics=None),
+    "precise": FidelityProfile(tolerance=1e-12, max_steps=1_000_000, max_harmonics=None),
+}
+"""Fidelity profiles of the numerical propagation, by name."""
+
+
+def get_integrator_settings(fidelity: Fidelity = "operational") -> dict:
+    """Return the trajectory integrator settings of a fidelity profile."""
+    profile = FIDELITY_PROFILES[fidelity]
+    return {"steps": profile.max_steps, "tol": profile.tolerance}
+
 
 def add_satellite_dynamics_to_config(uni_config: dict, dynamics: Dynamics, satellite: Satellite) -> None:
     uni_config["bodies"].append(
@@ -14,7 +45,12 @@ def add_satellite_dynamics_to_config(uni_config: dict, dynamics: Dynamics, satel
     )
 
 
-def get_dynamics_config(dynamics: Dynamics, satellite: Satellite) -> dict:
+def get_dynamics_config(dynamics: Dynamics, satellite: Satellite, fidelity: Fidelity = "operational") -> dict:
+    max_harmonics = FIDELITY_PROFILES[fidelity].max_harmonics
+    degree, order = dynamics.harmonics_degree, dynamics.harmonics_order
+    if max_harmonics is not None:
+        degree, order = min(degree, max_harmonics), min(order, max_harmonics)
+
     dynamics_config: dict = {
         "bodies": [
             {
@@ -32,8 +68,8 @@ def get_dynamics_config(dynamics: Dynamics, satellite: Satellite) -> dict:
                 "type": "File",
                 "config": {
                     "point": "Earth",
-                    "degree": dynamics.harmonics_degree,
-                    "order": dynamics.harmonics_order,
+                    "degree": degree,
+                    "order": order,
                     "axes": "ITRF",
                     "file": "data/eigen05c_80_sha.tab",
                 },
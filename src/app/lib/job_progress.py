@@ -0,0 +1,251 @@
+"""Progress reporting of long running SAQ jobs.
+
+Progress is stored on the job itself: ``Job.progress`` holds the completed fraction and
+``Job.meta`` the current ``stage``, the ``epoch`` reached by a propagation and the ``eta`` in
+seconds. Every update is saved to Redis and published on the job channel, which
+:func:`job_events` listens to, so clients follow a job without polling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import queue
+import time
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import msgspec
+from litestar.response import ServerSentEventMessage
+from redis import RedisError
+from saq.job import Status
+from structlog import get_logger
+
+from app.lib.schema import CamelizedBaseStruct
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Awaitable
+    from datetime import datetime
+
+    from saq.job import Job
+    from saq.queue import Queue
+    from saq.types import Context
+
+__all__ = ("PROGRESS_INTERVAL", "TERMINAL_STATUSES", "JobEvent", "JobProgress", "job_events")
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+PROGRESS_INTERVAL = 2.0
+"""Minimum interval in seconds between two published updates of a job."""
+KEEPALIVE_INTERVAL = 15.0
+"""Interval in seconds of the keep-alive comments of an idle job event stream."""
+TERMINAL_STATUSES = frozenset({Status.COMPLETE, Status.FAILED, Status.ABORTED})
+
+
+class JobProgress:
+    """Publish the progress of the job of a task context, at most once per interval.
+
+    Outside of a worker, e.g. when a task is called directly, there is no job and updates are
+    ignored.
+    """
+
+    def __init__(self, ctx: Context | dict | None, interval: float = PROGRESS_INTERVAL) -> None:
+        self.job: Job | None = (ctx or {}).get("job")
+        self.interval = interval
+        self._began = time.monotonic()
+        self._published = float("-inf")
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._began
+
+    async def update(
+        self,
+        fraction: float,
+        stage: str,
+        *,
+        epoch: datetime | None = None,
+        eta: float | None = None,
+        details: dict | None = None,
+        force: bool = False,
+    ) -> None:
+        """Publish the progress of the job.
+
+        Args:
+            fraction: Completed fraction of the job, between 0 and 1.
+            stage: Current stage of the job.
+            epoch: Epoch reached by the propagation.
+            eta: Estimated remaining time in seconds, extrapolated from the elapsed time by default.
+            details: Task specific progress information, e.g. the residuals of a fit.
+            force: Publish even within the interval of the previous update.
+        """
+        if self.job is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._published < self.interval:
+            return
+        self._published = now
+        fraction = min(max(fraction, 0.0), 1.0)
+        if eta is None and fraction > 0:
+            eta = self.elapsed * (1 - fraction) / fraction
+        meta = {
+            **self.job.meta,
+            "stage": stage,
+            "epoch": epoch.isoformat() if epoch is not None else None,
+            "eta": round(eta, 1) if eta is not None else None,
+            "details": details,
+        }
+        try:
+            await self.job.update(progress=round(fraction, 4), meta=meta)
+        except RedisError:
+            # progress is informative only, never fail the job on it
+            logger.warning("Failed to publish the progress of job %s.", self.job.key, exc_info=True)
+
+    async def count(self, done: int, total: int, stage: str) -> None:
+        """Publish the progress of a job made of ``total`` similar items."""
+        await self.update(done / total, stage, force=done == total)
+
+    async def wait(
+        self,
+        awaitable: Awaitable[T],
+        stage: str,
+        *,
+        estimate: float | None,
+        span: tuple[float, float] = (0.0, 1.0),
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> T:
+        """Await a computation reporting no progress itself, publishing estimated progress meanwhile.
+
+        Args:
+            awaitable: The computation.
+            stage: Stage of the job during the computation.
+            estimate: Expected duration of the computation in seconds, ``None`` if unknown.
+            span: Fractions of the job at the start and at the end of the computation.
+            start: Start epoch of the propagated interval.
+            end: End epoch of the propagated interval, the reached epoch is interpolated
+                between ``start`` and ``end``.
+
+        Returns:
+            The result of the computation.
+        """
+        task = asyncio.ensure_future(awaitable)
+        began = time.monotonic()
+        await self.update(span[0], stage, epoch=start, eta=estimate, force=True)
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=self.interval)
+                if task.done() or estimate is None:
+                    continue
+                elapsed = time.monotonic() - began
+                # never report completion before the computation returned
+                fraction = min(elapsed / estimate, 0.99) if estimate > 0 else 0.99
+                epoch = start + (end - start) * fraction if start is not None and end is not None else None
+                await self.update(
+                    span[0] + fraction * (span[1] - span[0]),
+                    stage,
+                    epoch=epoch,
+                    eta=max(estimate - elapsed, 0.0),
+                )
+        finally:
+            if not task.done():
+                task.cancel()
+        return task.result()
+
+    async def follow(self, awaitable: Awaitable[T], updates: queue.Queue, stage: str) -> T:
+        """Await a computation running in another process, publishing the progress it reports.
+
+        Args:
+            awaitable: The computation.
+            updates: Queue shared with the computation, see
+                :func:`app.lib.process_pool.get_process_manager`, on which it puts
+                ``(fraction, details)`` tuples.
+            stage: Stage of the job during the computation.
+
+        Returns:
+            The result of the computation.
+        """
+        task = asyncio.ensure_future(awaitable)
+        await self.update(0.0, stage, force=True)
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=self.interval)
+                latest = None
+                with contextlib.suppress(queue.Empty):
+                    while True:
+                        latest = updates.get_nowait()
+                if latest is not None:
+                    fraction, details = latest
+                    await self.update(fraction, stage, details=details, force=True)
+        finally:
+            if not task.done():
+                task.cancel()
+        return task.result()
+
+
+class JobEvent(CamelizedBaseStruct):
+    """State of a job, as sent to the subscribers of its event stream."""
+
+    key: str
+    status: str
+    progress: float
+    stage: str | None = None
+    epoch: str | None = None
+    eta: float | None = None
+    details: dict[str, Any] | None = None
+    result: Any = None
+    error: str | None = None
+
+    @classmethod
+    def from_job(cls, job: Job) -> JobEvent:
+        return cls(
+            key=job.key,
+            status=job.status.value,
+            progress=job.progress,
+            stage=job.meta.get("stage"),
+            epoch=job.meta.get("epoch"),
+            eta=job.meta.get("eta"),
+            details=job.meta.get("details"),
+            result=job.result,
+            error=job.error,
+        )
+
+
+async def job_events(
+    queue: Queue,
+    job_key: str,
+    keepalive: float = KEEPALIVE_INTERVAL,
+) -> AsyncGenerator[ServerSentEventMessage, None]:
+    """Yield a server-sent event every time the state of a job changes, until it is finished.
+
+    The stream subscribes to the job channel of the queue. The job is also read again after
+    every ``keepalive`` seconds without a notification, which covers updates published before
+    the subscription, and a comment is sent to keep the connection open.
+    """
+    updates: asyncio.Queue[Status] = asyncio.Queue()
+
+    def on_update(_key: str, status: Status) -> bool:
+        updates.put_nowait(status)
+        return status in TERMINAL_STATUSES
+
+    listener = asyncio.create_task(queue.listen([job_key], on_update, timeout=None))
+    last: JobEvent | None = None
+    try:
+        while True:
+            job = await queue.job(job_key)
+            if job is None:
+                yield ServerSentEventMessage(event="expired", data=job_key)
+                return
+            event = JobEvent.from_job(job)
+            if event != last:
+                yield ServerSentEventMessage(event="job", data=msgspec.json.encode(event).decode())
+                last = event
+            else:
+                yield ServerSentEventMessage(comment="keep-alive")
+            if job.status in TERMINAL_STATUSES:
+                return
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(updates.get(), keepalive)
+    finally:
+        listener.cancel()
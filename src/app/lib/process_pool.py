@@ -0,0 +1,104 @@
+"""Process pool running the CPU-bound GODOT computations of a worker.
+
+GODOT holds the GIL during ``Trajectory.compute`` and ``writeIpf``, so running them in a task
+would stall every other coroutine of the SAQ worker. Tasks hand these calls to a pool of
+spawned processes instead, each of them keeping its own pool of warm universes, and only
+perform the I/O themselves.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, ParamSpec, TypeVar
+
+from structlog import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from multiprocessing.managers import SyncManager
+
+    from saq.types import Context
+
+__all__ = (
+    "get_process_manager",
+    "get_process_pool",
+    "run_in_process",
+    "shutdown_process_pool",
+    "startup_process_pool",
+)
+
+logger = get_logger()
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+_manager: SyncManager | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process pool of the current worker, creating it if needed."""
+    global _pool  # noqa: PLW0603
+    if _pool is None:
+        from app.config import get_settings
+
+        processes = get_settings().saq.PROPAGATION_PROCESSES
+        _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        logger.info("Started a pool of %d propagation processes.", processes)
+    return _pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken process pool, the next call starts a new one."""
+    global _pool  # noqa: PLW0603
+    if _pool is pool:
+        _pool = None
+        logger.warning("A propagation process died, restarting the pool.")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def get_process_manager() -> SyncManager:
+    """Return the manager of the objects shared with the pool processes, starting it if needed.
+
+    Its queues can be passed to the functions run in the pool, e.g. to report their progress.
+    """
+    global _manager  # noqa: PLW0603
+    if _manager is None:
+        _manager = multiprocessing.get_context("spawn").Manager()
+    return _manager
+
+
+async def run_in_process(func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """Run a function in the process pool without blocking the event loop.
+
+    The function and its arguments must be picklable, and the function importable from a module
+    that does not pull in the web application. A pool broken by a dying process, e.g. killed for
+    running out of memory, is replaced and the error raised to the caller.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    try:
+        return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        _discard_process_pool(pool)
+        raise
+
+
+async def startup_process_pool(ctx: Context) -> None:
+    """Start the process pool together with the worker."""
+    get_process_pool()
+
+
+async def shutdown_process_pool(ctx: Context) -> None:
+    """Stop the process pool together with the worker."""
+    global _pool, _manager
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await asyncio.get_running_loop().run_in_executor(None, functools.partial(pool.shutdown, cancel_futures=True))
+    if _manager is not None:
+        manager, _manager = _manager, None
+        manager.shutdown()
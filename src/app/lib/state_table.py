@@ -0,0 +1,144 @@
+"""Memory-mapped state tables of stored orbits.
+
+Opening an IPF orbit file means reading all of it into a GODOT universe, in every process that
+queries it. A state table is a sidecar of the IPF file, ``<file>.states.npy``, holding ICRF states
+sampled from it once. It is a plain ``.npy`` array of shape ``(7, n)``: the UTC POSIX timestamps
+of the nodes, then their positions in km and velocities in km/s. The table is memory-mapped, so
+opening it is immediate whatever its size, and the processes reading the same orbit share the
+pages of the page cache instead of holding private copies.
+
+States are interpolated with cubic Hermite polynomials between the two nodes around an epoch.
+The node row is searched in place, and only the nodes around the queried epochs are read.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from numpy.typing import ArrayLike, NDArray
+
+__all__ = ("StateTable", "state_table_path", "write_state_table")
+
+SUFFIX = ".states.npy"
+ROWS = 7
+MIN_NODES = 2
+
+
+def state_table_path(ipf_path: str | Path) -> Path:
+    """Return the path of the state table of an IPF file."""
+    return Path(f"{ipf_path}{SUFFIX}")
+
+
+def write_state_table(
+    path: str | Path,
+    timestamps: ArrayLike,
+    sample: Callable[[NDArray], NDArray],
+    chunk_size: int = 10_000,
+) -> None:
+    """Write a state table, sampling the states by chunks to bound the memory used.
+
+    The table is written next to its final path and moved in place once complete, so readers
+    never map a partial table.
+
+    Args:
+        path: Path of the table.
+        timestamps: Strictly increasing UTC POSIX timestamps of the nodes.
+        sample: Function returning the ICRF states of shape ``(n, 6)`` at timestamps.
+        chunk_size: Number of nodes sampled at once.
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    if timestamps.ndim != 1 or len(timestamps) < MIN_NODES or np.any(np.diff(timestamps) <= 0):
+        msg = "A state table needs at least two strictly increasing epochs."
+        raise ValueError(msg)
+    path = Path(path)
+    partial = path.with_name(f".{path.name}.{os.getpid()}")
+    table = np.lib.format.open_memmap(partial, mode="w+", dtype=np.float64, shape=(ROWS, len(timestamps)))
+    try:
+        table[0] = timestamps
+        for first in range(0, len(timestamps), chunk_size):
+            nodes = slice(first, first + chunk_size)
+            table[1:, nodes] = np.asarray(sample(timestamps[nodes]), dtype=float).T
+        table.flush()
+        del table
+        partial.replace(path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+class StateTable:
+    """ICRF states of an orbit at nodes, interpolated between them."""
+
+    def __init__(self, table: NDArray) -> None:
+        """Wrap a table of shape ``(7, n)``, see :func:`StateTable.open`."""
+        if table.ndim != 2 or table.shape[0] != ROWS or table.shape[1] < MIN_NODES:
+            msg = f"Invalid state table of shape {table.shape}."
+            raise ValueError(msg)
+        self.table = table
+
+    @classmethod
+    def open(cls, path: str | Path) -> StateTable:
+        """Memory-map a state table."""
+        return cls(np.load(path, mmap_mode="r"))
+
+    def __len__(self) -> int:
+        return self.table.shape[1]
+
+    @property
+    def timestamps(self) -> NDArray:
+        """UTC POSIX timestamps of the nodes, a view of the table."""
+        return self.table[0]
+
+    @property
+    def start(self) -> datetime:
+        return datetime.fromtimestamp(float(self.timestamps[0]), UTC)
+
+    @property
+    def end(self) -> datetime:
+        return datetime.fromtimestamp(float(self.timestamps[-1]), UTC)
+
+    def state(self, timestamps: ArrayLike) -> NDArray:
+        """Return the ICRF states in km and km/s at UTC POSIX timestamps.
+
+        Returns:
+            An array of shape ``(n, 6)``, or ``(6,)`` for a scalar timestamp.
+        """
+        timestamps = np.asarray(timestamps, dtype=float)
+        flat = np.atleast_1d(timestamps)
+        nodes = self.timestamps
+        if np.any((flat < nodes[0]) | (flat > nodes[-1])):
+            msg = "Epoch outside of the span of the state table."
+            raise ValueError(msg)
+        index = np.clip(np.searchsorted(nodes, flat, side="right") - 1, 0, len(self) - 2)
+        # only the two nodes around every epoch are read from the mapped table
+        first, second = self.table[:, index], self.table[:, index + 1]
+        step = second[0] - first[0]
+        s = (flat - first[0]) / step
+        s2, s3 = s * s, s * s * s
+        position = (
+            (2 * s3 - 3 * s2 + 1) * first[1:4]
+            + (s3 - 2 * s2 + s) * step * first[4:]
+            + (3 * s2 - 2 * s3) * second[1:4]
+            + (s3 - s2) * step * second[4:]
+        )
+        velocity = (
+            6 * (s2 - s) / step * (first[1:4] - second[1:4])
+            + (3 * s2 - 4 * s + 1) * first[4:]
+            + (3 * s2 - 2 * s) * second[4:]
+        )
+        result = np.concatenate([position, velocity]).T
+        return result.reshape(*timestamps.shape, 6)
+
+    def state_at(self, epochs: Sequence[datetime]) -> NDArray:
+        """Return the ICRF states at epochs, naive datetimes taken as UTC, of shape ``(n, 6)``."""
+        timestamps = [
+            (epoch if epoch.tzinfo is not None else epoch.replace(tzinfo=UTC)).timestamp() for epoch in epochs
+        ]
+        return self.state(np.array(timestamps, dtype=float).reshape(len(timestamps)))
@@ -0,0 +1,193 @@
+"""Per-process pool of warm GODOT universes.
+
+Building a :class:`godot.cosmos.Universe` loads the planetary ephemerides, the nutation and ERP
+files and the gravity field coefficients from ``data/``. For short propagations this load takes
+longer than the integration itself, so workers keep a small number of universes alive and hand
+them out again to every job with the same universe configuration.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from godot import cosmos
+from structlog import get_logger
+
+__all__ = (
+    "UniversePool",
+    "environment_fingerprint",
+    "get_universe_pool",
+    "universe_key",
+)
+
+logger = get_logger()
+
+EnvironmentFingerprint = tuple[tuple[str, int, int], ...]
+
+
+def universe_key(config: dict) -> str:
+    """Return a canonical hash of a universe configuration.
+
+    Args:
+        config: The GODOT universe configuration.
+
+    Returns:
+        The hex encoded SHA-256 digest of the configuration, independent of the key order.
+    """
+    canonical = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _referenced_files(value: Any) -> set[str]:
+    if isinstance(value, dict):
+        return set().union(*(_referenced_files(v) for v in value.values()))
+    if isinstance(value, list):
+        return set().union(*(_referenced_files(v) for v in value))
+    if isinstance(value, str) and Path(value).is_file():
+        return {value}
+    return set()
+
+
+def environment_fingerprint(config: dict) -> EnvironmentFingerprint:
+    """Return the version of the environment files a universe configuration depends on.
+
+    Every string in the configuration that points to an existing file (ephemerides, nutation,
+    ERP, space weather, gravity field...) contributes its modification time and size, so the
+    fingerprint changes whenever one of these files is refreshed.
+
+    Args:
+        config: The GODOT universe configuration.
+
+    Returns:
+        A sorted tuple of ``(path, mtime_ns, size)`` entries.
+    """
+    fingerprint = []
+    for path in sorted(_referenced_files(config)):
+        stat = Path(path).stat()
+        fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+def _resident_memory() -> int:
+    """Return the resident memory of the current process in bytes, 0 if unknown."""
+    try:
+        return int(Path("/proc/self/statm").read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+@dataclass
+class _PoolEntry:
+    universe: cosmos.Universe
+    fingerprint: EnvironmentFingerprint
+    size: int
+    uses: int = 0
+
+
+class UniversePool:
+    """LRU pool of GODOT universes keyed by their configuration.
+
+    Entries are evicted when the pool holds more than ``max_size`` universes, when the estimated
+    memory of the pooled universes exceeds ``max_memory`` bytes, when one of the environment files
+    they were built from has changed, or after they served ``max_uses`` jobs.
+    """
+
+    def __init__(self, max_size: int, max_memory: int, max_uses: int) -> None:
+        """Initialize the pool.
+
+        Args:
+            max_size: Maximum number of universes kept alive.
+            max_memory: Approximate memory budget of the pooled universes in bytes.
+            max_uses: Number of times a universe is handed out before it is rebuilt.
+        """
+        self.max_size = max_size
+        self.max_memory = max_memory
+        self.max_uses = max_uses
+        self._entries: OrderedDict[str, _PoolEntry] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, config: dict) -> bool:
+        return universe_key(config) in self._entries
+
+    @property
+    def memory(self) -> int:
+        """Estimated memory held by the pooled universes in bytes."""
+        return sum(entry.size for entry in self._entries.values())
+
+    def get(self, config: dict) -> cosmos.Universe:
+        """Return a warm universe for the configuration, building it if needed.
+
+        Args:
+            config: The GODOT universe configuration.
+
+        Returns:
+            The pooled universe.
+        """
+        key = universe_key(config)
+        fingerprint = environment_fingerprint(config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.fingerprint != fingerprint or entry.uses >= self.max_uses):
+                logger.info("Recycling pooled universe %s.", key[:12])
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                entry = self._build(config, fingerprint)
+                self._entries[key] = entry
+                self._evict(keep=key)
+            self._entries.move_to_end(key)
+            entry.uses += 1
+            return entry.universe
+
+    def invalidate(self, config: dict) -> None:
+        """Drop the universe built from the configuration, if any."""
+        with self._lock:
+            self._entries.pop(universe_key(config), None)
+
+    def clear(self) -> None:
+        """Drop all pooled universes."""
+        with self._lock:
+            self._entries.clear()
+
+    def _build(self, config: dict, fingerprint: EnvironmentFingerprint) -> _PoolEntry:
+        rss_before = _resident_memory()
+        start = time.perf_counter()
+        universe = cosmos.Universe(config)
+        size = max(0, _resident_memory() - rss_before)
+        logger.info(
+            "Loaded universe in %.2f s (%.1f MB).",
+            time.perf_counter() - start,
+            size / 1024**2,
+        )
+        return _PoolEntry(universe=universe, fingerprint=fingerprint, size=size)
+
+    def _evict(self, keep: str) -> None:
+        while len(self._entries) > 1 and (len(self._entries) > self.max_size or self.memory > self.max_memory):
+            key = next(k for k in self._entries if k != keep)
+            logger.info("Evicting pooled universe %s.", key[:12])
+            del self._entries[key]
+
+
+@lru_cache(maxsize=1)
+def get_universe_pool() -> UniversePool:
+    """Return the universe pool of the current process."""
+    from app.config import get_settings
+
+    settings = get_settings()
+    return UniversePool(
+        max_size=settings.fdy.UNIVERSE_POOL_SIZE,
+        max_memory=settings.fdy.UNIVERSE_POOL_MEMORY_MB * 1024**2,
+        max_uses=settings.fdy.UNIVERSE_POOL_MAX_USES,
+    )
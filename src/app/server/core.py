@@ -19,6 +19,7 @@ if TYPE_CHECKING:
     from click import Group
     from litestar import Request
     from litestar.config.app import AppConfig
+    from litestar.types import ControllerRouterHandler
     from redis.asyncio import Redis
 
 
@@ -37,13 +38,15 @@ class ApplicationCore(InitPluginProtocol, CLIPluginProtocol):
     app_slug: str
 
     def on_cli_init(self, cli: Group) -> None:
-        from app.cli.commands import user_management_group
+        from app.cli.commands import orbit_management_group, tle_management_group, user_management_group
         from app.config import get_settings
 
         settings = get_settings()
         self.redis = settings.redis.get_client()
         self.app_slug = settings.app.slug
         cli.add_command(user_management_group)
+        cli.add_command(tle_management_group)
+        cli.add_command(orbit_management_group)
 
     def on_app_init(self, app_config: AppConfig) -> AppConfig:
         """Configure application for use with SQLAlchemy.
@@ -64,26 +67,11 @@ class ApplicationCore(InitPluginProtocol, CLIPluginProtocol):
         from app.config import constants, get_settings
         from app.db import models as m
         from app.domain.accounts import signals as account_signals
-        from app.domain.accounts.controllers import AccessController, UserController, UserRoleController
         from app.domain.accounts.deps import provide_user
         from app.domain.accounts.guards import auth as jwt_auth
         from app.domain.accounts.services import RoleService, UserService
-        from app.domain.data_status.controllers.data_status import DataStatusController
-        from app.domain.data_status.controllers.data_update import DataUpdateController
-        from app.domain.dynamics.controllers import DynamicsController
-        from app.domain.ground_station.controllers import GroundStationController
-        from app.domain.orbit.controllers import OrbitController
-        from app.domain.propagation.controllers import PropagationController
-        from app.domain.satellite.controllers import SatelliteController
-        from app.domain.system.controllers import SystemController
-        from app.domain.tags.controllers import TagController
         from app.domain.teams import signals as team_signals
-        from app.domain.teams.controllers import TeamController, TeamMemberController
         from app.domain.teams.services import TeamMemberService, TeamService
-        from app.domain.tle.controllers.tle_fitting import TleFitController
-        from app.domain.tle.controllers.tles import TLEController
-        from app.domain.util.controllers.util import ConversionController
-        from app.domain.web.controllers import WebController
         from app.lib.exceptions import ApplicationError, exception_to_http_response
         from app.server import plugins
 
@@ -118,28 +106,7 @@ class ApplicationCore(InitPluginProtocol, CLIPluginProtocol):
         )
 
         # routes
-        app_config.route_handlers.extend(
-            [
-                SystemController,
-                AccessController,
-                UserController,
-                TeamController,
-                UserRoleController,
-                TeamMemberController,
-                TagController,
-                WebController,
-                DataUpdateController,
-                DataStatusController,
-                GroundStationController,
-                TleFitController,
-                DynamicsController,
-                OrbitController,
-                PropagationController,
-                SatelliteController,
-                TLEController,
-                ConversionController,
-            ],
-        )
+        app_config.route_handlers.extend(self._route_handlers())
         # signatures
         app_config.signature_namespace.update(
             {
@@ -178,6 +145,49 @@ class ApplicationCore(InitPluginProtocol, CLIPluginProtocol):
         )
         return app_config
 
+    @staticmethod
+    def _route_handlers() -> list[ControllerRouterHandler]:
+        """Return the controllers of the application."""
+        from app.domain.accounts.controllers import AccessController, UserController, UserRoleController
+        from app.domain.conjunction.controllers import ConjunctionController
+        from app.domain.data_status.controllers.data_status import DataStatusController
+        from app.domain.data_status.controllers.data_update import DataUpdateController
+        from app.domain.dynamics.controllers import DynamicsController
+        from app.domain.ground_station.controllers import GroundStationController
+        from app.domain.orbit.controllers import OrbitController, OrbitEnsembleController
+        from app.domain.propagation.controllers import PropagationController
+        from app.domain.satellite.controllers import SatelliteController
+        from app.domain.system.controllers import SystemController
+        from app.domain.tags.controllers import TagController
+        from app.domain.teams.controllers import TeamController, TeamMemberController
+        from app.domain.tle.controllers.tle_fitting import TleFitController
+        from app.domain.tle.controllers.tles import TLEController
+        from app.domain.util.controllers.util import ConversionController
+        from app.domain.web.controllers import WebController
+
+        return [
+            SystemController,
+            AccessController,
+            UserController,
+            TeamController,
+            UserRoleController,
+            TeamMemberController,
+            TagController,
+            WebController,
+            DataUpdateController,
+            DataStatusController,
+            GroundStationController,
+            TleFitController,
+            DynamicsController,
+            OrbitController,
+            OrbitEnsembleController,
+            PropagationController,
+            SatelliteController,
+            TLEController,
+            ConjunctionController,
+            ConversionController,
+        ]
+
     def redis_store_factory(self, name: str) -> RedisStore:
         return RedisStore(self.redis, namespace=f"{self.app_slug}:{name}")
 
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+from datetime import UTC, datetime, timedelta
+
+import anyio
+import msgspec
+import pytest
+from saq.job import Job, Status
+
+from app.lib.job_progress import JobProgress, job_events
+
+pytestmark = pytest.mark.anyio
+
+
+class _FakeQueue:
+    """In-memory stand-in of a SAQ queue, publishing job updates to its listeners."""
+
+    def __init__(self) -> None:
+        self.jobs: dict[str, Job] = {}
+        self.listeners: list[asyncio.Queue] = []
+
+    async def update(self, job: Job) -> None:
+        self.jobs[job.key] = job
+        for listener in self.listeners:
+            listener.put_nowait(job.status)
+
+    async def job(self, job_key: str) -> Job | None:
+        job = self.jobs.get(job_key)
+        return None if job is None else copy.copy(job)
+
+    async def listen(self, job_keys: list[str], callback, **options: float | None) -> None:  # noqa: ANN001
+        updates: asyncio.Queue = asyncio.Queue()
+        self.listeners.append(updates)
+        with anyio.fail_after(options.get("timeout")):
+            while not callback(job_keys[0], await updates.get()):
+                pass
+
+
+def _job(queue: _FakeQueue) -> Job:
+    job = Job("propagate_and_save", queue=queue, key="job")  # type: ignore[arg-type]
+    job.status = Status.ACTIVE
+    queue.jobs[job.key] = job
+    return job
+
+
+async def test_progress_is_throttled() -> None:
+    queue = _FakeQueue()
+    job = _job(queue)
+    progress = JobProgress({"job": job}, interval=60)
+
+    await progress.update(0.25, "integrating", epoch=datetime(2024, 1, 1, tzinfo=UTC))
+    await progress.update(0.5, "integrating")
+    assert job.progress == 0.25
+    assert job.meta["stage"] == "integrating"
+    assert job.meta["epoch"] == "2024-01-01T00:00:00+00:00"
+    assert job.meta["eta"] is not None
+
+    await progress.count(4, 4, "propagating")
+    assert job.progress == 1.0
+
+    # without a job, e.g. when a task is called directly, updates are ignored
+    await JobProgress({}).update(0.5, "integrating")
+
+
+async def test_wait_estimates_progress() -> None:
+    queue = _FakeQueue()
+    job = _job(queue)
+    progress = JobProgress({"job": job}, interval=0.01)
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+
+    async def compute() -> str:
+        await asyncio.sleep(0.1)
+        return "done"
+
+    end = start + timedelta(days=1)
+    result = await progress.wait(compute(), "integrating", estimate=0.2, span=(0, 0.9), start=start, end=end)
+    assert result == "done"
+    assert 0 < job.progress < 0.9
+    assert start < datetime.fromisoformat(job.meta["epoch"]) < end
+
+
+async def test_job_events_stream_until_complete() -> None:
+    queue = _FakeQueue()
+    job = _job(queue)
+
+    async def run() -> None:
+        await asyncio.sleep(0.05)
+        await job.update(progress=0.5, meta={"stage": "integrating"})
+        await asyncio.sleep(0.05)
+        await job.update(status=Status.COMPLETE, progress=1.0, result={"orbit_id": "x"})
+
+    runner = asyncio.create_task(run())
+    events = [
+        msgspec.json.decode(message.data)
+        async for message in job_events(queue, "job", keepalive=1)  # type: ignore[arg-type]
+        if message.event == "job"
+    ]
+    await runner
+
+    assert [event["progress"] for event in events] == [0.0, 0.5, 1.0]
+    assert events[1]["stage"] == "integrating"
+    assert events[-1]["status"] == "complete"
+    assert events[-1]["result"] == {"orbit_id": "x"}
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.lib import process_pool
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_broken_pool_is_replaced(monkeypatch: pytest.MonkeyPatch) -> None:
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    monkeypatch.setattr(process_pool, "_pool", pool)
+
+    with pytest.raises(BrokenProcessPool):
+        await process_pool.run_in_process(os._exit, 1)
+    assert process_pool._pool is None
+
+    monkeypatch.setattr(process_pool, "_pool", ProcessPoolExecutor(max_workers=1))
+    assert await process_pool.run_in_process(divmod, 7, 2) == (3, 1)
+    process_pool._pool.shutdown()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from app.lib import universe_pool
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+pytestmark = pytest.mark.anyio
+
+
+class _FakeUniverse:
+    def __init__(self, config: dict) -> None:
+        self.config = config
+
+
+@pytest.fixture(autouse=True)
+def _fake_universe(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(universe_pool.cosmos, "Universe", _FakeUniverse)
+
+
+def test_universe_key_is_order_independent() -> None:
+    assert universe_pool.universe_key({"a": 1, "b": [1, 2]}) == universe_pool.universe_key({"b": [1, 2], "a": 1})
+    assert universe_pool.universe_key({"a": 1}) != universe_pool.universe_key({"a": 2})
+
+
+def test_pool_reuses_and_evicts_least_recently_used() -> None:
+    pool = universe_pool.UniversePool(max_size=2, max_memory=1024**4, max_uses=100)
+    first = pool.get({"name": "first"})
+    pool.get({"name": "second"})
+    assert pool.get({"name": "first"}) is first
+
+    pool.get({"name": "third"})
+    assert len(pool) == 2
+    assert {"name": "first"} in pool
+    assert {"name": "second"} not in pool
+
+
+def test_pool_recycles_after_max_uses() -> None:
+    pool = universe_pool.UniversePool(max_size=2, max_memory=1024**4, max_uses=2)
+    first = pool.get({"name": "first"})
+    assert pool.get({"name": "first"}) is first
+    assert pool.get({"name": "first"}) is not first
+
+
+def test_pool_invalidates_on_environment_file_refresh(tmp_path: Path) -> None:
+    data_file = tmp_path / "erp.ipf"
+    data_file.write_bytes(b"old")
+    config = {"frames": [{"config": {"erp": str(data_file)}}]}
+    pool = universe_pool.UniversePool(max_size=2, max_memory=1024**4, max_uses=100)
+
+    first = pool.get(config)
+    assert pool.get(config) is first
+
+    data_file.write_bytes(b"refreshed")
+    os.utime(data_file, ns=(0, 0))
+    assert pool.get(config) is not first
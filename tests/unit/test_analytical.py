@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.flight_dynamics.j2 import cartesian_to_keplerian, keplerian_to_cartesian, propagate_j2, secular_rates
+from app.flight_dynamics.sgp4 import Sgp4, TleElements
+
+pytestmark = pytest.mark.anyio
+
+# verification case of Vallado et al., "Revisiting Spacetrack Report #3"
+TLE_00005 = (
+    "1 00005U 58002B   00179.78495062  .00000023  00000-0  28098-4 0  4753",
+    "2 00005  34.2682 348.7242 1859667 331.7664  19.3264 10.82419157413667",
+)
+GEO = (
+    "1 28626U 05008A   24001.50000000 -.00000290  00000-0  00000-0 0  9990",
+    "2 28626   0.0171 271.8264 0002394 144.2340 306.4432  1.00272179 69296",
+)
+
+
+def test_sgp4_reference_vectors() -> None:
+    propagator = Sgp4(TleElements.from_lines([TLE_00005]))
+    assert propagator.elements.epoch[0].replace(microsecond=0) == datetime(2000, 6, 27, 18, 50, 19, tzinfo=UTC)
+
+    position, velocity = propagator.propagate([0.0, 360.0])
+
+    np.testing.assert_allclose(position[0, 0], [7022.46529266, -1400.08296755, 0.03995155], atol=1e-6)
+    np.testing.assert_allclose(velocity[0, 0], [1.893841015, 6.405893759, 4.534807250], atol=1e-9)
+    np.testing.assert_allclose(position[0, 1], [-7154.03120202, -3783.17682504, -3536.19412294], atol=1e-6)
+    np.testing.assert_allclose(velocity[0, 1], [4.741887409, -4.151817765, -2.093935425], atol=1e-9)
+
+
+def test_sgp4_batch_matches_single_sets() -> None:
+    perturbed = (TLE_00005[0], TLE_00005[1][:43] + " 25.3264" + TLE_00005[1][51:])
+    minutes = np.linspace(-1440.0, 1440.0, 97)
+
+    position, velocity = Sgp4(TleElements.from_lines([TLE_00005, perturbed])).propagate(minutes)
+
+    assert position.shape == velocity.shape == (2, 97, 3)
+    for index, lines in enumerate([TLE_00005, perturbed]):
+        single_position, single_velocity = Sgp4(TleElements.from_lines([lines])).propagate(minutes)
+        np.testing.assert_allclose(position[index], single_position[0], rtol=0, atol=1e-9)
+        np.testing.assert_allclose(velocity[index], single_velocity[0], rtol=0, atol=1e-12)
+    assert not np.allclose(position[0], position[1])
+
+
+def test_sgp4_rejects_deep_space() -> None:
+    with pytest.raises(ValueError, match="Deep-space"):
+        Sgp4(TleElements.from_lines([GEO]))
+
+
+def test_j2_secular_drift() -> None:
+    state = np.array([7000.0, 0.0, 0.0, 0.0, -1.0388, 7.4747])
+    elements = cartesian_to_keplerian(state)
+    np.testing.assert_allclose(keplerian_to_cartesian(elements), state, atol=1e-9)
+
+    # the node of a sun-synchronous orbit drifts by about 360 degrees per year
+    node_rate = secular_rates([7078.0, 0.001, np.deg2rad(98.19), 0.0, 0.0, 0.0])[0]
+    assert np.rad2deg(node_rate) * 86400 == pytest.approx(360 / 365.2422, rel=1e-2)
+
+    states = propagate_j2(elements, np.arange(0.0, 14 * 86400, 60.0))
+    assert states.shape == (14 * 1440, 6)
+    np.testing.assert_allclose(states[0], state, atol=1e-9)
+    # the energy of the secular propagation is constant
+    energy = np.sum(states[:, 3:] ** 2, axis=1) / 2 - 398600.4418 / np.linalg.norm(states[:, :3], axis=1)
+    np.testing.assert_allclose(energy, energy[0], rtol=1e-10)
+
+
+def test_advanced_elements_propagate_to_the_same_states() -> None:
+    propagator = Sgp4(TleElements.from_lines([TLE_00005]))
+    advanced = Sgp4(propagator.advance([1440.0]))
+
+    assert advanced.elements.epoch[0] == propagator.elements.epoch[0] + timedelta(days=1)
+    np.testing.assert_allclose(advanced.propagate([0.0])[0], propagator.propagate([1440.0])[0], atol=1e-3)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.flight_dynamics.chebyshev import ChebyshevEphemeris, fit_chebyshev
+
+pytestmark = pytest.mark.anyio
+
+MU = 398600.4418
+RADIUS = 7000.0
+
+
+def _circular_orbit(seconds: np.ndarray) -> np.ndarray:
+    rate = np.sqrt(MU / RADIUS**3)
+    angle = rate * np.asarray(seconds)
+    return np.column_stack(
+        [
+            RADIUS * np.cos(angle),
+            RADIUS * np.sin(angle) * np.cos(0.9),
+            RADIUS * np.sin(angle) * np.sin(0.9),
+            -RADIUS * rate * np.sin(angle),
+            RADIUS * rate * np.cos(angle) * np.cos(0.9),
+            RADIUS * rate * np.cos(angle) * np.sin(0.9),
+        ],
+    )
+
+
+def test_fit_within_tolerance() -> None:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    ephemeris = fit_chebyshev(_circular_orbit, start, duration=2 * 86400, tolerance=1e-3)
+
+    seconds = np.linspace(0, ephemeris.duration, 5001)
+    states = ephemeris.state(seconds)
+    expected = _circular_orbit(seconds)
+    assert np.max(np.linalg.norm(states[:, :3] - expected[:, :3], axis=1)) < 1e-3
+    assert np.max(np.linalg.norm(states[:, 3:] - expected[:, 3:], axis=1)) < 1e-4
+    # far fewer coefficients than a tabulated ephemeris at one state per minute
+    assert ephemeris.coefficients.size < seconds.size
+
+
+def test_scalar_epoch_and_span() -> None:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    ephemeris = fit_chebyshev(_circular_orbit, start, duration=3600, tolerance=1e-3)
+
+    seconds = ephemeris.seconds_since_start(start + timedelta(minutes=30))
+    np.testing.assert_allclose(ephemeris.state(seconds), _circular_orbit([seconds])[0], atol=1e-3)
+    assert ephemeris.position(seconds).shape == (3,)
+    with pytest.raises(ValueError, match="outside"):
+        ephemeris.state(ephemeris.duration + 1)
+
+
+def test_serialization_round_trip() -> None:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    ephemeris = fit_chebyshev(_circular_orbit, start, duration=86400, tolerance=1e-2)
+
+    loaded = ChebyshevEphemeris.from_bytes(ephemeris.to_bytes())
+    assert loaded.start == start
+    assert loaded.interval == ephemeris.interval
+    np.testing.assert_array_equal(loaded.coefficients, ephemeris.coefficients)
+
+
+def test_tolerance_out_of_reach() -> None:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+
+    with pytest.raises(ValueError, match="above the tolerance"):
+        fit_chebyshev(_circular_orbit, start, duration=86400, tolerance=1e-12, degree=4, max_segments=4)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import numpy as np
+
+from app.flight_dynamics.catalog import TleCatalog, as_datetime64
+from app.flight_dynamics.conjunctions import neighbour_pairs, screen_catalog, shell_filter
+from app.flight_dynamics.sgp4 import TleElements, is_deep_space
+
+
+def _catalog(count: int, seed: int = 0, mean_motion: float = 15.2) -> TleCatalog:
+    rng = np.random.default_rng(seed)
+    elements = TleElements(
+        epoch=[datetime(2024, 1, 1, tzinfo=UTC)] * count,
+        bstar=np.full(count, 1e-5),
+        inclination=rng.uniform(0.5, 1.7, count),
+        raan=rng.uniform(0, 2 * np.pi, count),
+        eccentricity=rng.uniform(0.0005, 0.01, count),
+        arg_perigee=rng.uniform(0, 2 * np.pi, count),
+        mean_anomaly=rng.uniform(0, 2 * np.pi, count),
+        mean_motion=mean_motion * 2 * np.pi / 1440 * rng.uniform(0.995, 1.005, count),
+    )
+    return TleCatalog(
+        ids=list(range(count)),
+        elements=elements,
+        epoch=as_datetime64(elements.epoch),
+        deep_space=is_deep_space(elements),
+    )
+
+
+def test_neighbour_pairs_hold_every_close_pair() -> None:
+    rng = np.random.default_rng(1)
+    position = rng.uniform(-100, 100, (1000, 3))
+    position[5] = np.nan
+
+    first, second = neighbour_pairs(position, 10.0)
+
+    pairs = set(zip(first.tolist(), second.tolist(), strict=True))
+    distance = np.linalg.norm(position[:, None] - position[None], axis=-1)
+    expected = set(zip(*np.nonzero(np.triu(distance <= 10.0, 1)), strict=True))
+    assert len(pairs) == len(first)
+    assert {(int(i), int(j)) for i, j in expected} <= pairs
+    assert all(i < j and 5 not in (i, j) for i, j in pairs)
+
+
+def test_shell_filter_drops_isolated_orbits() -> None:
+    catalog = _catalog(3)
+    catalog.elements.mean_motion[2] = 12.0 * 2 * np.pi / 1440
+
+    assert shell_filter(catalog, 5.0).tolist() == [0, 1]
+
+
+def test_screening_finds_the_close_approaches_of_a_dense_sampling() -> None:
+    catalog = _catalog(120)
+    epochs = np.arange(
+        np.datetime64("2024-01-01T00:00"),
+        np.datetime64("2024-01-01T02:00"),
+        np.timedelta64(60, "s"),
+    ).astype("datetime64[us]")
+    threshold = 50.0
+
+    conjunctions = screen_catalog(catalog, epochs, threshold, max_window_states=2000)
+
+    found: dict[tuple[int, int], float] = {}
+    for pair in zip(conjunctions.first.tolist(), conjunctions.second.tolist(), conjunctions.miss_distance, strict=True):
+        found[pair[:2]] = min(pair[2], found.get(pair[:2], np.inf))
+    fine = np.arange(epochs[0], epochs[-1] + np.timedelta64(1, "s"), np.timedelta64(2, "s"))
+    position = catalog.propagate(fine).position
+    expected = 0
+    for first in range(len(catalog)):
+        closest = np.linalg.norm(position[first + 1 :] - position[first], axis=-1).min(axis=-1)
+        for second in np.flatnonzero(closest < 0.95 * threshold).tolist():
+            # the refined approach is at least as close as the dense sampling
+            assert found[first, first + 1 + second] <= closest[second] + 1e-3
+            expected += 1
+    assert expected > 0
+    assert np.all(conjunctions.miss_distance <= threshold)
+    assert np.all(conjunctions.first < conjunctions.second)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.flight_dynamics import ensemble
+
+pytestmark = pytest.mark.anyio
+
+
+def test_summarize_ensemble_matches_numpy() -> None:
+    rng = np.random.default_rng(1)
+    states = rng.normal(size=(50, 4, 6))
+
+    statistics = ensemble.summarize_ensemble(states, [5.0, 50.0, 95.0])
+
+    np.testing.assert_allclose(statistics["mean"], states.mean(axis=0))
+    for epoch in range(4):
+        np.testing.assert_allclose(statistics["covariance"][epoch], np.cov(states[:, epoch], rowvar=False))
+    assert statistics["percentiles"].shape == (3, 4, 6)
+    assert statistics["position_envelope"].shape == (3, 4)
+    assert np.all(np.diff(statistics["position_envelope"], axis=0) >= 0)
+
+
+def test_draw_samples_keeps_the_nominal_sample() -> None:
+    nominal = np.array([7000.0, 0.0, 0.0, 0.0, 7.5, 0.0])
+    samples = ensemble.draw_samples(
+        nominal,
+        2.2,
+        1.3,
+        100.0,
+        samples=20,
+        position_sigma=0.1,
+        velocity_sigma=1e-4,
+        drag_coefficient_sigma=0.1,
+        srp_coefficient_sigma=0.1,
+        mass_sigma=1.0,
+        seed=3,
+    )
+
+    assert len(samples) == 20
+    np.testing.assert_array_equal(samples.as_array()[0], [*nominal, 2.2, 1.3, 100.0])
+    assert samples.as_array().shape == (20, 9)
+    assert not np.allclose(samples.states[1:], nominal)
+
+
+def test_parametrize_dynamics_does_not_modify_the_configuration() -> None:
+    config = {
+        "dynamics": [
+            {"name": "drag", "type": "SimpleDrag", "config": {"cd": 2.2, "mass": 100.0}},
+            {"name": "srp", "type": "SimpleSRP", "config": {"cr": 1.3, "mass": 100.0}},
+        ],
+    }
+
+    parametrized = ensemble.parametrize_dynamics(config, 2.2, 1.3, 100.0)
+
+    assert config["dynamics"][0]["config"]["cd"] == 2.2
+    assert parametrized["dynamics"][0]["config"] == {"cd": ensemble.DRAG_COEFFICIENT, "mass": ensemble.MASS}
+    assert parametrized["dynamics"][1]["config"] == {"cr": ensemble.SRP_COEFFICIENT, "mass": ensemble.MASS}
+    assert [parameter["name"] for parameter in parametrized["parameters"]] == list(ensemble.ENSEMBLE_PARAMETERS)
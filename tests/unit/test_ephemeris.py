@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from app.flight_dynamics import ephemeris
+from app.flight_dynamics.chebyshev import fit_chebyshev
+from app.flight_dynamics.ephemeris import EphemerisCache
+from app.lib.state_table import state_table_path, write_state_table
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+class _FakeFrames:
+    def __init__(self) -> None:
+        self.points: dict[str, str] = {}
+
+    def pointId(self, name: str) -> int:  # noqa: N802
+        if name not in self.points:
+            msg = f"No point {name}"
+            raise RuntimeError(msg)
+        return list(self.points).index(name)
+
+    def addIpfPoint(self, name: str, path: str, _centers: dict) -> None:  # noqa: N802
+        self.points[name] = path
+
+    def vector6(self, _center: str, point: str, axes: str, epoch: float) -> np.ndarray:
+        offset = {"ICRF": 0.0, "ITRF": 1.0, "TEME": 2.0}[axes]
+        return np.full(6, epoch + offset + list(self.points).index(point))
+
+
+@pytest.fixture
+def universes(monkeypatch: pytest.MonkeyPatch) -> list[SimpleNamespace]:
+    created: list[SimpleNamespace] = []
+
+    def build(_config: dict) -> SimpleNamespace:
+        created.append(SimpleNamespace(frames=_FakeFrames()))
+        return created[-1]
+
+    monkeypatch.setattr(ephemeris.cosmos, "Universe", build)
+    monkeypatch.setattr(ephemeris, "datetime_to_godot_epoch", lambda epoch: (epoch - START).total_seconds())
+    return created
+
+
+def test_opened_orbits_are_least_recently_used() -> None:
+    cache = EphemerisCache(max_size=2)
+    first = cache.open("a.ipf")
+    cache.open("b.ipf")
+    assert cache.open("a.ipf") is first
+    cache.open("c.ipf")
+
+    assert "a.ipf" in cache
+    assert "b.ipf" not in cache
+    assert (cache.hits, cache.misses) == (1, 3)
+    cache.discard("a.ipf")
+    assert len(cache) == 1
+
+
+def test_icrf_states_come_from_the_chebyshev_ephemeris(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    universes: list[SimpleNamespace],
+) -> None:
+    rate = 2 * np.pi / 6000
+
+    def circular(seconds: np.ndarray) -> np.ndarray:
+        angle = rate * np.asarray(seconds)
+        zeros = np.zeros_like(angle)
+        position = 7000 * np.column_stack([np.cos(angle), np.sin(angle), zeros])
+        velocity = 7000 * rate * np.column_stack([-np.sin(angle), np.cos(angle), zeros])
+        return np.hstack([position, velocity])
+
+    (tmp_path / "orbit.npz").write_bytes(fit_chebyshev(circular, START, duration=86400, tolerance=1e-4).to_bytes())
+    monkeypatch.setattr(ephemeris, "UPLOADS", tmp_path)
+    cache = EphemerisCache(max_size=2)
+    orbit = cache.open("orbit.ipf", "orbit.npz")
+    # naive epochs are UTC
+    epochs = [START + timedelta(seconds=1500), START.replace(tzinfo=None) + timedelta(hours=1)]
+
+    states, source = cache.states(orbit, epochs)
+
+    assert source == "chebyshev"
+    np.testing.assert_allclose(states, circular(np.array([1500.0, 3600.0])), atol=1e-3)
+    assert universes == []
+
+
+def test_ipf_points_are_loaded_once_per_universe(universes: list[SimpleNamespace]) -> None:
+    cache = EphemerisCache(max_size=1, max_loaded=2)
+    epochs = [START, START + timedelta(seconds=60)]
+
+    states, source = cache.states(cache.open("a.ipf"), epochs, "ITRF")
+    assert source == "ipf"
+    np.testing.assert_allclose(states[:, 0], [1.0, 61.0])
+    cache.states(cache.open("a.ipf"), epochs, "TEME")
+    assert len(universes) == 1
+    assert len(universes[0].frames.points) == 1
+
+    # evicted orbits stay in the universe until it is rebuilt
+    cache.states(cache.open("b.ipf"), epochs, "ITRF")
+    cache.states(cache.open("a.ipf"), epochs, "ITRF")
+    assert len(universes) == 2
+    assert list(universes[1].frames.points) == ["ephemeris_a"]
+
+
+def test_icrf_states_come_from_the_state_table(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    universes: list[SimpleNamespace],
+) -> None:
+    timestamps = START.timestamp() + np.arange(0, 3601, 60.0)
+    write_state_table(state_table_path(tmp_path / "a.ipf"), timestamps, lambda t: np.repeat(t[:, None], 6, axis=1))
+    monkeypatch.setattr(ephemeris, "UPLOADS", tmp_path)
+    cache = EphemerisCache(max_size=2)
+    orbit = cache.open("a.ipf")
+
+    states, source = cache.states(orbit, [START + timedelta(seconds=90)])
+    assert source == "table"
+    assert states.shape == (1, 6)
+    _, source = cache.states(orbit, [START + timedelta(seconds=90)], "TEME")
+    assert source == "ipf"
+    assert len(universes) == 1
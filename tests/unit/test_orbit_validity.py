@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.db.models import IpfOrbit
+from app.domain.orbit.repositories import ValidityFilter
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+END = datetime(2025, 1, 2, tzinfo=UTC)
+
+
+def _compile(validity_filter: ValidityFilter) -> str:
+    statement = validity_filter.append_to_statement(select(IpfOrbit), IpfOrbit)
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_validity_is_a_generated_range_with_a_gist_index() -> None:
+    table = IpfOrbit.__table__
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    (index,) = (index for index in table.indexes if index.name == "ix_ipf_orbit_satellite_id_validity")
+
+    assert "validity TSTZRANGE GENERATED ALWAYS AS (tstzrange(start, \"end\", '[]')) STORED" in ddl
+    assert str(CreateIndex(index).compile(dialect=postgresql.dialect())).endswith(
+        "USING gist (satellite_id, validity)",
+    )
+
+
+def test_covering_and_overlapping_orbits() -> None:
+    satellite_id = uuid4()
+
+    covering = _compile(ValidityFilter(START, END, satellite_id))
+    assert "ipf_orbit.validity @> " in covering
+    assert "ipf_orbit.satellite_id = " in covering
+    assert "ipf_orbit.validity && " in _compile(ValidityFilter(START, END, match="overlaps"))
+    assert "validity" not in _compile(ValidityFilter(satellite_id=satellite_id)).split("WHERE")[1]
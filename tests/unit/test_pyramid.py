@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from app.flight_dynamics.chebyshev import fit_chebyshev
+from app.flight_dynamics.pyramid import EXTREMA, EphemerisPyramid, build_pyramid
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+MU = 398600.4418
+SEMI_MAJOR_AXIS = 7000.0
+ECCENTRICITY = 0.05
+INCLINATION = 0.9
+
+
+def _eccentric_orbit(seconds: np.ndarray) -> np.ndarray:
+    rate = np.sqrt(MU / SEMI_MAJOR_AXIS**3)
+    mean_anomaly = rate * np.asarray(seconds)
+    eccentric_anomaly = mean_anomaly
+    for _ in range(20):
+        eccentric_anomaly = mean_anomaly + ECCENTRICITY * np.sin(eccentric_anomaly)
+    x = SEMI_MAJOR_AXIS * (np.cos(eccentric_anomaly) - ECCENTRICITY)
+    y = SEMI_MAJOR_AXIS * np.sqrt(1 - ECCENTRICITY**2) * np.sin(eccentric_anomaly)
+    anomaly_rate = rate / (1 - ECCENTRICITY * np.cos(eccentric_anomaly))
+    vx = -SEMI_MAJOR_AXIS * np.sin(eccentric_anomaly) * anomaly_rate
+    vy = SEMI_MAJOR_AXIS * np.sqrt(1 - ECCENTRICITY**2) * np.cos(eccentric_anomaly) * anomaly_rate
+    cos_i, sin_i = np.cos(INCLINATION), np.sin(INCLINATION)
+    return np.column_stack([x, y * cos_i, y * sin_i, vx, vy * cos_i, vy * sin_i])
+
+
+@pytest.fixture(scope="module")
+def pyramid_content() -> bytes:
+    ephemeris = fit_chebyshev(_eccentric_orbit, START, duration=86400, tolerance=1e-3)
+    return build_pyramid(ephemeris.to_bytes(), steps=(1.0, 60.0, 600.0), max_level_nodes=50_000)
+
+
+@pytest.fixture
+def pyramid(tmp_path: Path, pyramid_content: bytes) -> EphemerisPyramid:
+    path = tmp_path / "orbit.lod.npy"
+    path.write_bytes(pyramid_content)
+    return EphemerisPyramid.open(path)
+
+
+def test_levels_within_the_node_limit(pyramid: EphemerisPyramid) -> None:
+    levels = dict(pyramid.levels())
+
+    # a day at 1 s exceeds the node limit
+    assert list(levels) == [EXTREMA, 60.0, 600.0]
+    assert levels[60.0].stop - levels[60.0].start == 1441
+    assert levels[600.0].stop - levels[600.0].start == 145
+    nodes = pyramid.pyramid[:, levels[60.0]]
+    np.testing.assert_allclose(nodes[2:].T, _eccentric_orbit(nodes[1] - START.timestamp()), atol=1e-3)
+
+
+def test_extrema_of_every_revolution(pyramid: EphemerisPyramid) -> None:
+    extrema = pyramid.pyramid[:, dict(pyramid.levels())[EXTREMA]]
+    radius = np.linalg.norm(extrema[2:5], axis=0)
+
+    assert np.all(np.diff(extrema[1]) > 0)
+    # the perigee and the apogee are found to the sampling step
+    assert np.isclose(radius.min(), SEMI_MAJOR_AXIS * (1 - ECCENTRICITY), atol=1.0)
+    assert np.isclose(radius.max(), SEMI_MAJOR_AXIS * (1 + ECCENTRICITY), atol=1.0)
+    revolutions = 86400 / (2 * np.pi * np.sqrt(SEMI_MAJOR_AXIS**3 / MU))
+    assert len(radius) <= 4 * (np.ceil(revolutions) + 1) + 2
+
+
+def test_finest_level_within_the_point_budget(pyramid: EphemerisPyramid) -> None:
+    start = START.timestamp()
+
+    level = pyramid.select(start, start + 3600, max_points=100)
+    assert level.step == 60.0
+    assert len(level.timestamps) == 61
+    assert level.states.shape == (61, 6)
+    assert pyramid.select(start, start + 86400, max_points=1000).step == 600.0
+    level = pyramid.select(start, start + 86400, max_points=20)
+    assert level.step == EXTREMA
+    assert len(level.timestamps) <= 20
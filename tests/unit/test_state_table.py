@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from app.lib.state_table import StateTable, state_table_path, write_state_table
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+MU = 398600.4418
+RADIUS = 7000.0
+
+
+def _circular_orbit(timestamps: np.ndarray) -> np.ndarray:
+    rate = np.sqrt(MU / RADIUS**3)
+    angle = rate * (np.asarray(timestamps) - START.timestamp())
+    position = np.column_stack([np.cos(angle), np.sin(angle) * np.cos(0.9), np.sin(angle) * np.sin(0.9)])
+    velocity = rate * np.column_stack([-np.sin(angle), np.cos(angle) * np.cos(0.9), np.cos(angle) * np.sin(0.9)])
+    return RADIUS * np.hstack([position, velocity])
+
+
+@pytest.fixture
+def table_path(tmp_path: Path) -> Path:
+    path = state_table_path(tmp_path / "orbit.ipf")
+    timestamps = START.timestamp() + np.arange(0, 86400 + 1, 60.0)
+    write_state_table(path, timestamps, _circular_orbit, chunk_size=100)
+    return path
+
+
+def test_interpolation_between_nodes(table_path: Path) -> None:
+    table = StateTable.open(table_path)
+
+    assert isinstance(table.table, np.memmap)
+    assert (table.start, table.end) == (START, START + timedelta(days=1))
+    assert list(table_path.parent.iterdir()) == [table_path]
+    timestamps = START.timestamp() + np.linspace(0, 86400, 7919)
+    states = table.state(timestamps)
+    expected = _circular_orbit(timestamps)
+    assert np.max(np.linalg.norm(states[:, :3] - expected[:, :3], axis=1)) < 1e-3
+    assert np.max(np.linalg.norm(states[:, 3:] - expected[:, 3:], axis=1)) < 1e-4
+    assert table.state(timestamps[5]).shape == (6,)
+    # naive epochs are UTC
+    np.testing.assert_allclose(
+        table.state_at([START.replace(tzinfo=None) + timedelta(hours=6)]),
+        table.state([START.timestamp() + 6 * 3600]),
+        rtol=0,
+        atol=1e-9,
+    )
+
+
+def test_epochs_outside_of_the_table(table_path: Path) -> None:
+    table = StateTable.open(table_path)
+
+    with pytest.raises(ValueError, match="outside"):
+        table.state([START.timestamp() - 1])
+
+
+def test_nodes_must_increase(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="increasing"):
+        write_state_table(tmp_path / "orbit.ipf.states.npy", [0.0, 60.0, 60.0], _circular_orbit)
+    assert list(tmp_path.iterdir()) == []
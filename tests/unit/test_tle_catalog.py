@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import numpy as np
+
+from app.flight_dynamics.tle_catalog import CatalogReader
+
+ISS = (
+    "1 25544U 98067A   08264.51782528 -.00002182  00000-0 -11606-4 0  2927",
+    "2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391563537",
+)
+
+
+def _with_norad_id(line: str, norad_id: str) -> str:
+    line = line[:2] + norad_id + line[7:68]
+    digits = sum(int(char) if char.isdigit() else char == "-" for char in line)
+    return line + str(digits % 10)
+
+
+def test_catalog_records_are_decoded_across_pieces() -> None:
+    alpha5 = tuple(_with_norad_id(line, "A0042") for line in ISS)
+    corrupted = (ISS[0][:-1] + "0", ISS[1])
+    catalog = "\n".join(("0 ISS (ZARYA)", *ISS, *alpha5, *corrupted, ISS[1], "")).replace("\n", "\r\n")
+
+    reader = CatalogReader(chunk_size=2)
+    chunks = [chunk for start in range(0, len(catalog), 50) for chunk in reader.feed(catalog[start : start + 50])]
+    chunks += reader.close()
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert reader.malformed == 1
+    assert chunks[0].names == ["ISS (ZARYA)", None]
+    assert chunks[0].norad_id.tolist() == [25544, 100042]
+    assert chunks[0].valid.tolist() == [True, True]
+    assert chunks[1].valid.tolist() == [False]
+    epoch = chunks[0].epochs()[0]
+    assert epoch.tzinfo is UTC
+    assert abs(epoch - datetime(2008, 9, 20, 12, 25, 40, 104192, tzinfo=UTC)).total_seconds() < 1e-3
+    assert np.array_equal(chunks[0].epoch[0], chunks[0].epoch[1])
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+
+from app.flight_dynamics.catalog import TleCatalog
+from app.flight_dynamics.sgp4 import Sgp4, TleElements
+
+LINES = [
+    (
+        "1 25544U 98067A   08264.51782528 -.00002182  00000-0 -11606-4 0  2927",
+        "2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391563537",
+    ),
+    (
+        "1 00005U 58002B   00179.78495062  .00000023  00000-0  28098-4 0  4753",
+        "2 00005  34.2682 348.7242 1859667 331.7664  19.3264 10.82419157413667",
+    ),
+    # geostationary, deep space
+    (
+        "1 28626U 05008A   21001.00000000 -.00000280  00000-0  00000+0 0  9990",
+        "2 28626   0.0345 274.4512 0002345  89.1234 300.6543  1.00270000 58457",
+    ),
+]
+
+
+def test_catalog_propagation_matches_single_object_propagation() -> None:
+    catalog = TleCatalog.from_lines(["iss", "vanguard", "geo"], LINES)
+    epochs = [datetime(2008, 9, 20, tzinfo=UTC) + timedelta(minutes=minutes) for minutes in range(0, 600, 7)]
+
+    serial = catalog.propagate(epochs, max_block_size=10)
+    with ThreadPoolExecutor(2) as executor:
+        pooled = catalog.propagate(epochs, max_block_size=1000, executor=executor)
+
+    assert catalog.deep_space.tolist() == [False, False, True]
+    assert serial.position.shape == (3, len(epochs), 3)
+    np.testing.assert_array_equal(serial.position, pooled.position)
+    np.testing.assert_array_equal(serial.velocity, pooled.velocity)
+    assert np.isnan(serial.position[2]).all()
+    for index in range(2):
+        position, velocity = Sgp4(TleElements.from_lines([LINES[index]])).propagate_to(epochs)
+        np.testing.assert_allclose(serial.position[index], position[0], rtol=0, atol=1e-6)
+        np.testing.assert_allclose(serial.velocity[index], velocity[0], rtol=0, atol=1e-9)
+
+
+def test_catalog_blocks_are_bounded_and_picklable() -> None:
+    catalog = TleCatalog.from_lines(["iss", "vanguard", "geo"], LINES)
+    epochs = np.arange(np.datetime64("2008-09-20T00:00"), np.datetime64("2008-09-20T01:00"), np.timedelta64(1, "m"))
+
+    blocks = list(catalog.blocks(epochs.astype("datetime64[us]"), max_block_size=25))
+
+    assert all(len(block.objects) * len(block.epochs) <= 25 for block in blocks)
+    assert sum(len(block.objects) * len(block.epochs) for block in blocks) == 2 * len(epochs)
+    # blocks are pickled to the worker processes; the round trip is of data made by the test itself
+    position, _ = pickle.loads(pickle.dumps(blocks[0])).propagate()  # noqa: S301
+    np.testing.assert_array_equal(position, blocks[0].propagate()[0])
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import math
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.domain.tle import tasks
+from app.flight_dynamics.sampling import true_anomaly_grid
+from app.flight_dynamics.sgp4 import TleElements
+
+pytestmark = pytest.mark.anyio
+
+MU = 398600.4418
+RADIUS = 6378.137
+
+
+class _FakeEpoch:
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+
+    def __sub__(self, other: _FakeEpoch) -> float:
+        return self.seconds - other.seconds
+
+    def doyStr(self, _scale: str) -> str:  # noqa: N802
+        return "2024-001"
+
+    def jd(self, _scale: str) -> float:
+        return 2460310.5 + self.seconds / 86400
+
+
+class _FakeFrames:
+    def __init__(self) -> None:
+        self.points: set[str] = set()
+
+    def pointId(self, name: str) -> int:  # noqa: N802
+        if name not in self.points:
+            raise KeyError(name)
+        return 0
+
+    def vector6(self, _origin: str, _point: str, _axes: str, _epoch: _FakeEpoch) -> np.ndarray:
+        return np.zeros(6)
+
+
+class _FakeUniverse:
+    def __init__(self) -> None:
+        self.frames = _FakeFrames()
+        self.constants = SimpleNamespace(getMu=lambda _body: MU, getRadius=lambda _body: RADIUS)
+        self.plugins = 0
+
+    def createPlugin(self, _kind: str, configs: list[dict]) -> None:  # noqa: N802
+        self.plugins += len(configs)
+        self.frames.points.update(config["name"] for config in configs)
+
+
+@pytest.fixture(autouse=True)
+def _fake_godot(monkeypatch: pytest.MonkeyPatch) -> None:
+    # the fitted parameters are taken as Keplerian elements with the true anomaly as mean anomaly
+    astro = SimpleNamespace(convert=lambda *args: np.array(args[2], dtype=float), meanFromTrue=lambda nu, _: nu)
+    monkeypatch.setattr(tasks, "astro", astro)
+    monkeypatch.setattr(tasks, "num", SimpleNamespace(wrapZero2Pi=lambda angle: angle % (2 * math.pi)))
+    monkeypatch.setattr(tasks, "tempo", SimpleNamespace(SecondsInDay=86400.0))
+    monkeypatch.setattr(tasks, "godot_epoch_to_datetime", lambda _epoch: datetime(2024, 1, 1, tzinfo=UTC))
+
+
+def test_fit_iterations_register_no_frames() -> None:
+    uni = _FakeUniverse()
+    epoch = _FakeEpoch(0.0)
+    variables = np.array([7000.0, 0.001, 1.7, 0.3, 0.2, 0.1, 1e-4])
+    tle = tasks.TwoLineElement(uni, epoch=epoch, pars=variables)  # type: ignore[arg-type]
+    epochs = [_FakeEpoch(seconds) for seconds in np.arange(0.0, 86400.0, 60.0)]
+    obs = np.zeros((len(epochs), 6))
+
+    for _ in range(10):
+        residuals, jacobian = tasks.compute_residuals_and_jacobian(
+            uni,  # type: ignore[arg-type]
+            tle,
+            obs,
+            epochs,  # type: ignore[arg-type]
+            epoch,  # type: ignore[arg-type]
+            variables,
+            RADIUS,
+            MU,
+            variables[0],
+        )
+        tle.update(variables)
+
+    assert residuals.shape == (len(epochs), 6)
+    assert jacobian.shape == (len(epochs), 6, 7)
+    assert np.all(np.isfinite(jacobian))
+    assert uni.plugins == 0
+
+
+def test_deep_space_frames_are_shared() -> None:
+    uni = _FakeUniverse()
+    epoch = _FakeEpoch(0.0)
+    geo = np.array([42164.0, 0.0002, 0.001, 1.0, 2.0, 3.0, 0.0])
+    tle = tasks.TwoLineElement(uni, epoch=epoch, pars=geo)  # type: ignore[arg-type]
+    epochs = [_FakeEpoch(seconds) for seconds in (0.0, 60.0, 120.0)]
+
+    for _ in range(5):
+        tasks.evaluate_tles([tle, tasks.TwoLineElement(uni, epoch=epoch, pars=geo)], epochs)  # type: ignore[arg-type]
+        tle.update(geo)
+    assert uni.plugins == 1
+
+    tle.update(geo + np.array([0, 0, 0, 0, 0, 0.1, 0]))
+    tasks.evaluate_tles([tle], epochs)  # type: ignore[arg-type]
+    assert uni.plugins == 2
+
+
+def test_threaded_evaluation_is_bit_identical() -> None:
+    uni = _FakeUniverse()
+    epoch = _FakeEpoch(0.0)
+    variables = np.array([7000.0, 0.001, 1.7, 0.3, 0.2, 0.1, 1e-4])
+    tles = [
+        tasks.TwoLineElement(uni, epoch=epoch, pars=variables * (1 + 1e-3 * index))  # type: ignore[arg-type]
+        for index in range(8)
+    ]
+    epochs = [_FakeEpoch(seconds) for seconds in np.arange(0.0, 7 * 86400.0, 60.0)]
+
+    serial = tasks.evaluate_tles(tles, epochs)  # type: ignore[arg-type]
+    threaded = tasks.evaluate_tles(tles, epochs, threads=3)  # type: ignore[arg-type]
+
+    assert np.array_equal(serial, threaded)
+    assert np.array_equal(tasks.evaluate_tles(tles[:1], epochs)[0], serial[0])  # type: ignore[arg-type]
+
+
+def test_fit_is_deterministic_across_threads() -> None:
+    uni = _FakeUniverse()
+    epoch = _FakeEpoch(0.0)
+    pars = [7000.0, 0.001, 1.7, 0.3, 0.2, 0.1, 1e-4]
+    truth = tasks.TwoLineElement(uni, epoch=epoch, pars=pars)  # type: ignore[arg-type]
+    epochs = [_FakeEpoch(seconds) for seconds in np.arange(0.0, 86400.0, 60.0)]
+    obs = tasks.evaluate_tles([truth], epochs)[0]  # type: ignore[arg-type]
+
+    results = [
+        tasks.fit_tle(
+            uni,  # type: ignore[arg-type]
+            tle_config=None,  # type: ignore[arg-type]
+            tle_epoch=epoch,  # type: ignore[arg-type]
+            initial_tle_variables=np.array([7001.0, 0.0012, 1.7001, 0.3, 0.2, 0.1, 1e-3]),
+            obs_epochs=epochs,
+            obs=obs,
+            max_iter=3,
+            threads=threads,
+        )
+        for threads in (1, 2)
+    ]
+
+    assert results[0][1:] == results[1][1:]
+    assert uni.plugins == 0
+
+
+def test_normal_equations_match_per_epoch_accumulation() -> None:
+    rng = np.random.default_rng(0)
+    jacobian = rng.normal(size=(50, 6, 7))
+    residuals = rng.normal(size=(50, 6))
+    weights = rng.uniform(0.5, 2.0, size=6)
+
+    at_w_a, at_w_b = tasks.normal_equations(jacobian, residuals, weights)
+
+    w = np.diag(weights)
+    np.testing.assert_allclose(at_w_a, sum(j.T @ w @ j for j in jacobian), rtol=1e-12)
+    np.testing.assert_allclose(at_w_b, sum(j.T @ w @ r for j, r in zip(jacobian, residuals, strict=True)), rtol=1e-12)
+    expected = sum(r @ w @ r for r in residuals) / 2
+    assert tasks.weighted_cost(residuals, weights) == pytest.approx(expected, rel=1e-12)
+
+
+def test_fit_stops_once_converged() -> None:
+    uni = _FakeUniverse()
+    epoch = _FakeEpoch(0.0)
+    pars = np.array([7000.0, 0.001, 1.7, 0.3, 0.2, 0.1, 1e-4])
+    truth = tasks.TwoLineElement(uni, epoch=epoch, pars=pars)  # type: ignore[arg-type]
+    epochs = [_FakeEpoch(seconds) for seconds in np.arange(0.0, 86400.0, 60.0)]
+    obs = tasks.evaluate_tles([truth], epochs)[0]  # type: ignore[arg-type]
+
+    updates: list[dict] = []
+    _, line1, line2 = tasks.fit_tle(
+        uni,  # type: ignore[arg-type]
+        None,  # type: ignore[arg-type]
+        epoch,  # type: ignore[arg-type]
+        pars.copy(),
+        epochs,
+        obs,
+        progress=lambda _, details: updates.append(details),
+    )
+
+    assert [update["converged"] for update in updates] == [True]
+    assert (line1, line2) == (truth.to_line1(), truth.to_line2())
+
+
+@pytest.mark.parametrize("bstar", [1e-4, -2.8098e-5, 0.0099999999, 0.5])
+def test_bstar_round_trips_through_the_lines(bstar: float) -> None:
+    pars = [7000.0, 0.001, 1.7, 0.3, 0.2, 0.1, bstar]
+    tle = tasks.TwoLineElement(_FakeUniverse(), epoch=_FakeEpoch(0.0), pars=pars)  # type: ignore[arg-type]
+    line1 = tle.to_line1()
+
+    assert len(line1) == 69
+    assert TleElements.from_lines([(line1, tle.to_line2())]).bstar[0] == pytest.approx(bstar, rel=1e-4)
+
+
+def test_warm_start_recovers_the_fit_variables(monkeypatch: pytest.MonkeyPatch) -> None:
+    def mean_from_true(nu: float, ecc: float) -> float:
+        eccentric = 2 * math.atan2(math.sqrt(1 - ecc) * math.sin(nu / 2), math.sqrt(1 + ecc) * math.cos(nu / 2))
+        return eccentric - ecc * math.sin(eccentric)
+
+    monkeypatch.setattr(tasks.astro, "meanFromTrue", mean_from_true)
+    # the epoch of the fake TLE lines
+    monkeypatch.setattr(tasks, "godot_epoch_to_datetime", lambda _epoch: datetime(2024, 1, 1, 12, tzinfo=UTC))
+    uni = _FakeUniverse()
+    epoch = _FakeEpoch(0.0)
+    pars = np.array([7000.0, 0.001, 1.7, 0.3, 0.2, 0.1, 1e-4])
+    tle = tasks.TwoLineElement(uni, epoch=epoch, pars=pars)  # type: ignore[arg-type]
+
+    variables = tasks.warm_start_variables(uni, (tle.to_line1(), tle.to_line2()), epoch)  # type: ignore[arg-type]
+
+    # up to the precision of the lines
+    np.testing.assert_allclose(variables, pars, rtol=1e-5, atol=1e-5)
+
+
+def test_true_anomaly_grid_is_denser_around_perigee() -> None:
+    sma, ecc = 26600.0, 0.7
+    period = 2 * math.pi * math.sqrt(sma**3 / MU)
+    offsets = true_anomaly_grid(2 * period, sma, ecc, 0.0, 36)
+
+    assert offsets[0] == 0.0
+    assert offsets[-1] == 2 * period
+    assert len(offsets) == 2 * 36 + 1
+    steps = np.diff(offsets)
+    # starting at perigee, the first step is the shortest and the step at apogee the longest
+    assert steps[0] == pytest.approx(steps.min())
+    assert steps[17] == pytest.approx(steps.max())
@@ -0,0 +1,119 @@
+"""Benchmark the propagation fidelity profiles against a reference propagation.
+
+Every profile propagates the same initial state, and the runtime of ``Trajectory.compute`` is
+reported against the maximum position difference with a reference propagation using the full
+gravity field and a tighter integrator tolerance. Run from the repository root, next to the
+``data`` directory holding the environment files::
+
+    python tools/benchmark_fidelity.py --days 1 --degree 70 --drag --srp
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from godot import cosmos
+from godot.core import tempo
+
+from app.lib.fdy import FIDELITY_PROFILES, get_dynamics_config, get_integrator_settings
+from app.lib.universe_assembler import uni_config as uni_basic
+
+REFERENCE_SETTINGS = {"steps": 10_000_000, "tol": 1e-13}
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--epoch", default="2024-01-01T00:00:00 TDB", help="start epoch of the propagation")
+parser.add_argument("--days", type=float, default=1.0, help="propagation span in days")
+parser.add_argument("--degree", type=int, default=70, help="degree and order of the Earth gravity field")
+parser.add_argument("--drag", action="store_true", help="include atmospheric drag")
+parser.add_argument("--srp", action="store_true", help="include solar radiation pressure")
+parser.add_argument("--step", type=float, default=60.0, help="step in seconds of the comparison grid")
+parser.add_argument(
+    "--state",
+    type=float,
+    nargs=6,
+    default=[7000.0, 0.0, 0.0, 0.0, -1.0388, 7.4747],
+    metavar=("X", "Y", "Z", "VX", "VY", "VZ"),
+    help="initial ICRF state in km and km/s",
+)
+
+
+def trajectory_config(args: argparse.Namespace, settings: dict) -> dict:
+    start = tempo.Epoch(args.epoch)
+    units = ["km"] * 3 + ["km/s"] * 3
+    keys = ["pos_x", "pos_y", "pos_z", "vel_x", "vel_y", "vel_z"]
+    return {
+        "settings": settings,
+        "setup": [
+            {
+                "name": "sc",
+                "type": "group",
+                "input": [
+                    {"name": "center", "type": "point"},
+                    {"name": "mass", "type": "scalar", "unit": "kg"},
+                    {"name": "dv", "type": "scalar", "unit": "m/s"},
+                ],
+            },
+        ],
+        "timeline": [
+            {
+                "type": "control",
+                "name": "initial",
+                "epoch": str(start),
+                "state": [
+                    {
+                        "name": "sc_center",
+                        "body": "Earth",
+                        "axes": "ICRF",
+                        "dynamics": "combined",
+                        "value": {
+                            key: f"{value} {unit}" for key, value, unit in zip(keys, args.state, units, strict=True)
+                        },
+                    },
+                    {"name": "sc_mass", "value": "100 kg"},
+                    {"name": "sc_dv", "value": "0 m/s"},
+                ],
+            },
+            {"type": "point", "name": "final", "input": "sc", "point": {"epoch": str(start + args.days * 86400)}},
+        ],
+    }
+
+
+def run(args: argparse.Namespace, fidelity: str, settings: dict) -> tuple[float, np.ndarray]:
+    dynamics = SimpleNamespace(
+        harmonics_degree=args.degree,
+        harmonics_order=args.degree,
+        drag=args.drag,
+        solar_radiation_pressure=args.srp,
+        third_body_sun=True,
+        third_body_moon=True,
+        solid_tides=False,
+    )
+    satellite = SimpleNamespace(dry_mass=100.0, drag_area=1.0, drag_coefficient=2.2, srp_area=1.0, srp_coefficient=1.3)
+    uni = cosmos.Universe(uni_basic | get_dynamics_config(dynamics, satellite, fidelity))  # type: ignore[arg-type]
+    tra = cosmos.Trajectory(uni, trajectory_config(args, settings))
+
+    start_time = time.perf_counter()
+    tra.compute(False)
+    runtime = time.perf_counter() - start_time
+
+    start = tempo.Epoch(args.epoch)
+    grid = tempo.EpochRange(start, start + args.days * 86400).createGrid(args.step)
+    return runtime, np.vstack([uni.frames.vector3("Earth", "sc_center", "ICRF", epoch) for epoch in grid])
+
+
+def main() -> None:
+    args = parser.parse_args()
+    reference_runtime, reference = run(args, "precise", REFERENCE_SETTINGS)
+    print(f"{'profile':<12} {'runtime [s]':>12} {'speed-up':>9} {'max position error [m]':>24}")  # noqa: T201
+    print(f"{'reference':<12} {reference_runtime:>12.3f} {1:>9.1f} {0:>24.3f}")  # noqa: T201
+    for fidelity in FIDELITY_PROFILES:
+        runtime, positions = run(args, fidelity, get_integrator_settings(fidelity))  # type: ignore[arg-type]
+        error = np.max(np.linalg.norm(positions - reference, axis=1)) * 1000
+        print(f"{fidelity:<12} {runtime:>12.3f} {reference_runtime / runtime:>9.1f} {error:>24.3f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()